@@ -3,13 +3,47 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from dataclasses import dataclass, asdict, field
-from typing import Dict, List, Tuple, Optional
+from dataclasses import dataclass, asdict, field, fields, MISSING
+from typing import (Dict, List, Tuple, Optional, Callable, Iterator, Iterable, Sequence, Union, NamedTuple,
+                    AsyncIterable, AsyncIterator)
 import numpy_financial as npf
+from scipy.stats import qmc, t as student_t
 import json
+import os
+import sys
+import hashlib
+import pickle
+import sqlite3
+import time
+import logging
+import threading
+import functools
+import contextvars
+import importlib
+import multiprocessing
+import queue
+import asyncio
+import math
+import argparse
+import tempfile
+import shutil
+import http.client
+try:
+    import resource
+except ImportError:  # Windows: process peak RSS is not reported
+    resource = None
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from collections import deque, OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
 import io
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -17,16 +51,9 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 
-# Page configuration
-st.set_page_config(
-    page_title="Commercial Real Estate Investment Analyzer",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
 
 # Custom CSS for modern, crisp design
-st.markdown("""
+PAGE_CSS = """
     <style>
     /* Import modern font */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
@@ -258,9 +285,290 @@ st.markdown("""
         font-weight: 500;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+
+# Performance instrumentation
+PERF_LOG_PATH = os.environ.get("CRE_PERF_LOG")
+PERF_WINDOW = int(os.environ.get("CRE_PERF_WINDOW", "200"))
+
+perf_logger = logging.getLogger("cre_analyzer.perf")
+
+# Stage timings collected during the current rerun (None outside main())
+_rerun_timings: contextvars.ContextVar[Optional[Dict[str, List[float]]]] = contextvars.ContextVar(
+    "rerun_timings", default=None
+)
+
+# [reserved, peak] bytes of each active stage_timer block, outermost first (see MemoryBudget)
+_memory_frames: contextvars.ContextVar[Tuple[List[int], ...]] = contextvars.ContextVar("memory_frames", default=())
+
+
+class StageProfiler:
+    """Rolling per-stage timings and peak reserved memory shared by every session on the server"""
+    
+    def __init__(self, window: int = PERF_WINDOW):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._peaks: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, stage: str, seconds: float, peak_bytes: int = 0):
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.window)
+                self._peaks[stage] = deque(maxlen=self.window)
+            self._samples[stage].append(seconds)
+            self._peaks[stage].append(peak_bytes)
+    
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._peaks.clear()
+    
+    def percentile(self, stage: str, q: float) -> Optional[float]:
+        """q-th percentile of a stage's recent samples in seconds (None if unseen)"""
+        with self._lock:
+            samples = np.array(self._samples.get(stage, ()))
+        return float(np.percentile(samples, q)) if samples.size else None
+    
+    def summary(self) -> pd.DataFrame:
+        """Return calls, p50, p95 and max (ms) per stage, slowest p95 first"""
+        with self._lock:
+            snapshot = {stage: (np.array(samples), max(self._peaks[stage], default=0))
+                        for stage, samples in self._samples.items()}
+        
+        rows = []
+        for stage, (samples, peak) in snapshot.items():
+            if samples.size == 0:
+                continue
+            rows.append({
+                'Stage': stage,
+                'Samples': int(samples.size),
+                'Last (ms)': samples[-1] * 1000,
+                'p50 (ms)': np.percentile(samples, 50) * 1000,
+                'p95 (ms)': np.percentile(samples, 95) * 1000,
+                'Max (ms)': samples.max() * 1000,
+                'Peak (MB)': peak / 1024 ** 2,
+            })
+        
+        if not rows:
+            return pd.DataFrame(columns=['Stage', 'Samples', 'Last (ms)', 'p50 (ms)', 'p95 (ms)', 'Max (ms)',
+                                         'Peak (MB)'])
+        return pd.DataFrame(rows).sort_values('p95 (ms)', ascending=False).reset_index(drop=True)
+
+
+@st.cache_resource
+def get_stage_profiler() -> StageProfiler:
+    """Server-wide profiler (survives reruns, shared across sessions)"""
+    if PERF_LOG_PATH:
+        log_path = str(Path(PERF_LOG_PATH).resolve())
+        if not any(getattr(h, 'baseFilename', None) == log_path for h in perf_logger.handlers):
+            handler = logging.FileHandler(log_path)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            perf_logger.addHandler(handler)
+        perf_logger.setLevel(logging.INFO)
+    return StageProfiler()
+
+
+def current_session_id() -> str:
+    """Streamlit session id, or 'local' when running outside the app server"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else 'local'
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time a block and record it, with the peak memory reserved inside it, against the given stage name
+    
+    Yields the block's [reserved, peak] byte counters, which stay readable after it ends.
+    """
+    frame = [0, 0]
+    token = _memory_frames.set(_memory_frames.get() + (frame,))
+    start = time.perf_counter()
+    try:
+        yield frame
+    finally:
+        elapsed = time.perf_counter() - start
+        _memory_frames.reset(token)
+        peak = frame[1]
+        get_stage_profiler().record(stage, elapsed, peak)
+        
+        timings = _rerun_timings.get()
+        if timings is not None:
+            calls_total_peak = timings.setdefault(stage, [0, 0.0, 0])
+            calls_total_peak[0] += 1
+            calls_total_peak[1] += elapsed
+            calls_total_peak[2] = max(calls_total_peak[2], peak)
+        
+        if perf_logger.isEnabledFor(logging.DEBUG):
+            perf_logger.debug(json.dumps({
+                'event': 'stage',
+                'stage': stage,
+                'ms': round(elapsed * 1000, 3),
+                'peak_mb': round(peak / 1024 ** 2, 3),
+                'session': current_session_id()
+            }))
+
+
+def timed(func: Callable) -> Callable:
+    """Decorator that records each call of func as a stage"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with stage_timer(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def rerun_profile():
+    """Collect the stage timings of one rerun and log them as a single record"""
+    timings: Dict[str, List[float]] = {}
+    token = _rerun_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        total = time.perf_counter() - start
+        _rerun_timings.reset(token)
+        get_stage_profiler().record('rerun_total', total)
+        perf_logger.info(json.dumps({
+            'event': 'rerun',
+            'session': current_session_id(),
+            'timestamp': datetime.now().isoformat(),
+            'total_ms': round(total * 1000, 3),
+            'stages': {
+                stage: {'calls': calls, 'ms': round(seconds * 1000, 3), 'peak_mb': round(peak / 1024 ** 2, 3)}
+                for stage, (calls, seconds, peak) in timings.items()
+            }
+        }))
+
+
+# Memory budget
+MEMORY_BUDGET_MB = float(os.environ.get("CRE_MEMORY_BUDGET_MB", "1024"))
+
+# Share of the budget one chunk may take, so several jobs can run side by side
+MEMORY_CHUNK_SHARE = 0.25
+
+memory_logger = logging.getLogger("cre_analyzer.memory")
+
+
+class MemoryBudgetError(MemoryError):
+    """A job's results alone would exceed the memory budget"""
 
-@dataclass
+
+class MemoryBudget:
+    """Server-wide ceiling on the estimated working memory of batch computations
+    
+    Batch code sizes its chunks with chunk_rows from an estimated footprint
+    per scenario and holds reserve() while a chunk is in flight. A
+    reservation that would push the total over the limit waits for other
+    threads to release theirs, so concurrent jobs queue instead of running
+    the server out of memory; one larger than the whole budget still runs,
+    alone. Reserved bytes are charged to every enclosing stage_timer block,
+    which is how the profiler reports peak memory per stage.
+    """
+    
+    def __init__(self, limit_bytes: int, chunk_share: float = MEMORY_CHUNK_SHARE):
+        self.limit = int(limit_bytes)
+        self.chunk_share = chunk_share
+        self.in_use = 0
+        self.peak = 0
+        self.waits = 0
+        self._condition = threading.Condition()
+        self._held = threading.local()
+    
+    def chunk_rows(self, bytes_per_row: int, rows: int) -> int:
+        """Rows per chunk (at most rows, at least 1) so one chunk fits chunk_share of the budget"""
+        return int(max(1, min(rows, self.limit * self.chunk_share // max(int(bytes_per_row), 1))))
+    
+    def check(self, nbytes: int, what: str):
+        """Raise MemoryBudgetError if nbytes (memory that cannot be chunked) exceeds the whole budget"""
+        if nbytes > self.limit:
+            raise MemoryBudgetError(
+                f"{what} needs about {nbytes / 1024 ** 2:,.0f} MB, over the "
+                f"{self.limit / 1024 ** 2:,.0f} MB memory budget (CRE_MEMORY_BUDGET_MB)"
+            )
+    
+    @contextmanager
+    def reserve(self, nbytes: int):
+        """Hold nbytes of the budget for the duration of the block"""
+        nbytes = int(nbytes)
+        held = getattr(self._held, 'bytes', 0)
+        with self._condition:
+            # Reservations this thread already holds never block it (nested chunks)
+            if self.in_use - held > 0 and self.in_use + nbytes > self.limit:
+                self.waits += 1
+                self._condition.wait_for(lambda: self.in_use - held == 0 or self.in_use + nbytes <= self.limit)
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+        self._held.bytes = held + nbytes
+        frames = _memory_frames.get()
+        for frame in frames:
+            frame[0] += nbytes
+            frame[1] = max(frame[1], frame[0])
+        try:
+            yield
+        finally:
+            for frame in frames:
+                frame[0] -= nbytes
+            self._held.bytes = held
+            with self._condition:
+                self.in_use -= nbytes
+                self._condition.notify_all()
+    
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {'limit': self.limit, 'in_use': self.in_use, 'peak': self.peak, 'waits': self.waits}
+
+
+@st.cache_resource
+def get_memory_budget() -> MemoryBudget:
+    """Server-wide memory budget (survives reruns, shared across sessions)"""
+    return MemoryBudget(int(MEMORY_BUDGET_MB * 1024 ** 2))
+
+
+def process_peak_rss() -> Optional[int]:
+    """Peak resident memory of this process in bytes (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# Rates below this magnitude take the annuity factor from its series
+SMALL_RATE = 1e-4
+ANNUITY_SERIES_TERMS = 10
+
+
+def annuity_factor(rate, periods):
+    """((1 + rate)^periods - 1) / rate: what periods level payments of 1 grow to
+    
+    Near a zero rate the closed form divides two vanishing quantities and,
+    for a complex-step rate (see input_gradients), drops the imaginary
+    tangent, so rates below SMALL_RATE use the binomial series
+    sum_j C(periods, j + 1) rate^j, which is exact to round-off there.
+    """
+    small = np.abs(rate) < SMALL_RATE
+    safe_rate = np.where(small, 1.0, rate)
+    closed = ((1 + safe_rate) ** periods - 1) / safe_rate
+    series = term = periods + 0 * rate
+    for j in range(ANNUITY_SERIES_TERMS - 1):
+        term = term * (periods - j - 1) / (j + 2) * rate
+        series = series + term
+    return np.where(small, series, closed)
+
+
+def level_payment(principal, rate, periods):
+    """Level payment per period that repays principal over periods (straight-line at a zero rate)"""
+    return principal * (1 + rate) ** periods / annuity_factor(rate, periods)
+
+
+def clip_below(values, floor: float):
+    """max(values, floor), deciding on the real part so complex-step tangents follow the chosen branch"""
+    return np.where(np.real(values) > floor, values, floor)
+
+
+@dataclass(frozen=True)
 class Tenant:
     """Individual tenant details"""
     name: str
@@ -273,9 +581,9 @@ class Tenant:
         return self.square_feet * self.annual_rent_psf
 
 
-@dataclass
+@dataclass(frozen=True)
 class PropertyInputs:
-    """Store all property input parameters"""
+    """Store all property input parameters (immutable; use with_overrides for variants)"""
     # Property Details
     building_size: float
     purchase_price: float
@@ -316,7 +624,32 @@ class PropertyInputs:
     
     # Tenant Details (with defaults - must be last)
     use_detailed_tenants: bool = False
-    tenants: List[Tenant] = field(default_factory=list)
+    tenants: Tuple[Tenant, ...] = ()
+    
+    # Model Resolution
+    use_monthly_periods: bool = False
+    
+    def __post_init__(self):
+        # Store tenants as a tuple so every variant can share it safely
+        if not isinstance(self.tenants, tuple):
+            object.__setattr__(self, 'tenants', tuple(self.tenants))
+    
+    def with_overrides(self, **changes) -> 'PropertyInputs':
+        """Return a variant with some fields replaced
+        
+        Unchanged field values (including the tenant tuple) are shared with this
+        instance rather than copied, so creating a variant costs about a microsecond.
+        """
+        if not INPUT_FIELD_NAMES.issuperset(changes):
+            unknown = ', '.join(sorted(changes.keys() - INPUT_FIELD_NAMES))
+            raise TypeError(f"Unknown PropertyInputs field(s): {unknown}")
+        if 'tenants' in changes and not isinstance(changes['tenants'], tuple):
+            changes['tenants'] = tuple(changes['tenants'])
+        
+        variant = object.__new__(PropertyInputs)
+        variant.__dict__.update(self.__dict__)
+        variant.__dict__.update(changes)
+        return variant
     
     @property
     def price_per_sf(self) -> float:
@@ -336,15 +669,361 @@ class PropertyInputs:
     
     @property
     def annual_debt_service(self) -> float:
-        if self.interest_rate == 0:
-            return self.loan_amount / self.loan_term_years
-        return -npf.pmt(self.interest_rate, self.loan_term_years, self.loan_amount)
+        return level_payment(self.loan_amount, self.interest_rate, self.loan_term_years)
     
     @property
     def monthly_debt_service(self) -> float:
-        return self.annual_debt_service / 12
+        """Level monthly payment on a monthly-amortizing loan"""
+        return level_payment(self.loan_amount, self.interest_rate / 12, self.loan_term_years * 12)
+    
+    @property
+    def year1_debt_service(self) -> float:
+        """Debt service paid in year 1 under the selected period resolution"""
+        if self.use_monthly_periods:
+            return self.monthly_debt_service * 12
+        return self.annual_debt_service
+
+
+INPUT_FIELD_NAMES = frozenset(f.name for f in fields(PropertyInputs))
+
+# Fields that can vary across the scenarios of one batch evaluation
+NUMERIC_INPUT_FIELDS = tuple(f.name for f in fields(PropertyInputs) if f.type in (float, int, 'float', 'int'))
+
+
+def stack_inputs(variants: Sequence[PropertyInputs]) -> PropertyInputs:
+    """Stack variants into one PropertyInputs whose numeric fields are (n, 1) columns
+    
+    The engine math broadcasts these columns against the period axis, so
+    CREAnalyzer projects every variant at once. All variants must share the
+    structural settings (tenants, detailed-tenant and monthly-period flags).
+    """
+    return variants[0].with_overrides(**{
+        name: np.array([getattr(variant, name) for variant in variants], dtype=np.float64)[:, None]
+        for name in NUMERIC_INPUT_FIELDS
+    })
+
+
+# Canonical return metrics, in storage order
+RETURN_METRICS = (
+    # Exit Analysis
+    'year_after_noi', 'gross_sale_price', 'sale_costs', 'net_sale_proceeds', 'loan_balance',
+    'total_depreciation', 'depreciation_recapture_tax', 'capital_gains_tax', 'total_tax_on_sale',
+    'net_cash_from_sale',
+    
+    # Pre-Tax Returns
+    'pre_tax_total_cash_flow', 'pre_tax_total_returned', 'pre_tax_profit', 'pre_tax_equity_multiple',
+    'pre_tax_avg_coc', 'pre_tax_irr', 'pre_tax_npv',
+    
+    # After-Tax Returns
+    'after_tax_total_cash_flow', 'after_tax_total_returned', 'after_tax_profit', 'after_tax_equity_multiple',
+    'after_tax_avg_coc', 'after_tax_irr', 'after_tax_npv',
+    
+    # Year 1 Metrics
+    'year1_noi', 'going_in_cap_rate', 'year1_dscr', 'year1_pre_tax_coc', 'year1_after_tax_coc',
+)
+
+# Backwards-compatible keys that read an after-tax metric
+RETURN_ALIASES = {
+    'total_cash_flow': 'after_tax_total_cash_flow',
+    'total_cash_returned': 'after_tax_total_returned',
+    'total_profit': 'after_tax_profit',
+    'equity_multiple': 'after_tax_equity_multiple',
+    'avg_cash_on_cash': 'after_tax_avg_coc',
+    'irr': 'after_tax_irr',
+    'npv': 'after_tax_npv',
+    'year1_coc': 'year1_after_tax_coc',
+}
+
+RETURN_METRIC_INDEX = {name: i for i, name in enumerate(RETURN_METRICS)}
+RETURN_METRIC_INDEX.update({alias: RETURN_METRIC_INDEX[name] for alias, name in RETURN_ALIASES.items()})
+
+
+class InvestmentReturns(Mapping):
+    """Returns for one scenario, stored as a single float64 record
+    
+    Reads like the original returns dict: every metric, every backwards-compatible
+    alias and 'cash_flows' (after-tax equity cash flows) are available by key.
+    """
+    __slots__ = ('_values', '_cash_flows')
+    
+    def __init__(self, values: np.ndarray, cash_flows: np.ndarray):
+        self._values = values
+        self._cash_flows = cash_flows
+    
+    @classmethod
+    def from_metrics(cls, metrics: Dict[str, float], cash_flows: Sequence[float]) -> 'InvestmentReturns':
+        values = np.array([metrics[name] for name in RETURN_METRICS], dtype=np.float64)
+        return cls(values, np.asarray(cash_flows, dtype=np.float64))
+    
+    def __getitem__(self, key: str):
+        if key == 'cash_flows':
+            return self._cash_flows
+        return float(self._values[RETURN_METRIC_INDEX[key]])
+    
+    def __getattr__(self, name: str) -> float:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+    
+    def __iter__(self) -> Iterator[str]:
+        yield from RETURN_METRICS
+        yield from RETURN_ALIASES
+        yield 'cash_flows'
+    
+    def __len__(self) -> int:
+        return len(RETURN_METRICS) + len(RETURN_ALIASES) + 1
+    
+    def __getstate__(self):
+        return self._values, self._cash_flows
+    
+    def __setstate__(self, state):
+        self._values, self._cash_flows = state
+    
+    def __repr__(self) -> str:
+        return f"InvestmentReturns(after_tax_irr={self['after_tax_irr']:.4f}, after_tax_npv={self['after_tax_npv']:,.0f})"
+    
+    @property
+    def nbytes(self) -> int:
+        return self._values.nbytes + self._cash_flows.nbytes
+    
+    def to_dict(self) -> Dict[str, float]:
+        """Canonical metrics as plain floats (no aliases, no cash flows)"""
+        return dict(zip(RETURN_METRICS, self._values.tolist()))
+
+
+class ReturnsBatch:
+    """Returns for many scenarios, one contiguous float64 column per metric
+    
+    batch['after_tax_irr'] is a column view, batch[i] is the InvestmentReturns
+    for scenario i. Cash flows are kept as a (scenarios x periods) array and
+    padded with NaN when hold periods differ.
+    """
+    __slots__ = ('_values', 'cash_flows')
+    
+    def __init__(self, values: np.ndarray, cash_flows: Optional[np.ndarray] = None):
+        # values has shape (len(RETURN_METRICS), n_scenarios), so each metric row is contiguous
+        self._values = np.ascontiguousarray(values, dtype=np.float64)
+        self.cash_flows = cash_flows
+    
+    @classmethod
+    def empty(cls, n_scenarios: int, n_periods: Optional[int] = None) -> 'ReturnsBatch':
+        values = np.full((len(RETURN_METRICS), n_scenarios), np.nan)
+        cash_flows = np.full((n_scenarios, n_periods), np.nan) if n_periods else None
+        return cls(values, cash_flows)
+    
+    @classmethod
+    def from_returns(cls, results: Sequence[InvestmentReturns], keep_cash_flows: bool = True) -> 'ReturnsBatch':
+        values = np.empty((len(RETURN_METRICS), len(results)))
+        for i, result in enumerate(results):
+            values[:, i] = result._values
+        
+        cash_flows = None
+        if keep_cash_flows and results:
+            n_periods = max(len(result._cash_flows) for result in results)
+            cash_flows = np.full((len(results), n_periods), np.nan)
+            for i, result in enumerate(results):
+                cash_flows[i, :len(result._cash_flows)] = result._cash_flows
+        return cls(values, cash_flows)
+    
+    @classmethod
+    def concatenate(cls, batches: Sequence['ReturnsBatch']) -> 'ReturnsBatch':
+        values = np.concatenate([batch._values for batch in batches], axis=1)
+        if all(batch.cash_flows is not None for batch in batches):
+            n_periods = max(batch.cash_flows.shape[1] for batch in batches)
+            cash_flows = np.concatenate([
+                np.pad(batch.cash_flows, ((0, 0), (0, n_periods - batch.cash_flows.shape[1])),
+                       constant_values=np.nan)
+                for batch in batches
+            ])
+        else:
+            cash_flows = None
+        return cls(values, cash_flows)
+    
+    def __len__(self) -> int:
+        return self._values.shape[1]
+    
+    def __getitem__(self, key: Union[str, int]) -> Union[np.ndarray, InvestmentReturns]:
+        if isinstance(key, str):
+            return self._values[RETURN_METRIC_INDEX[key]]
+        
+        cash_flows = self.cash_flows[key] if self.cash_flows is not None else np.empty(0)
+        return InvestmentReturns(self._values[:, key].copy(), cash_flows[~np.isnan(cash_flows)])
+    
+    def __setitem__(self, key: str, column: np.ndarray):
+        self._values[RETURN_METRIC_INDEX[key]] = column
+    
+    @property
+    def nbytes(self) -> int:
+        return self._values.nbytes + (self.cash_flows.nbytes if self.cash_flows is not None else 0)
+    
+    def to_frame(self, metrics: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """DataFrame with one column per requested metric (all canonical metrics by default)"""
+        metrics = metrics or RETURN_METRICS
+        return pd.DataFrame({name: self[name] for name in metrics})
+
+
+PRO_FORMA_COLUMNS = (
+    'Year', 'Rent_PSF', 'Occupancy', 'Occupied_SF', 'Gross_Rental_Income', 'Other_Income', 'Total_Revenue',
+    'Property_Taxes', 'Insurance', 'CAM', 'Total_Reimbursable',
+    'Property_Management', 'Leasing_Commission', 'Repairs_Maintenance', 'Total_Landlord_Expenses',
+    'NOI', 'Initial_TI', 'CapEx_Reserve', 'Total_CapEx',
+    'Debt_Service', 'Interest_Expense', 'Principal_Payment', 'Loan_Balance',
+    'Depreciation', 'Taxable_Income', 'Tax_Liability',
+    'Pre_Tax_Cash_Flow', 'After_Tax_Cash_Flow', 'DSCR', 'Pre_Tax_CoC', 'After_Tax_CoC',
+)
+
+PRO_FORMA_COLUMN_INDEX = {name: i for i, name in enumerate(PRO_FORMA_COLUMNS)}
+
+
+class ProForma:
+    """Annual pro forma held as one (years x columns) float64 array
+    
+    pro_forma['NOI'] returns a column view for the returns math and charts.
+    The pandas DataFrame is only built (once) when to_frame() is called.
+    """
+    __slots__ = ('values', '_frame')
+    
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self._frame = None
+    
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray]) -> 'ProForma':
+        n_years = len(columns['Year'])
+        values = np.empty((n_years, len(PRO_FORMA_COLUMNS)))
+        for i, name in enumerate(PRO_FORMA_COLUMNS):
+            values[:, i] = columns[name]
+        return cls(values)
+    
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.values[:, PRO_FORMA_COLUMN_INDEX[column]]
+    
+    def __len__(self) -> int:
+        return self.values.shape[0]
+    
+    def __getstate__(self):
+        return self.values
+    
+    def __setstate__(self, values):
+        self.values = values
+        self._frame = None
+    
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return PRO_FORMA_COLUMNS
+    
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+    
+    @property
+    def years(self) -> np.ndarray:
+        return self['Year'].astype(int)
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Materialize (and cache) the pro forma as a DataFrame for tables, charts and export"""
+        if self._frame is None:
+            frame = pd.DataFrame(self.values, columns=list(PRO_FORMA_COLUMNS))
+            frame['Year'] = frame['Year'].astype(int)
+            self._frame = frame
+        return self._frame
+    
+    def to_csv(self, **kwargs) -> str:
+        return self.to_frame().to_csv(**kwargs)
+
+
+def batch_npv(rate: Union[float, np.ndarray], cash_flows: np.ndarray) -> np.ndarray:
+    """NPV of each row of a (scenarios x periods) cash flow array, first period undiscounted like npf.npv
+    
+    rate may be a scalar or one discount rate per row.
+    """
+    cash_flows = np.atleast_2d(cash_flows)
+    discount = (1 + np.reshape(rate, (-1, 1))) ** -np.arange(cash_flows.shape[1])
+    return (cash_flows * discount).sum(axis=1)
 
 
+def batch_irr(cash_flows: np.ndarray, tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+    """IRR of each row of a (scenarios x periods) cash flow array
+    
+    Newton iteration on every row at once, safeguarded by a bracketing
+    interval: steps that leave the bracket fall back to bisection. Rows whose
+    NPV does not change sign between -99% and 1000% have no IRR and return NaN.
+    Trailing zero periods do not change a row's IRR, so ragged cash flows can
+    be zero-padded.
+    
+    Complex cash flows carry complex-step tangents (see input_gradients). The
+    IRR solves NPV(irr, flows) = 0, so by the implicit function theorem its
+    tangent is -dNPV / (dNPV/drate), taken at the root of the real part.
+    """
+    periods = np.arange(np.shape(cash_flows)[-1])
+    if np.iscomplexobj(cash_flows):
+        cash_flows = np.atleast_2d(cash_flows)
+        rate = batch_irr(cash_flows.real, tol, max_iter)
+        discount = (1 + rate)[:, None] ** -periods
+        slope = -(cash_flows.real * discount * periods).sum(axis=1) / (1 + rate)
+        return rate - 1j * (cash_flows.imag * discount).sum(axis=1) / slope
+    
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    n_periods = cash_flows.shape[1]
+    
+    def npv_and_slope(rate: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Horner's scheme in v = 1 / (1 + rate), carrying d NPV / dv alongside
+        v = 1 / (1 + rate)
+        npv = cash_flows[:, -1].copy()
+        dnpv_dv = np.zeros_like(npv)
+        for t in range(n_periods - 2, -1, -1):
+            dnpv_dv = dnpv_dv * v + npv
+            npv = npv * v + cash_flows[:, t]
+        return npv, -dnpv_dv * v * v
+    
+    n = cash_flows.shape[0]
+    lo = np.full(n, -0.99)
+    hi = np.full(n, 10.0)
+    f_lo, _ = npv_and_slope(lo)
+    f_hi, _ = npv_and_slope(hi)
+    has_root = np.sign(f_lo) * np.sign(f_hi) < 0
+    
+    rate = np.full(n, 0.1)
+    fell_back = np.zeros(n, dtype=bool)
+    converged = np.zeros(n, dtype=bool)
+    for _ in range(max_iter):
+        npv, slope = npv_and_slope(rate)
+        previous = rate
+        
+        # Shrink the bracket to whichever side still contains the sign change
+        on_lo_side = np.sign(npv) == np.sign(f_lo)
+        lo = np.where(on_lo_side, rate, lo)
+        f_lo = np.where(on_lo_side, npv, f_lo)
+        hi = np.where(on_lo_side, hi, rate)
+        f_hi = np.where(on_lo_side, f_hi, npv)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = rate - npv / slope
+            # False position before bisection: when Newton overshoots a bracket end
+            # that already sits on the root, it lands next to the root at once.
+            # Alternating with bisection keeps the bracket shrinking when it stalls.
+            false_position = (lo * f_hi - hi * f_lo) / (f_hi - f_lo)
+        in_bracket = np.isfinite(newton) & (newton > lo) & (newton < hi)
+        use_false_position = ~fell_back & np.isfinite(false_position)
+        fallback = np.where(use_false_position, false_position, 0.5 * (lo + hi))
+        next_rate = np.where(in_bracket, newton, fallback)
+        fell_back = ~in_bracket
+        
+        # Converged rows stop moving, so each row's result is independent of
+        # the other rows in the batch (and of how a sweep is chunked)
+        # A short false-position step can just be a stalled bracket end, so only
+        # a short Newton step or a collapsed bracket counts as converged
+        rate = np.where(converged, rate, next_rate)
+        scale = tol * (1 + np.abs(previous))
+        converged |= (in_bracket & (np.abs(next_rate - previous) <= scale)) | (hi - lo <= scale)
+        if np.all(converged | ~has_root):
+            break
+    
+    return np.where(has_root, rate, np.nan)
+
+
+@timed
 def analyze_debt_optimization(base_inputs: PropertyInputs) -> pd.DataFrame:
     """Analyze IRR across different leverage levels"""
     results = []
@@ -352,8 +1031,7 @@ def analyze_debt_optimization(base_inputs: PropertyInputs) -> pd.DataFrame:
     # Test leverage from 0% to 90% in 5% increments
     for ltv in np.arange(0.0, 0.95, 0.05):
         # Create modified inputs with different leverage
-        test_inputs = PropertyInputs(**asdict(base_inputs))
-        test_inputs.down_payment_pct = 1 - ltv
+        test_inputs = base_inputs.with_overrides(down_payment_pct=1 - ltv)
         
         # Skip if down payment is less than minimum
         if test_inputs.down_payment_pct < 0.05:
@@ -376,7 +1054,7 @@ def analyze_debt_optimization(base_inputs: PropertyInputs) -> pd.DataFrame:
                 'After_Tax_EM': returns['after_tax_equity_multiple'],
                 'Year1_DSCR': returns['year1_dscr'],
                 'After_Tax_CoC': returns['year1_after_tax_coc'] * 100,
-                'Debt_Service': test_inputs.annual_debt_service
+                'Debt_Service': test_inputs.year1_debt_service
             })
         except:
             # Skip if calculation fails (e.g., negative cash flow)
@@ -385,8 +1063,22 @@ def analyze_debt_optimization(base_inputs: PropertyInputs) -> pd.DataFrame:
     return pd.DataFrame(results)
 
 
-def generate_pdf_report(inputs: PropertyInputs, returns: Dict, pro_forma: pd.DataFrame) -> bytes:
-    """Generate PDF executive summary report"""
+@timed
+def analyze_exit_years(base_inputs: PropertyInputs, max_exit_year: int) -> pd.DataFrame:
+    """Returns for every exit year from 1 to max_exit_year from a single pro forma"""
+    analyzer = CREAnalyzer(base_inputs.with_overrides(hold_period_years=max_exit_year))
+    analyzer.calculate_pro_forma()
+    return analyzer.calculate_exit_year_returns()
+
+
+@timed
+def generate_pdf_report(inputs: PropertyInputs, returns: InvestmentReturns, pro_forma: ProForma,
+                        generated_on: Optional[date] = None) -> bytes:
+    """Generate PDF executive summary report
+    
+    With generated_on the footer shows that date only, so the bytes are the
+    same all day and can be cached; otherwise it shows the current time.
+    """
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter,
                            topMargin=0.5*inch, bottomMargin=0.5*inch,
@@ -453,7 +1145,7 @@ def generate_pdf_report(inputs: PropertyInputs, returns: Dict, pro_forma: pd.Dat
         ['LTV', f"{(1-inputs.down_payment_pct)*100:.1f}%"],
         ['Interest Rate', f"{inputs.interest_rate*100:.2f}%"],
         ['Loan Term', f"{inputs.loan_term_years} years"],
-        ['Annual Debt Service', f"${inputs.annual_debt_service:,.0f}"],
+        ['Annual Debt Service', f"${inputs.year1_debt_service:,.0f}"],
     ]
     
     financing_table = Table(financing_data, colWidths=[3*inch, 2*inch])
@@ -553,7 +1245,11 @@ def generate_pdf_report(inputs: PropertyInputs, returns: Dict, pro_forma: pd.Dat
         alignment=TA_CENTER
     )
     elements.append(Spacer(1, 0.2*inch))
-    elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", footer_style))
+    if generated_on is None:
+        stamp = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+    else:
+        stamp = generated_on.strftime('%B %d, %Y')
+    elements.append(Paragraph(f"Generated on {stamp}", footer_style))
     elements.append(Paragraph("Commercial Real Estate Investment Analyzer", footer_style))
     
     # Build PDF
@@ -597,13 +1293,35 @@ def save_scenario(inputs: PropertyInputs, scenario_name: str, filename: Optional
     return filename
 
 
+# Parsed scenario files kept in memory, keyed by path and modification stamp
+SCENARIO_FILE_MEMO_SIZE = 256
+
+
+@functools.lru_cache(maxsize=SCENARIO_FILE_MEMO_SIZE)
+def _parse_scenario_file(filename: str, mtime_ns: int, size: int) -> Dict:
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def read_scenario_file(filename: str) -> Dict:
+    """Parsed scenario JSON, memoized until the file changes (treat as read-only)"""
+    stat = os.stat(filename)
+    return _parse_scenario_file(str(filename), stat.st_mtime_ns, stat.st_size)
+
+
 def load_scenario(filename: str) -> Tuple[str, PropertyInputs]:
     """Load scenario from JSON file"""
-    with open(filename, 'r') as f:
-        scenario_data = json.load(f)
+    scenario_data = read_scenario_file(filename)
     
     scenario_name = scenario_data.get('name', 'Unnamed Scenario')
-    inputs_dict = scenario_data['inputs']
+    inputs = inputs_from_dict(scenario_data['inputs'])
+    
+    return scenario_name, inputs
+
+
+def inputs_from_dict(inputs_dict: Dict) -> PropertyInputs:
+    """PropertyInputs from the saved-scenario dict layout (tenants as dicts)"""
+    inputs_dict = dict(inputs_dict)
     
     # Convert tenant dicts to Tenant objects if present
     if 'tenants' in inputs_dict and inputs_dict['tenants']:
@@ -612,9 +1330,93 @@ def load_scenario(filename: str) -> Tuple[str, PropertyInputs]:
         inputs_dict['tenants'] = []
     
     # Convert dict to PropertyInputs
-    inputs = PropertyInputs(**inputs_dict)
+    return PropertyInputs(**inputs_dict)
+
+
+REQUIRED_INPUT_FIELDS = tuple(
+    f.name for f in fields(PropertyInputs) if f.default is MISSING and f.default_factory is MISSING
+)
+
+TENANT_FIELDS = {f.name: f.type for f in fields(Tenant)}
+
+
+# Whole-year inputs and the most the sidebar allows for each
+INTEGER_INPUT_LIMITS = {'loan_term_years': 30, 'depreciation_period': 50, 'hold_period_years': 30}
+
+# Inputs the engine divides by, so zero or below has no meaning
+POSITIVE_INPUT_FIELDS = ('building_size', 'purchase_price', 'exit_cap_rate')
+
+
+def _check_number(value, where: str):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{where} must be a finite number, got {value!r}")
+
+
+def inputs_from_document(document) -> Tuple[str, PropertyInputs]:
+    """Scenario name and inputs from a save_scenario document or a bare inputs dict
+    
+    Checks field names, value types and ranges (validate_inputs) first, so
+    malformed JSON from other tools is rejected with a ValueError naming the
+    problem instead of failing inside the engine. Values are not converted, so a saved scenario gets the
+    same fingerprint (and cache entries) as it does in the app.
+    """
+    if not isinstance(document, dict):
+        raise ValueError("Scenario must be a JSON object")
+    name = 'Unnamed Scenario'
+    if 'inputs' in document:
+        name = str(document.get('name', name))
+        document = document['inputs']
+        if not isinstance(document, dict):
+            raise ValueError("'inputs' must be a JSON object")
+    
+    unknown = document.keys() - INPUT_FIELD_NAMES
+    if unknown:
+        raise ValueError(f"Unknown input field(s): {', '.join(sorted(unknown))}")
+    missing = [field_name for field_name in REQUIRED_INPUT_FIELDS if field_name not in document]
+    if missing:
+        raise ValueError(f"Missing input field(s): {', '.join(missing)}")
+    for field_name in NUMERIC_INPUT_FIELDS:
+        _check_number(document[field_name], field_name)
+    for flag in ('use_detailed_tenants', 'use_monthly_periods'):
+        if not isinstance(document.get(flag, False), bool):
+            raise ValueError(f"{flag} must be true or false")
+    
+    tenants = document.get('tenants') or []
+    if not isinstance(tenants, list):
+        raise ValueError("tenants must be a list")
+    for i, tenant in enumerate(tenants):
+        if not isinstance(tenant, dict) or tenant.keys() != TENANT_FIELDS.keys():
+            raise ValueError(f"tenants[{i}] must have exactly the fields {', '.join(TENANT_FIELDS)}")
+        for field_name, field_type in TENANT_FIELDS.items():
+            if field_type in (str, 'str'):
+                if not isinstance(tenant[field_name], str):
+                    raise ValueError(f"tenants[{i}].{field_name} must be a string")
+            else:
+                _check_number(tenant[field_name], f"tenants[{i}].{field_name}")
     
-    return scenario_name, inputs
+    inputs = inputs_from_dict(document)
+    validate_inputs(inputs)
+    return name, inputs
+
+
+def validate_inputs(inputs: PropertyInputs):
+    """Raise ValueError naming the first input outside the range the engine supports
+    
+    The sidebar enforces these limits in the app. Scenarios from other tools
+    (the HTTP service, the async API) are checked here, so a bad value is
+    refused up front instead of failing in the engine or, for a huge hold
+    period, allocating without bound.
+    """
+    for field_name, limit in INTEGER_INPUT_LIMITS.items():
+        value = getattr(inputs, field_name)
+        if not float(value).is_integer() or not 1 <= value <= limit:
+            raise ValueError(f"{field_name} must be a whole number from 1 to {limit}, got {value!r}")
+    for field_name in POSITIVE_INPUT_FIELDS:
+        value = getattr(inputs, field_name)
+        if not value > 0:
+            raise ValueError(f"{field_name} must be positive, got {value!r}")
+    if not 0 < inputs.down_payment_pct <= 1:
+        raise ValueError(f"down_payment_pct must be above 0 and at most 1, got {inputs.down_payment_pct!r}")
 
 
 def get_saved_scenarios() -> List[str]:
@@ -627,261 +1429,350 @@ def get_saved_scenarios() -> List[str]:
     return sorted([str(f) for f in scenario_files], reverse=True)
 
 
+# Bump whenever a change to the projection or returns math alters results.
+# Persisted cache entries written by other engine versions are never served.
+ENGINE_VERSION = "2"
+
+
+def amortized_balance(principal, rate, payment, payments_made):
+    """Loan balance after payments_made level payments, in closed form (rate per period)"""
+    return principal * (1 + rate) ** payments_made - payment * annuity_factor(rate, payments_made)
+
+
+def with_year_zero(year_zero, values: np.ndarray) -> np.ndarray:
+    """Prepend a year-0 entry along the period (last) axis"""
+    first = np.broadcast_to(year_zero, values.shape[:-1] + (1,))
+    return np.concatenate([first, values], axis=-1)
+
+
+def value_at_year(column: np.ndarray, years) -> np.ndarray:
+    """column[years] for one scenario, or each row's own year for a (scenarios x years) batch"""
+    if column.ndim == 1:
+        return column[years]
+    return np.take_along_axis(column, np.reshape(years, (-1, 1)), axis=-1)[:, 0]
+
+
 class CREAnalyzer:
     """Commercial Real Estate Investment Analyzer"""
     
     def __init__(self, inputs: PropertyInputs):
         self.inputs = inputs
         self.pro_forma = None
+        self.monthly_schedule = None
         self.returns = None
         
-    def calculate_pro_forma(self) -> pd.DataFrame:
+    def calculate_pro_forma(self) -> ProForma:
         """Generate 10-year pro forma operating statement"""
-        years = range(0, self.inputs.hold_period_years + 1)
-        data = []
+        if self.inputs.use_monthly_periods:
+            columns = self._monthly_pro_forma_columns()
+        else:
+            columns = self._annual_pro_forma_columns()
         
-        # Calculate depreciable basis (building value only, excluding land)
-        depreciable_basis = self.inputs.purchase_price * (1 - self.inputs.land_value_pct)
-        annual_depreciation = depreciable_basis / self.inputs.depreciation_period
+        self.pro_forma = ProForma.from_columns(columns)
+        return self.pro_forma
+    
+    def _tenant_rent_roll(self, years: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Gross rental income and occupied SF per operating year from the tenant list"""
+        inputs = self.inputs
+        growth = (1 + inputs.rent_growth_rate) ** (years - 1)
+        gross_rental_income = np.zeros_like(growth)
+        occupied_sf = np.zeros_like(growth)
         
-        # Track cumulative principal paid for loan balance calculation
-        remaining_balance = self.inputs.loan_amount
+        for tenant in inputs.tenants:
+            # Expired leases are re-let at market after 6 months vacancy
+            share = np.where(years <= tenant.lease_expiration_year, 1.0, 0.5)
+            gross_rental_income += tenant.square_feet * tenant.annual_rent_psf * growth * share
+            occupied_sf += tenant.square_feet * share
         
-        for year in years:
-            year_data = {'Year': year}
-            
-            # Revenue calculations
-            if self.inputs.use_detailed_tenants and self.inputs.tenants:
-                # Tenant-by-tenant revenue calculation
-                if year == 0:
-                    gross_rental_income = 0
-                    occupied_sf = 0
-                    rent_psf = 0
-                else:
-                    gross_rental_income = 0
-                    occupied_sf = 0
-                    
-                    for tenant in self.inputs.tenants:
-                        # Check if lease has expired
-                        if year <= tenant.lease_expiration_year:
-                            # Tenant still in place
-                            tenant_rent = tenant.annual_rent * ((1 + self.inputs.rent_growth_rate) ** (year - 1))
-                            gross_rental_income += tenant_rent
-                            occupied_sf += tenant.square_feet
-                        else:
-                            # Lease expired - assume re-leased at market after 6 months vacancy
-                            market_rent = tenant.annual_rent_psf * ((1 + self.inputs.rent_growth_rate) ** (year - 1))
-                            # 50% of year vacant, 50% at market
-                            tenant_rent = tenant.square_feet * market_rent * 0.5
-                            gross_rental_income += tenant_rent
-                            occupied_sf += tenant.square_feet * 0.5
-                    
-                    # Calculate weighted average rent
-                    rent_psf = gross_rental_income / occupied_sf if occupied_sf > 0 else 0
-                
-                other_income = gross_rental_income * self.inputs.other_income_pct
-                total_revenue = gross_rental_income + other_income
-            else:
-                # Simple single-tenant/blended calculation
-                if year == 0:
-                    rent_psf = 0
-                    occupancy = 0
-                    occupied_sf = 0
-                elif year == 1:
-                    rent_psf = self.inputs.annual_rent_psf
-                    occupancy = self.inputs.year1_occupancy
-                    occupied_sf = self.inputs.building_size * occupancy
-                else:
-                    rent_psf = self.inputs.annual_rent_psf * ((1 + self.inputs.rent_growth_rate) ** (year - 1))
-                    occupancy = self.inputs.stabilized_occupancy
-                    occupied_sf = self.inputs.building_size * occupancy
-                
-                gross_rental_income = occupied_sf * rent_psf
-                other_income = gross_rental_income * self.inputs.other_income_pct
-                total_revenue = gross_rental_income + other_income
-            
-            # Operating Expenses (Reimbursed)
-            if year == 0:
-                property_taxes = 0
-                insurance = 0
-                cam = 0
-            else:
-                growth_factor = (1 + self.inputs.rent_growth_rate) ** (year - 1)
-                property_taxes = self.inputs.building_size * self.inputs.property_tax_psf * growth_factor
-                insurance = self.inputs.building_size * self.inputs.insurance_psf * growth_factor
-                cam = self.inputs.building_size * self.inputs.cam_psf * growth_factor
-            
-            total_reimbursable = property_taxes + insurance + cam
-            
-            # Landlord Expenses
-            if year == 0:
-                property_mgmt = 0
-                leasing_commission = 0
-                repairs = 0
-            else:
-                property_mgmt = total_revenue * self.inputs.property_mgmt_pct
-                leasing_commission = total_revenue * self.inputs.leasing_commission_pct
-                repairs = self.inputs.repairs_maintenance
-            
-            total_landlord_exp = property_mgmt + leasing_commission + repairs
-            
-            # NOI
-            noi = total_revenue - total_landlord_exp
-            
-            # Capital Expenditures
-            if year == 0:
-                ti = self.inputs.initial_ti
-                capex_reserve = 0
-            else:
-                ti = 0
-                capex_reserve = self.inputs.building_size * self.inputs.capex_reserve_psf
-            
-            total_capex = ti + capex_reserve
-            
-            # Debt Service and Amortization
-            if year == 0:
-                debt_service = 0
-                interest_expense = 0
-                principal_payment = 0
-            else:
-                debt_service = self.inputs.annual_debt_service
-                # Calculate interest on remaining balance
-                interest_expense = remaining_balance * self.inputs.interest_rate
-                principal_payment = debt_service - interest_expense
-                # Update remaining balance for next year
-                remaining_balance -= principal_payment
-            
-            # Tax Calculations
-            if year == 0:
-                depreciation = 0
-                taxable_income = 0
-                tax_liability = 0
-            else:
-                depreciation = annual_depreciation
-                # Taxable Income = NOI - Interest - Depreciation
-                taxable_income = noi - interest_expense - depreciation
-                # Tax only on positive taxable income
-                tax_liability = max(0, taxable_income * self.inputs.tax_rate)
-            
-            # Cash Flow Calculations
-            pre_tax_cash_flow = noi - debt_service - total_capex
-            after_tax_cash_flow = pre_tax_cash_flow - tax_liability
-            
-            # Debt metrics
-            if year > 0 and debt_service > 0:
-                dscr = noi / debt_service
-                pre_tax_coc = pre_tax_cash_flow / self.inputs.equity_required
-                after_tax_coc = after_tax_cash_flow / self.inputs.equity_required
-            else:
-                dscr = 0
-                pre_tax_coc = 0
-                after_tax_coc = 0
-            
-            year_data.update({
-                'Rent_PSF': rent_psf,
-                'Occupancy': occupancy,
-                'Occupied_SF': occupied_sf,
-                'Gross_Rental_Income': gross_rental_income,
-                'Other_Income': other_income,
-                'Total_Revenue': total_revenue,
-                'Property_Taxes': property_taxes,
-                'Insurance': insurance,
-                'CAM': cam,
-                'Total_Reimbursable': total_reimbursable,
-                'Property_Management': property_mgmt,
-                'Leasing_Commission': leasing_commission,
-                'Repairs_Maintenance': repairs,
-                'Total_Landlord_Expenses': total_landlord_exp,
-                'NOI': noi,
-                'Initial_TI': ti,
-                'CapEx_Reserve': capex_reserve,
-                'Total_CapEx': total_capex,
-                'Debt_Service': debt_service,
-                'Interest_Expense': interest_expense,
-                'Principal_Payment': principal_payment,
-                'Loan_Balance': remaining_balance,
-                'Depreciation': depreciation,
-                'Taxable_Income': taxable_income,
-                'Tax_Liability': tax_liability,
-                'Pre_Tax_Cash_Flow': pre_tax_cash_flow,
-                'After_Tax_Cash_Flow': after_tax_cash_flow,
-                'DSCR': dscr,
-                'Pre_Tax_CoC': pre_tax_coc,
-                'After_Tax_CoC': after_tax_coc
-            })
-            
-            data.append(year_data)
+        return gross_rental_income, occupied_sf
+    
+    def _annual_pro_forma_columns(self) -> Dict[str, np.ndarray]:
+        """Project the pro forma one year per period"""
+        inputs = self.inputs
+        hold = int(np.max(inputs.hold_period_years))
+        years = np.arange(0, hold + 1)
+        operating = years > 0
+        growth = np.where(operating, (1 + inputs.rent_growth_rate) ** (years - 1), 0.0)
         
-        self.pro_forma = pd.DataFrame(data)
-        return self.pro_forma
+        # Revenue
+        if inputs.use_detailed_tenants and inputs.tenants:
+            gross_rental_income, occupied_sf = self._tenant_rent_roll(years)
+            gross_rental_income = np.where(operating, gross_rental_income, 0.0)
+            occupied_sf = np.where(operating, occupied_sf, 0.0)
+            rent_psf = np.divide(gross_rental_income, occupied_sf, out=np.zeros_like(gross_rental_income), where=occupied_sf > 0)
+            occupancy = occupied_sf / inputs.building_size
+        else:
+            rent_psf = inputs.annual_rent_psf * growth
+            occupancy = np.where(years == 1, inputs.year1_occupancy, inputs.stabilized_occupancy)
+            occupancy = np.where(operating, occupancy, 0.0)
+            occupied_sf = inputs.building_size * occupancy
+            gross_rental_income = occupied_sf * rent_psf
+        
+        other_income = gross_rental_income * inputs.other_income_pct
+        total_revenue = gross_rental_income + other_income
+        
+        # Operating Expenses (Reimbursed)
+        property_taxes = inputs.building_size * inputs.property_tax_psf * growth
+        insurance = inputs.building_size * inputs.insurance_psf * growth
+        cam = inputs.building_size * inputs.cam_psf * growth
+        
+        # Landlord Expenses
+        property_mgmt = total_revenue * inputs.property_mgmt_pct
+        leasing_commission = total_revenue * inputs.leasing_commission_pct
+        repairs = np.where(operating, inputs.repairs_maintenance, 0.0)
+        
+        # Capital Expenditures
+        ti = np.where(operating, 0.0, inputs.initial_ti)
+        capex_reserve = np.where(operating, inputs.building_size * inputs.capex_reserve_psf, 0.0)
+        
+        # Debt Service and Amortization: balance after y annual payments in closed form,
+        # with payments stopping once the loan matures inside the hold period
+        rate = inputs.interest_rate
+        term = inputs.loan_term_years
+        annual_debt_service = inputs.annual_debt_service
+        payments_made = np.minimum(years, term)
+        loan_balance = np.where(payments_made >= term, 0.0,
+                                amortized_balance(inputs.loan_amount, rate, annual_debt_service, payments_made))
+        debt_service = np.where(operating & (years <= term), annual_debt_service, 0.0)
+        interest_expense = np.zeros_like(loan_balance)
+        interest_expense[..., 1:] = loan_balance[..., :-1] * rate
+        
+        columns = self._finish_pro_forma_columns(
+            years=years,
+            rent_psf=rent_psf,
+            occupancy=occupancy,
+            occupied_sf=occupied_sf,
+            gross_rental_income=gross_rental_income,
+            other_income=other_income,
+            total_revenue=total_revenue,
+            property_taxes=property_taxes,
+            insurance=insurance,
+            cam=cam,
+            property_mgmt=property_mgmt,
+            leasing_commission=leasing_commission,
+            repairs=repairs,
+            ti=ti,
+            capex_reserve=capex_reserve,
+            debt_service=debt_service,
+            interest_expense=interest_expense,
+            principal_payment=debt_service - interest_expense,
+            loan_balance=loan_balance
+        )
+        return columns
     
-    def calculate_returns(self) -> Dict:
-        """Calculate investment returns and exit analysis"""
-        if self.pro_forma is None:
-            self.calculate_pro_forma()
+    def _finish_pro_forma_columns(self, years: np.ndarray, **lines: np.ndarray) -> Dict[str, np.ndarray]:
+        """Derive NOI, taxes, cash flows and ratios from projected revenue, expense and debt lines"""
+        inputs = self.inputs
+        operating = years > 0
         
-        # Exit value calculation
-        final_year = self.inputs.hold_period_years
-        year_after_noi = self.pro_forma.loc[final_year, 'NOI'] * (1 + self.inputs.rent_growth_rate)
+        total_reimbursable = lines['property_taxes'] + lines['insurance'] + lines['cam']
+        total_landlord_exp = lines['property_mgmt'] + lines['leasing_commission'] + lines['repairs']
+        noi = lines['total_revenue'] - total_landlord_exp
+        total_capex = lines['ti'] + lines['capex_reserve']
+        debt_service = lines['debt_service']
+        
+        # Tax Calculations (Taxable Income = NOI - Interest - Depreciation, tax only on positive income)
+        depreciable_basis = inputs.purchase_price * (1 - inputs.land_value_pct)
+        depreciation = np.where(operating, depreciable_basis / inputs.depreciation_period, 0.0)
+        taxable_income = np.where(operating, noi - lines['interest_expense'] - depreciation, 0.0)
+        tax_liability = clip_below(taxable_income * inputs.tax_rate, 0.0)
+        
+        # Cash Flow Calculations
+        pre_tax_cash_flow = noi - debt_service - total_capex
+        after_tax_cash_flow = pre_tax_cash_flow - tax_liability
+        
+        # Debt metrics
+        has_debt = operating & (debt_service > 0)
+        safe_debt_service = np.where(has_debt, debt_service, 1.0)
+        dscr = np.where(has_debt, noi / safe_debt_service, 0.0)
+        pre_tax_coc = np.where(has_debt, pre_tax_cash_flow / inputs.equity_required, 0.0)
+        after_tax_coc = np.where(has_debt, after_tax_cash_flow / inputs.equity_required, 0.0)
+        
+        return {
+            'Year': years,
+            'Rent_PSF': lines['rent_psf'],
+            'Occupancy': lines['occupancy'],
+            'Occupied_SF': lines['occupied_sf'],
+            'Gross_Rental_Income': lines['gross_rental_income'],
+            'Other_Income': lines['other_income'],
+            'Total_Revenue': lines['total_revenue'],
+            'Property_Taxes': lines['property_taxes'],
+            'Insurance': lines['insurance'],
+            'CAM': lines['cam'],
+            'Total_Reimbursable': total_reimbursable,
+            'Property_Management': lines['property_mgmt'],
+            'Leasing_Commission': lines['leasing_commission'],
+            'Repairs_Maintenance': lines['repairs'],
+            'Total_Landlord_Expenses': total_landlord_exp,
+            'NOI': noi,
+            'Initial_TI': lines['ti'],
+            'CapEx_Reserve': lines['capex_reserve'],
+            'Total_CapEx': total_capex,
+            'Debt_Service': debt_service,
+            'Interest_Expense': lines['interest_expense'],
+            'Principal_Payment': lines['principal_payment'],
+            'Loan_Balance': lines['loan_balance'],
+            'Depreciation': depreciation,
+            'Taxable_Income': taxable_income,
+            'Tax_Liability': tax_liability,
+            'Pre_Tax_Cash_Flow': pre_tax_cash_flow,
+            'After_Tax_Cash_Flow': after_tax_cash_flow,
+            'DSCR': dscr,
+            'Pre_Tax_CoC': pre_tax_coc,
+            'After_Tax_CoC': after_tax_coc
+        }
+    
+    def calculate_monthly_schedule(self) -> Dict[str, np.ndarray]:
+        """Project operations and debt month by month over the hold period
+        
+        Occupancy leases up linearly from year-1 occupancy to stabilized occupancy
+        over the first 12 months. Rents and expenses escalate on each anniversary.
+        The loan amortizes monthly and is fully repaid at the end of its term.
+        """
+        inputs = self.inputs
+        hold = int(np.max(inputs.hold_period_years))
+        n_months = hold * 12
+        month = np.arange(1, n_months + 1)
+        year = (month - 1) // 12 + 1
+        growth = (1 + inputs.rent_growth_rate) ** (year - 1)
+        
+        # Revenue
+        if inputs.use_detailed_tenants and inputs.tenants:
+            annual_income, annual_occupied = self._tenant_rent_roll(np.arange(1, hold + 1))
+            gross_rental_income = annual_income[..., year - 1] / 12
+            occupied_sf = annual_occupied[..., year - 1]
+            occupancy = occupied_sf / inputs.building_size
+        else:
+            lease_up = np.minimum(month - 1, 12) / 12
+            occupancy = inputs.year1_occupancy + (inputs.stabilized_occupancy - inputs.year1_occupancy) * lease_up
+            occupied_sf = inputs.building_size * occupancy
+            gross_rental_income = occupied_sf * inputs.annual_rent_psf * growth / 12
+        
+        other_income = gross_rental_income * inputs.other_income_pct
+        total_revenue = gross_rental_income + other_income
+        
+        # Operating expenses (reimbursed and landlord)
+        property_taxes = inputs.building_size * inputs.property_tax_psf * growth / 12
+        insurance = inputs.building_size * inputs.insurance_psf * growth / 12
+        cam = inputs.building_size * inputs.cam_psf * growth / 12
+        property_mgmt = total_revenue * inputs.property_mgmt_pct
+        leasing_commission = total_revenue * inputs.leasing_commission_pct
+        repairs = np.zeros(n_months) + inputs.repairs_maintenance / 12
+        total_landlord_exp = property_mgmt + leasing_commission + repairs
+        noi = total_revenue - total_landlord_exp
+        capex_reserve = np.zeros(n_months) + inputs.building_size * inputs.capex_reserve_psf / 12
+        
+        # Exact monthly amortization: balance after k payments in closed form
+        monthly_rate = inputs.interest_rate / 12
+        term_months = inputs.loan_term_years * 12
+        payment = inputs.monthly_debt_service
+        payments_made = np.minimum(np.arange(0, n_months + 1), term_months)
+        # Exactly zero once repaid (the closed form leaves round-off there); no clipping elsewhere,
+        # so complex-step tangents stay on the smooth branch
+        balance = np.where(payments_made >= term_months, 0.0,
+                           amortized_balance(inputs.loan_amount, monthly_rate, payment, payments_made))
+        in_term = month <= term_months
+        debt_service = np.where(in_term, payment, 0.0)
+        interest_expense = np.where(in_term, balance[..., :-1] * monthly_rate, 0.0)
+        principal_payment = debt_service - interest_expense
+        
+        return {
+            'Month': month,
+            'Year': year,
+            'Occupancy': occupancy,
+            'Occupied_SF': occupied_sf,
+            'Gross_Rental_Income': gross_rental_income,
+            'Other_Income': other_income,
+            'Total_Revenue': total_revenue,
+            'Property_Taxes': property_taxes,
+            'Insurance': insurance,
+            'CAM': cam,
+            'Property_Management': property_mgmt,
+            'Leasing_Commission': leasing_commission,
+            'Repairs_Maintenance': repairs,
+            'Total_Landlord_Expenses': total_landlord_exp,
+            'NOI': noi,
+            'CapEx_Reserve': capex_reserve,
+            'Debt_Service': debt_service,
+            'Interest_Expense': interest_expense,
+            'Principal_Payment': principal_payment,
+            'Loan_Balance': balance[..., 1:]
+        }
+    
+    def _monthly_pro_forma_columns(self) -> Dict[str, np.ndarray]:
+        """Roll the monthly schedule up to the annual pro forma layout"""
+        inputs = self.inputs
+        hold = int(np.max(inputs.hold_period_years))
+        monthly = self.calculate_monthly_schedule()
+        self.monthly_schedule = monthly
+        
+        def by_year(column: str) -> np.ndarray:
+            values = monthly[column]
+            return values.reshape(values.shape[:-1] + (hold, 12))
         
-        gross_sale_price = year_after_noi / self.inputs.exit_cap_rate
-        sale_costs = gross_sale_price * self.inputs.sale_costs_pct
+        def annual_sum(column: str) -> np.ndarray:
+            return with_year_zero(0.0, by_year(column).sum(axis=-1))
+        
+        def annual_mean(column: str) -> np.ndarray:
+            return with_year_zero(0.0, by_year(column).mean(axis=-1))
+        
+        years = np.arange(0, hold + 1)
+        gross_rental_income = annual_sum('Gross_Rental_Income')
+        occupied_sf = annual_mean('Occupied_SF')
+        
+        return self._finish_pro_forma_columns(
+            years=years,
+            rent_psf=np.divide(gross_rental_income, occupied_sf, out=np.zeros_like(gross_rental_income), where=occupied_sf > 0),
+            occupancy=annual_mean('Occupancy'),
+            occupied_sf=occupied_sf,
+            gross_rental_income=gross_rental_income,
+            other_income=annual_sum('Other_Income'),
+            total_revenue=annual_sum('Total_Revenue'),
+            property_taxes=annual_sum('Property_Taxes'),
+            insurance=annual_sum('Insurance'),
+            cam=annual_sum('CAM'),
+            property_mgmt=annual_sum('Property_Management'),
+            leasing_commission=annual_sum('Leasing_Commission'),
+            repairs=annual_sum('Repairs_Maintenance'),
+            ti=np.where(years == 0, inputs.initial_ti, 0.0),
+            capex_reserve=annual_sum('CapEx_Reserve'),
+            debt_service=annual_sum('Debt_Service'),
+            interest_expense=annual_sum('Interest_Expense'),
+            principal_payment=annual_sum('Principal_Payment'),
+            loan_balance=with_year_zero(inputs.loan_amount, monthly['Loan_Balance'][..., 11::12])
+        )
+    
+    def _sale_proceeds(self, exit_years: Union[int, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Sale price, loan payoff, taxes and net cash for a sale at the end of each exit year"""
+        pro_forma = self.pro_forma
+        inputs = self._scenario_inputs()
+        
+        year_after_noi = value_at_year(pro_forma['NOI'], exit_years) * (1 + inputs.rent_growth_rate)
+        gross_sale_price = year_after_noi / inputs.exit_cap_rate
+        sale_costs = gross_sale_price * inputs.sale_costs_pct
         net_sale_proceeds = gross_sale_price - sale_costs
         
         # Loan balance at exit (from pro forma tracking)
-        loan_balance = self.pro_forma.loc[final_year, 'Loan_Balance']
+        loan_balance = value_at_year(pro_forma['Loan_Balance'], exit_years)
         
         # Calculate tax on sale
         # Capital Gain = Sale Price - Original Basis
-        original_basis = self.inputs.purchase_price
+        original_basis = inputs.purchase_price
         capital_gain = gross_sale_price - original_basis
         
-        # Depreciation Recapture
-        total_depreciation = self.pro_forma.loc[1:final_year, 'Depreciation'].sum()
+        # Depreciation Recapture (depreciation taken through the exit year; year 0 has none)
+        total_depreciation = value_at_year(np.cumsum(pro_forma['Depreciation'], axis=-1), exit_years)
         depreciation_recapture = total_depreciation
         
         # Tax on sale (simplified: depreciation recapture at 25%, capital gains at ordinary rate)
         depreciation_recapture_tax = depreciation_recapture * 0.25
-        capital_gains_tax = (capital_gain - depreciation_recapture) * self.inputs.tax_rate
+        capital_gains_tax = (capital_gain - depreciation_recapture) * inputs.tax_rate
         total_tax_on_sale = depreciation_recapture_tax + capital_gains_tax
         
         # Net cash from sale (after paying off loan and taxes)
         net_cash_from_sale = net_sale_proceeds - loan_balance - total_tax_on_sale
         
-        # Pre-Tax Return calculations
-        pre_tax_total_cash_flow = self.pro_forma.loc[1:final_year, 'Pre_Tax_Cash_Flow'].sum()
-        pre_tax_cash_flows = [-self.inputs.equity_required]
-        pre_tax_cash_flows.extend(self.pro_forma.loc[1:final_year, 'Pre_Tax_Cash_Flow'].tolist())
-        pre_tax_cash_flows[-1] += (net_sale_proceeds - loan_balance)  # Pre-tax sale proceeds
-        
-        pre_tax_total_returned = pre_tax_total_cash_flow + (net_sale_proceeds - loan_balance)
-        pre_tax_profit = pre_tax_total_returned - self.inputs.equity_required
-        pre_tax_equity_multiple = pre_tax_total_returned / self.inputs.equity_required
-        pre_tax_avg_coc = self.pro_forma.loc[1:final_year, 'Pre_Tax_CoC'].mean()
-        pre_tax_irr = npf.irr(pre_tax_cash_flows)
-        pre_tax_npv = npf.npv(self.inputs.discount_rate, pre_tax_cash_flows)
-        
-        # After-Tax Return calculations
-        after_tax_total_cash_flow = self.pro_forma.loc[1:final_year, 'After_Tax_Cash_Flow'].sum()
-        after_tax_cash_flows = [-self.inputs.equity_required]
-        after_tax_cash_flows.extend(self.pro_forma.loc[1:final_year, 'After_Tax_Cash_Flow'].tolist())
-        after_tax_cash_flows[-1] += net_cash_from_sale  # After-tax sale proceeds
-        
-        after_tax_total_returned = after_tax_total_cash_flow + net_cash_from_sale
-        after_tax_profit = after_tax_total_returned - self.inputs.equity_required
-        after_tax_equity_multiple = after_tax_total_returned / self.inputs.equity_required
-        after_tax_avg_coc = self.pro_forma.loc[1:final_year, 'After_Tax_CoC'].mean()
-        after_tax_irr = npf.irr(after_tax_cash_flows)
-        after_tax_npv = npf.npv(self.inputs.discount_rate, after_tax_cash_flows)
-        
-        # Year 1 metrics
-        year1_noi = self.pro_forma.loc[1, 'NOI']
-        going_in_cap_rate = year1_noi / self.inputs.purchase_price
-        year1_dscr = self.pro_forma.loc[1, 'DSCR']
-        year1_pre_tax_coc = self.pro_forma.loc[1, 'Pre_Tax_CoC']
-        year1_after_tax_coc = self.pro_forma.loc[1, 'After_Tax_CoC']
-        
-        self.returns = {
+        return {
             'year_after_noi': year_after_noi,
             'gross_sale_price': gross_sale_price,
             'sale_costs': sale_costs,
@@ -892,22 +1783,180 @@ class CREAnalyzer:
             'capital_gains_tax': capital_gains_tax,
             'total_tax_on_sale': total_tax_on_sale,
             'net_cash_from_sale': net_cash_from_sale,
-            
-            # Pre-Tax Returns
-            'pre_tax_total_cash_flow': pre_tax_total_cash_flow,
-            'pre_tax_total_returned': pre_tax_total_returned,
-            'pre_tax_profit': pre_tax_profit,
-            'pre_tax_equity_multiple': pre_tax_equity_multiple,
-            'pre_tax_avg_coc': pre_tax_avg_coc,
-            'pre_tax_irr': pre_tax_irr,
-            'pre_tax_npv': pre_tax_npv,
-            
-            # After-Tax Returns
-            'after_tax_total_cash_flow': after_tax_total_cash_flow,
-            'after_tax_total_returned': after_tax_total_returned,
-            'after_tax_profit': after_tax_profit,
-            'after_tax_equity_multiple': after_tax_equity_multiple,
-            'after_tax_avg_coc': after_tax_avg_coc,
+        }
+    
+    def calculate_exit_year_returns(self) -> pd.DataFrame:
+        """IRR, equity multiple and sale proceeds for a sale at the end of every projected year
+        
+        Row h matches calculate_returns with hold_period_years = h: the operating
+        years of a shorter hold are a prefix of this pro forma, so every exit is
+        priced from one projection with cumulative sums.
+        """
+        if self.pro_forma is None:
+            self.calculate_pro_forma()
+        
+        pro_forma = self.pro_forma
+        equity = self.inputs.equity_required
+        exit_years = pro_forma.years[1:]
+        sale = self._sale_proceeds(exit_years)
+        
+        # Row h: -equity, operating cash flows through year h plus the sale, then zeros
+        in_hold = np.arange(len(pro_forma))[None, :] <= exit_years[:, None]
+        rows = np.arange(len(exit_years))
+        
+        pre_tax_cash_flows = np.where(in_hold, pro_forma['Pre_Tax_Cash_Flow'], 0.0)
+        pre_tax_cash_flows[:, 0] = -equity
+        pre_tax_cash_flows[rows, exit_years] += sale['net_sale_proceeds'] - sale['loan_balance']
+        
+        after_tax_cash_flows = np.where(in_hold, pro_forma['After_Tax_Cash_Flow'], 0.0)
+        after_tax_cash_flows[:, 0] = -equity
+        after_tax_cash_flows[rows, exit_years] += sale['net_cash_from_sale']
+        
+        pre_tax_total_returned = np.cumsum(pro_forma['Pre_Tax_Cash_Flow'][1:]) + sale['net_sale_proceeds'] - sale['loan_balance']
+        after_tax_total_returned = np.cumsum(pro_forma['After_Tax_Cash_Flow'][1:]) + sale['net_cash_from_sale']
+        
+        return pd.DataFrame({
+            'Exit_Year': exit_years,
+            'After_Tax_IRR': batch_irr(after_tax_cash_flows) * 100,
+            'Pre_Tax_IRR': batch_irr(pre_tax_cash_flows) * 100,
+            'After_Tax_EM': after_tax_total_returned / equity,
+            'Pre_Tax_EM': pre_tax_total_returned / equity,
+            'After_Tax_NPV': batch_npv(self.inputs.discount_rate, after_tax_cash_flows),
+            'Gross_Sale_Price': sale['gross_sale_price'],
+            'Loan_Balance': sale['loan_balance'],
+            'Total_Depreciation': sale['total_depreciation'],
+            'After_Tax_Sale_Proceeds': sale['net_cash_from_sale'],
+        })
+    
+    def calculate_returns(self) -> InvestmentReturns:
+        """Calculate investment returns and exit analysis"""
+        if self.pro_forma is None:
+            self.calculate_pro_forma()
+        
+        metrics, cash_flows = self._return_metrics()
+        self.returns = InvestmentReturns.from_metrics(metrics, cash_flows)
+        return self.returns
+    
+    def calculate_batch_returns(self) -> ReturnsBatch:
+        """Returns for stacked inputs (see stack_inputs), one batch entry per scenario"""
+        metrics, cash_flows = self.calculate_batch_metrics()
+        n_scenarios, n_years = cash_flows.shape
+        
+        # Periods after a scenario's own exit year are padding
+        final_year = self.inputs.hold_period_years[:, 0].astype(int)
+        cash_flows = np.where(np.arange(n_years) <= final_year[:, None], cash_flows, np.nan)
+        values = np.array([np.broadcast_to(metrics[name], (n_scenarios,)) for name in RETURN_METRICS])
+        return ReturnsBatch(values, cash_flows)
+    
+    def calculate_batch_metrics(self) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """Project stacked inputs and return per-scenario metric columns and equity cash flows
+        
+        Unlike calculate_batch_returns, values keep the inputs' dtype, so complex
+        inputs carry complex-step tangents through to every metric.
+        """
+        inputs = self.inputs
+        if inputs.use_monthly_periods:
+            columns = self._monthly_pro_forma_columns()
+        else:
+            columns = self._annual_pro_forma_columns()
+        
+        n_scenarios = len(inputs.purchase_price)
+        n_years = len(columns['Year'])
+        self.pro_forma = {
+            name: np.broadcast_to(column, (n_scenarios, n_years)) for name, column in columns.items()
+        }
+        return self._return_metrics()
+    
+    def _scenario_inputs(self) -> PropertyInputs:
+        """Inputs with one value per scenario (stacked (n, 1) columns flattened to (n,))"""
+        inputs = self.inputs
+        if np.ndim(inputs.purchase_price) < 2:
+            return inputs
+        return inputs.with_overrides(**{name: getattr(inputs, name)[:, 0] for name in NUMERIC_INPUT_FIELDS})
+    
+    def _return_metrics(self) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """Return metrics and after-tax equity cash flows from the projected pro forma
+        
+        Works along the last (year) axis, so it serves one scenario or a batch of
+        stacked scenarios with their own hold periods.
+        """
+        pro_forma = self.pro_forma
+        inputs = self._scenario_inputs()
+        equity = inputs.equity_required
+        
+        # Exit value calculation
+        final_year = np.asarray(inputs.hold_period_years).astype(int)
+        periods = np.arange(pro_forma['NOI'].shape[-1])
+        operating = (periods >= 1) & (periods <= final_year[..., None])
+        at_exit = periods == final_year[..., None]
+        sale = self._sale_proceeds(final_year)
+        net_sale_proceeds = sale['net_sale_proceeds']
+        loan_balance = sale['loan_balance']
+        net_cash_from_sale = sale['net_cash_from_sale']
+        
+        def hold_total(column: str) -> np.ndarray:
+            return np.where(operating, pro_forma[column], 0.0).sum(axis=-1)
+        
+        def equity_cash_flows(column: str, sale_cash: np.ndarray) -> np.ndarray:
+            flows = np.where(operating, pro_forma[column], 0.0)
+            flows[..., 0] = -equity
+            return flows + np.where(at_exit, np.expand_dims(sale_cash, -1), 0.0)
+        
+        if periods.size and np.ndim(pro_forma['NOI']) == 1:
+            irr = npf.irr
+            npv = npf.npv
+        else:
+            irr = batch_irr
+            npv = batch_npv
+        
+        # Pre-Tax Return calculations
+        pre_tax_total_cash_flow = hold_total('Pre_Tax_Cash_Flow')
+        pre_tax_cash_flows = equity_cash_flows('Pre_Tax_Cash_Flow', net_sale_proceeds - loan_balance)  # Pre-tax sale proceeds
+        
+        pre_tax_total_returned = pre_tax_total_cash_flow + (net_sale_proceeds - loan_balance)
+        pre_tax_profit = pre_tax_total_returned - equity
+        pre_tax_equity_multiple = pre_tax_total_returned / equity
+        pre_tax_avg_coc = hold_total('Pre_Tax_CoC') / final_year
+        pre_tax_irr = irr(pre_tax_cash_flows)
+        pre_tax_npv = npv(inputs.discount_rate, pre_tax_cash_flows)
+        
+        # After-Tax Return calculations
+        after_tax_total_cash_flow = hold_total('After_Tax_Cash_Flow')
+        after_tax_cash_flows = equity_cash_flows('After_Tax_Cash_Flow', net_cash_from_sale)  # After-tax sale proceeds
+        
+        after_tax_total_returned = after_tax_total_cash_flow + net_cash_from_sale
+        after_tax_profit = after_tax_total_returned - equity
+        after_tax_equity_multiple = after_tax_total_returned / equity
+        after_tax_avg_coc = hold_total('After_Tax_CoC') / final_year
+        after_tax_irr = irr(after_tax_cash_flows)
+        after_tax_npv = npv(inputs.discount_rate, after_tax_cash_flows)
+        
+        # Year 1 metrics
+        year1_noi = pro_forma['NOI'][..., 1]
+        going_in_cap_rate = year1_noi / inputs.purchase_price
+        year1_dscr = pro_forma['DSCR'][..., 1]
+        year1_pre_tax_coc = pro_forma['Pre_Tax_CoC'][..., 1]
+        year1_after_tax_coc = pro_forma['After_Tax_CoC'][..., 1]
+        
+        metrics = {
+            # Exit
+            **sale,
+            
+            # Pre-Tax Returns
+            'pre_tax_total_cash_flow': pre_tax_total_cash_flow,
+            'pre_tax_total_returned': pre_tax_total_returned,
+            'pre_tax_profit': pre_tax_profit,
+            'pre_tax_equity_multiple': pre_tax_equity_multiple,
+            'pre_tax_avg_coc': pre_tax_avg_coc,
+            'pre_tax_irr': pre_tax_irr,
+            'pre_tax_npv': pre_tax_npv,
+            
+            # After-Tax Returns
+            'after_tax_total_cash_flow': after_tax_total_cash_flow,
+            'after_tax_total_returned': after_tax_total_returned,
+            'after_tax_profit': after_tax_profit,
+            'after_tax_equity_multiple': after_tax_equity_multiple,
+            'after_tax_avg_coc': after_tax_avg_coc,
             'after_tax_irr': after_tax_irr,
             'after_tax_npv': after_tax_npv,
             
@@ -916,23 +1965,1060 @@ class CREAnalyzer:
             'going_in_cap_rate': going_in_cap_rate,
             'year1_dscr': year1_dscr,
             'year1_pre_tax_coc': year1_pre_tax_coc,
-            'year1_after_tax_coc': year1_after_tax_coc,
-            
-            # For backwards compatibility
-            'total_cash_flow': after_tax_total_cash_flow,
-            'total_cash_returned': after_tax_total_returned,
-            'total_profit': after_tax_profit,
-            'equity_multiple': after_tax_equity_multiple,
-            'avg_cash_on_cash': after_tax_avg_coc,
-            'irr': after_tax_irr,
-            'npv': after_tax_npv,
-            'year1_coc': year1_after_tax_coc,
-            'cash_flows': after_tax_cash_flows
+            'year1_after_tax_coc': year1_after_tax_coc
         }
+        return metrics, after_tax_cash_flows
+
+
+# Shared result cache
+RESULT_CACHE_MAX_MB = float(os.environ.get("CRE_CACHE_MAX_MB", "256"))
+# Next to app.py rather than the working directory, so every launch shares one cache
+CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+DISK_CACHE_PATH = os.environ.get("CRE_DISK_CACHE_PATH", str(CACHE_DIR / "results.sqlite"))
+DISK_CACHE_MAX_MB = float(os.environ.get("CRE_DISK_CACHE_MAX_MB", "1024"))
+# Entries from other engine versions are kept this long after their last read,
+# so processes still running an older version during a rolling deploy keep their hits
+DISK_CACHE_OTHER_VERSION_TTL_HOURS = float(os.environ.get("CRE_DISK_CACHE_OTHER_VERSION_TTL_HOURS", "24"))
+
+cache_logger = logging.getLogger("cre_analyzer.cache")
+
+
+class AnalysisResult(NamedTuple):
+    """Pro forma, returns and (monthly mode) monthly schedule for one set of inputs"""
+    pro_forma: ProForma
+    returns: InvestmentReturns
+    monthly_schedule: Optional[Dict[str, np.ndarray]]
+
+
+def inputs_fingerprint(inputs: PropertyInputs) -> str:
+    """Stable SHA-256 of every input field (identical across sessions and processes)"""
+    payload = json.dumps(asdict(inputs), sort_keys=True, default=float)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def estimate_nbytes(value) -> int:
+    """Approximate memory held by a cached value"""
+    if isinstance(value, (ProForma, InvestmentReturns, ReturnsBatch, np.ndarray)):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def to_storable(value):
+    """Convert a cached value to builtin / NumPy / pandas objects for persistence
+    
+    App classes are replaced by tagged tuples so the pickled payload does not depend
+    on the module name the app runs under (streamlit's __main__ vs an import).
+    Classes are matched by name rather than identity because Streamlit re-executes
+    the script on every rerun, so a cached value and this function can come from
+    different runs' class objects.
+    """
+    kind = type(value).__name__
+    if kind == 'AnalysisResult':
+        return ('__analysis__', to_storable(value.pro_forma), to_storable(value.returns), value.monthly_schedule)
+    if kind == 'ProForma':
+        return ('__pro_forma__', value.values)
+    if kind == 'InvestmentReturns':
+        return ('__returns__', value._values, value._cash_flows)
+    if kind == 'ReturnsBatch':
+        return ('__returns_batch__', value._values, value.cash_flows)
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        # Other result NamedTuples defined in this module
+        return ('__named__', kind, tuple(to_storable(v) for v in value))
+    if isinstance(value, tuple):
+        return tuple(to_storable(v) for v in value)
+    if isinstance(value, list):
+        return [to_storable(v) for v in value]
+    if isinstance(value, dict):
+        return {k: to_storable(v) for k, v in value.items()}
+    return value
+
+
+def from_storable(obj):
+    """Inverse of to_storable"""
+    if isinstance(obj, tuple) and obj and isinstance(obj[0], str) and obj[0].startswith('__'):
+        tag = obj[0]
+        if tag == '__analysis__':
+            return AnalysisResult(from_storable(obj[1]), from_storable(obj[2]), obj[3])
+        if tag == '__pro_forma__':
+            return ProForma(obj[1])
+        if tag == '__returns__':
+            return InvestmentReturns(obj[1], obj[2])
+        if tag == '__returns_batch__':
+            return ReturnsBatch(obj[1], obj[2])
+        if tag == '__named__':
+            return globals()[obj[1]](*[from_storable(v) for v in obj[2]])
+    if isinstance(obj, tuple):
+        return tuple(from_storable(v) for v in obj)
+    if isinstance(obj, list):
+        return [from_storable(v) for v in obj]
+    if isinstance(obj, dict):
+        return {k: from_storable(v) for k, v in obj.items()}
+    return obj
+
+
+_MISSING = object()
+
+
+class DiskResultCache:
+    """Persistent result cache in a local SQLite file
+    
+    Safe to share between worker processes: every write is a single
+    transaction (WAL journal), and size-based eviction of least recently
+    accessed entries runs inside the same transaction as the insert.
+    Keys combine the caller's key with ENGINE_VERSION and reads only match
+    rows of this engine version, so model changes invalidate old entries.
+    Processes on different versions can share the file during a deploy:
+    other versions' rows are evicted first when over the size ceiling, and
+    once unread for other_version_ttl seconds.
+    """
+    
+    def __init__(self, path: str, max_bytes: int, engine_version: str = ENGINE_VERSION,
+                 other_version_ttl: float = DISK_CACHE_OTHER_VERSION_TTL_HOURS * 3600):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.engine_version = engine_version
+        self.other_version_ttl = other_version_ttl
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
         
-        return self.returns
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, engine_version TEXT NOT NULL, value BLOB NOT NULL, "
+            "size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def _storage_key(self, key: Tuple) -> str:
+        return hashlib.sha256(repr((self.engine_version,) + tuple(key)).encode()).hexdigest()
+    
+    def get(self, key: Tuple, default=None):
+        return self.get_many([key]).get(key, default)
+    
+    def get_many(self, keys: Sequence[Tuple]) -> Dict[Tuple, object]:
+        """Stored values for whichever of keys are present, read in one query per 500 keys
+        
+        A row that no longer decodes (truncated pickle, or a payload naming a
+        class that has since been renamed or removed) counts as a miss and is
+        deleted, so the next put replaces it instead of failing again.
+        """
+        storage_keys = {self._storage_key(key): key for key in keys}
+        names = list(storage_keys)
+        found = {}
+        try:
+            conn = self._connection()
+            rows = []
+            for start in range(0, len(names), 500):
+                part = names[start:start + 500]
+                rows += conn.execute(
+                    f"SELECT key, value FROM results WHERE engine_version = ? "
+                    f"AND key IN ({', '.join('?' * len(part))})", [self.engine_version] + part
+                ).fetchall()
+        except sqlite3.Error as e:
+            cache_logger.warning("Disk cache read failed: %s", e)
+            return found
+        
+        hits, corrupt = [], []
+        for name, blob in rows:
+            try:
+                found[storage_keys[name]] = from_storable(pickle.loads(blob))
+                hits.append(name)
+            except Exception as e:
+                cache_logger.warning("Disk cache dropped undecodable entry for %s: %s", storage_keys[name][0], e)
+                corrupt.append(name)
+        if not rows:
+            return found
+        
+        try:
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("UPDATE results SET accessed = ? WHERE key = ?", [(now, name) for name in hits])
+                conn.executemany("DELETE FROM results WHERE key = ?", [(name,) for name in corrupt])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            cache_logger.warning("Disk cache access update failed: %s", e)
+        return found
+    
+    def put(self, key: Tuple, value):
+        self.put_many([(key, value)])
+    
+    def put_many(self, items: Sequence[Tuple[Tuple, object]]):
+        """Store (key, value) pairs in one transaction, evicting once after all inserts"""
+        now = time.time()
+        rows = []
+        for key, value in items:
+            try:
+                blob = pickle.dumps(to_storable(value), protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                cache_logger.warning("Disk cache skipped unpicklable value for %s: %s", key[0], e)
+                continue
+            if len(blob) <= self.max_bytes:
+                rows.append((self._storage_key(key), self.engine_version, blob, len(blob), now, now))
+        if not rows:
+            return
+        
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO results (key, engine_version, value, size, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute(
+                    "DELETE FROM results WHERE engine_version != ? AND accessed < ?",
+                    (self.engine_version, now - self.other_version_ttl)
+                )
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+                if total > self.max_bytes:
+                    # Drop other versions' entries, then least recently accessed ones, until under the ceiling
+                    excess = total - self.max_bytes
+                    rows = conn.execute(
+                        "SELECT key, size FROM results ORDER BY engine_version = ?, accessed", (self.engine_version,)
+                    ).fetchall()
+                    doomed = []
+                    for old_key, size in rows:
+                        if excess <= 0:
+                            break
+                        doomed.append((old_key,))
+                        excess -= size
+                    conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            cache_logger.warning("Disk cache write failed: %s", e)
+    
+    def clear(self):
+        try:
+            self._connection().execute("DELETE FROM results")
+        except sqlite3.Error as e:
+            cache_logger.warning("Disk cache clear failed: %s", e)
+    
+    def stats(self) -> Dict[str, int]:
+        try:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        except sqlite3.Error:
+            entries, size = 0, 0
+        return {'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes}
+
+
+class ResultCache:
+    """Thread-safe LRU cache of computed results with a memory ceiling
+    
+    Shared by every session on the server. Tracks global hit/miss counts
+    and per-session counts so each user can see how much they reuse. When a
+    DiskResultCache is attached, memory misses fall through to disk before
+    recomputing, and new results are written to both tiers.
+    """
+    
+    def __init__(self, max_bytes: int, max_sessions: int = 1000, disk: Optional[DiskResultCache] = None):
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        self.disk = disk
+        self._entries: OrderedDict = OrderedDict()
+        self._sizes: Dict[Tuple, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._session_stats: OrderedDict = OrderedDict()
+    
+    def _count(self, session_id: str, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        stats = self._session_stats.pop(session_id, None) or [0, 0]
+        stats[0 if hit else 1] += 1
+        self._session_stats[session_id] = stats
+        if len(self._session_stats) > self.max_sessions:
+            self._session_stats.popitem(last=False)
+    
+    def get(self, key: Tuple, default=None):
+        """Look up key without counting a hit or miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return default
+    
+    def put(self, key: Tuple, value):
+        size = estimate_nbytes(value)
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+            
+            while self._bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+    
+    def get_or_compute(self, key: Tuple, compute: Callable):
+        """Return the cached value for key, computing and storing it on a miss"""
+        session_id = current_session_id()
+        with self._lock:
+            found = key in self._entries
+            if found:
+                self._entries.move_to_end(key)
+                value = self._entries[key]
+                self._count(session_id, True)
+        
+        if found:
+            return value
+        
+        if self.disk is not None:
+            value = self.disk.get(key, _MISSING)
+            if value is not _MISSING:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._count(session_id, True)
+                self.put(key, value)
+                return value
+        
+        with self._lock:
+            self._count(session_id, False)
+        value = compute()
+        self.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+        return value
+    
+    def get_or_compute_many(self, keys: Sequence[Tuple], compute: Callable[[List[int]], Sequence]) -> List:
+        """Cached values for keys, computing every miss in one compute(positions) call
+        
+        compute receives the positions (into keys) of the distinct missing keys
+        and returns their values in the same order, so callers can evaluate all
+        misses in a single batch.
+        """
+        session_id = current_session_id()
+        values: Dict[Tuple, object] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries and key not in values:
+                    self._entries.move_to_end(key)
+                    values[key] = self._entries[key]
+                    self._count(session_id, True)
+        
+        if self.disk is not None:
+            stored = self.disk.get_many([key for key in dict.fromkeys(keys) if key not in values])
+            with self._lock:
+                for key in stored:
+                    self.disk_hits += 1
+                    self._count(session_id, True)
+            for key, value in stored.items():
+                self.put(key, value)
+                values[key] = value
+        
+        missing: Dict[Tuple, int] = {}
+        for position, key in enumerate(keys):
+            if key not in values and key not in missing:
+                missing[key] = position
+        if missing:
+            with self._lock:
+                for _ in missing:
+                    self._count(session_id, False)
+            computed = list(zip(missing, compute(list(missing.values()))))
+            for key, value in computed:
+                self.put(key, value)
+                values[key] = value
+            if self.disk is not None:
+                self.disk.put_many(computed)
+        return [values[key] for key in keys]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+    
+    def stats(self, session_id: Optional[str] = None) -> Dict[str, float]:
+        with self._lock:
+            session_hits, session_misses = self._session_stats.get(session_id or current_session_id(), (0, 0))
+            lookups = self.hits + self.misses
+            session_lookups = session_hits + session_misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'session_hits': session_hits,
+                'session_misses': session_misses,
+                'session_hit_rate': session_hits / session_lookups if session_lookups else 0.0,
+                'sessions': len(self._session_stats)
+            }
+
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """Server-wide result cache (survives reruns, shared across sessions)"""
+    disk = None
+    if DISK_CACHE_PATH and DISK_CACHE_MAX_MB > 0:
+        try:
+            disk = DiskResultCache(DISK_CACHE_PATH, max_bytes=int(DISK_CACHE_MAX_MB * 1024 * 1024))
+        except (sqlite3.Error, OSError) as e:
+            cache_logger.warning("Persistent result cache disabled: %s", e)
+    return ResultCache(max_bytes=int(RESULT_CACHE_MAX_MB * 1024 * 1024), disk=disk)
+
+
+@st.cache_resource
+def get_parallel_evaluator() -> 'ParallelEvaluator':
+    """Server-wide process pool for large evaluations (started on first use)"""
+    return ParallelEvaluator(workers=PARALLEL_WORKERS, chunk_scenarios=PARALLEL_CHUNK_SCENARIOS)
+
+
+def run_analysis(inputs: PropertyInputs, cache: Optional[ResultCache] = None) -> AnalysisResult:
+    """Pro forma and returns for inputs, served from the shared cache when possible"""
+    def compute() -> AnalysisResult:
+        analyzer = CREAnalyzer(inputs)
+        pro_forma = analyzer.calculate_pro_forma()
+        returns = analyzer.calculate_returns()
+        return AnalysisResult(pro_forma, returns, analyzer.monthly_schedule)
+    
+    if cache is None:
+        cache = get_result_cache()
+    return cache.get_or_compute(('analysis', inputs_fingerprint(inputs)), compute)
+
+
+def analyze_batch(variants: Sequence[PropertyInputs]) -> List[AnalysisResult]:
+    """run_analysis for many inputs at once, projecting each structure group in one engine pass
+    
+    Pro formas match single-scenario runs exactly and returns agree to
+    round-off, so results can share the run_analysis cache entries.
+    """
+    results: List[Optional[AnalysisResult]] = [None] * len(variants)
+    groups: Dict[Tuple, List[int]] = {}
+    for i, variant in enumerate(variants):
+        structure = (variant.use_monthly_periods, variant.use_detailed_tenants, variant.tenants)
+        groups.setdefault(structure, []).append(i)
+    
+    budget = get_memory_budget()
+    for (monthly, _, _), indices in groups.items():
+        hold = max(int(variants[i].hold_period_years) for i in indices)
+        row_bytes = scenario_bytes(hold, monthly)
+        chunk = budget.chunk_rows(row_bytes, len(indices))
+        for start in range(0, len(indices), chunk):
+            part = indices[start:start + chunk]
+            with budget.reserve(len(part) * row_bytes):
+                analyzer = CREAnalyzer(stack_inputs([variants[i] for i in part]))
+                batch = analyzer.calculate_batch_returns()
+            pro_forma = np.stack([analyzer.pro_forma[name] for name in PRO_FORMA_COLUMNS], axis=-1)
+            schedule = analyzer.monthly_schedule
+            for j, i in enumerate(part):
+                years = int(variants[i].hold_period_years) + 1
+                monthly_schedule = None
+                if schedule is not None:
+                    months = (years - 1) * 12
+                    monthly_schedule = {
+                        name: np.broadcast_to(column, (len(part), column.shape[-1]))[j, :months].copy()
+                        for name, column in schedule.items()
+                    }
+                results[i] = AnalysisResult(ProForma(pro_forma[j, :years].copy()), batch[j], monthly_schedule)
+    return results
+
+
+def run_analyses(variants: Sequence[PropertyInputs], cache: Optional[ResultCache] = None) -> List[AnalysisResult]:
+    """run_analysis for many inputs: cache hits are served, all misses are evaluated in one analyze_batch"""
+    if cache is None:
+        cache = get_result_cache()
+    keys = [('analysis', inputs_fingerprint(variant)) for variant in variants]
+    return cache.get_or_compute_many(keys, lambda positions: analyze_batch([variants[i] for i in positions]))
+
+
+def cached_debt_optimization(inputs: PropertyInputs, cache: Optional[ResultCache] = None) -> pd.DataFrame:
+    """analyze_debt_optimization through the shared cache (treat the result as read-only)"""
+    if cache is None:
+        cache = get_result_cache()
+    return cache.get_or_compute(
+        ('debt_optimization', inputs_fingerprint(inputs)),
+        lambda: analyze_debt_optimization(inputs)
+    )
+
+
+def cached_exit_year_analysis(inputs: PropertyInputs, max_exit_year: int) -> pd.DataFrame:
+    """analyze_exit_years through the shared cache (treat the result as read-only)"""
+    return get_result_cache().get_or_compute(
+        ('exit_years', inputs_fingerprint(inputs), int(max_exit_year)),
+        lambda: analyze_exit_years(inputs, max_exit_year)
+    )
+
+
+def cached_pdf_report(inputs: PropertyInputs, returns: InvestmentReturns, pro_forma: ProForma) -> bytes:
+    """generate_pdf_report through the shared cache (reports are dated, and regenerated daily)"""
+    today = date.today()
+    return get_result_cache().get_or_compute(
+        ('pdf_report', inputs_fingerprint(inputs), today.isoformat()),
+        lambda: generate_pdf_report(inputs, returns, pro_forma, generated_on=today)
+    )
 
 
+def cached_sensitivity_table(inputs: PropertyInputs, param1: str, param2: str,
+                             metric: str, param1_range: Sequence[float],
+                             param2_range: Sequence[float]) -> pd.DataFrame:
+    """create_sensitivity_table through the shared cache (treat the result as read-only)"""
+    key = (
+        'sensitivity', inputs_fingerprint(inputs), param1, param2, metric,
+        tuple(float(v) for v in param1_range), tuple(float(v) for v in param2_range)
+    )
+    return get_result_cache().get_or_compute(
+        key,
+        lambda: create_sensitivity_table(inputs, param1, param2, metric, param1_range, param2_range)
+    )
+
+
+def cached_adaptive_contour(inputs: PropertyInputs, x_field: str, y_field: str,
+                            x_range: Tuple[float, float], y_range: Tuple[float, float],
+                            metric: str, target: float, max_depth: int) -> 'ContourResult':
+    """adaptive_contour through the shared cache"""
+    key = (
+        'contour', inputs_fingerprint(inputs), x_field, y_field,
+        tuple(map(float, x_range)), tuple(map(float, y_range)), metric, float(target), int(max_depth)
+    )
+    return get_result_cache().get_or_compute(
+        key,
+        lambda: adaptive_contour(inputs, x_field, y_field, x_range, y_range, metric, target, max_depth=max_depth)
+    )
+
+
+def cached_tornado_analysis(inputs: PropertyInputs, shock: float) -> 'TornadoResult':
+    """tornado_analysis through the shared cache"""
+    key = ('tornado', inputs_fingerprint(inputs), float(shock))
+    return get_result_cache().get_or_compute(key, lambda: tornado_analysis(inputs, shock))
+
+
+def cached_input_gradients(inputs: PropertyInputs) -> 'InputGradients':
+    """input_gradients through the shared cache"""
+    key = ('gradients', inputs_fingerprint(inputs))
+    return get_result_cache().get_or_compute(key, lambda: input_gradients(inputs))
+
+
+def cached_sobol_indices(inputs: PropertyInputs, fields: Tuple[str, ...], spread: float,
+                         log2_samples: int, progress: Optional[Callable[[int, int], None]] = None) -> 'SobolResult':
+    """sobol_indices through the shared cache"""
+    key = ('sobol', inputs_fingerprint(inputs), tuple(fields), float(spread), int(log2_samples))
+    return get_result_cache().get_or_compute(
+        key,
+        lambda: sobol_indices(inputs, fields, spread, log2_samples, progress=progress)
+    )
+
+
+def cached_monte_carlo(inputs: PropertyInputs, fields: Tuple[str, ...], spread: float, sampler: str,
+                       tolerance: float, max_draws: int,
+                       progress: Optional[Callable[..., None]] = None) -> 'MonteCarloResult':
+    """monte_carlo through the shared cache"""
+    key = ('monte_carlo', inputs_fingerprint(inputs), tuple(fields), float(spread), sampler,
+           float(tolerance), int(max_draws))
+    return get_result_cache().get_or_compute(
+        key,
+        lambda: monte_carlo(inputs, fields, spread, sampler, tolerance=tolerance, max_draws=max_draws,
+                            progress=progress)
+    )
+
+
+def cached_parameter_sweep(inputs: PropertyInputs, axes: Dict[str, np.ndarray], metric: str, top_k: int,
+                           largest: bool,
+                           progress: Optional[Callable[[int, int, pd.DataFrame], None]] = None) -> 'SweepResult':
+    """parameter_sweep through the shared cache"""
+    key = ('sweep', inputs_fingerprint(inputs), tuple((name, tuple(values.tolist())) for name, values in axes.items()),
+           metric, int(top_k), bool(largest))
+    return get_result_cache().get_or_compute(
+        key,
+        lambda: parameter_sweep(inputs, axes, metric, top_k=top_k, largest=largest, progress=progress)
+    )
+
+
+def cached_store_sweep_result(store: 'ResultStore', metric: str, top_k: int, largest: bool) -> 'SweepResult':
+    """ResultStore.sweep_result through the shared cache (keyed by store and rows completed)"""
+    key = ('sweep_store', str(store.path.resolve()), store.completed, metric, int(top_k), bool(largest))
+    return get_result_cache().get_or_compute(key, lambda: store.sweep_result(metric, top_k, largest))
+
+
+def _store_key(kind: str, store: 'ResultStore', where: Optional[Mapping], *args) -> Tuple:
+    where_key = tuple(sorted((name, tuple(bounds)) for name, bounds in (where or {}).items()))
+    return (kind, str(store.path.resolve()), store.completed, where_key) + args
+
+
+def cached_store_summary(store: 'ResultStore', columns: Sequence[str], where=None) -> pd.DataFrame:
+    """ResultStore.summary through the shared cache (keyed by store, rows completed and filter)"""
+    return get_result_cache().get_or_compute(_store_key('store_summary', store, where, tuple(columns)),
+                                             lambda: store.summary(columns, where))
+
+
+def cached_store_histogram(store: 'ResultStore', column: str, bins: int = 50,
+                           where=None) -> Tuple[np.ndarray, np.ndarray]:
+    """ResultStore.histogram through the shared cache (keyed by store, rows completed and filter)"""
+    return get_result_cache().get_or_compute(_store_key('store_histogram', store, where, column, int(bins)),
+                                             lambda: store.histogram(column, bins=bins, where=where))
+
+
+def cached_store_query(store: 'ResultStore', where=None, limit: int = 1000) -> pd.DataFrame:
+    """ResultStore.query (first limit matching rows) through the shared cache"""
+    return get_result_cache().get_or_compute(_store_key('store_query', store, where, int(limit)),
+                                             lambda: store.query(where=where, limit=limit))
+
+
+def cached_pareto_sweep(inputs: PropertyInputs, axes: Dict[str, np.ndarray], objectives: Tuple[str, ...],
+                        progress: Optional[Callable[[int, int, pd.DataFrame], None]] = None) -> 'ParetoResult':
+    """pareto_sweep through the shared cache"""
+    key = ('pareto', inputs_fingerprint(inputs), tuple((name, tuple(values.tolist())) for name, values in axes.items()),
+           tuple(objectives))
+    return get_result_cache().get_or_compute(key, lambda: pareto_sweep(inputs, axes, objectives, progress=progress))
+
+
+# Startup warm-up
+PREWARM_ENABLED = os.environ.get("CRE_PREWARM", "1") != "0"
+
+# A fresh session's sidebar, in the same units and types the widgets return,
+# so it fingerprints identically. Keep in sync with create_inputs_sidebar.
+DEFAULT_INPUTS = PropertyInputs(
+    building_size=50000,
+    purchase_price=10000000,
+    closing_costs_pct=3.0 / 100,
+    down_payment_pct=25.0 / 100,
+    interest_rate=7.0 / 100,
+    loan_term_years=25,
+    annual_rent_psf=18.0,
+    rent_growth_rate=3.0 / 100,
+    stabilized_occupancy=95.0 / 100,
+    year1_occupancy=90.0 / 100,
+    other_income_pct=2.0 / 100,
+    property_tax_psf=1.5,
+    insurance_psf=0.75,
+    cam_psf=1.25,
+    property_mgmt_pct=4.0 / 100,
+    leasing_commission_pct=3.0 / 100,
+    repairs_maintenance=25000,
+    capex_reserve_psf=0.75,
+    initial_ti=250000,
+    tax_rate=37.0 / 100,
+    land_value_pct=20.0 / 100,
+    depreciation_period=39,
+    hold_period_years=10,
+    exit_cap_rate=6.5 / 100,
+    sale_costs_pct=2.0 / 100,
+    discount_rate=12.0 / 100,
+    use_detailed_tenants=False,
+    tenants=[],
+    use_monthly_periods=False
+)
+
+
+class CacheWarmer:
+    """Evaluates the default inputs and every saved scenario on a background thread
+    
+    Fills the shared result cache so the first Load / Compare against each
+    scenario is served warm. Runs as a daemon thread, never blocks a rerun,
+    and exposes its progress for the sidebar.
+    """
+    
+    def __init__(self, cache: ResultCache):
+        self.cache = cache
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.current: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="cre-cache-warmer", daemon=True)
+        self._thread.start()
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _run(self):
+        self.started_at = time.perf_counter()
+        # (label, scenario file); None stands for the default sidebar inputs
+        jobs = [("Default inputs", None)] + [(Path(path).stem, path) for path in get_saved_scenarios()]
+        self.total = len(jobs)
+        
+        for label, path in jobs:
+            self.current = label
+            try:
+                inputs = DEFAULT_INPUTS if path is None else load_scenario(path)[1]
+                run_analysis(inputs, self.cache)
+                cached_debt_optimization(inputs, self.cache)
+            except Exception as e:
+                self.failed += 1
+                cache_logger.warning("Warm-up failed for %s: %s", label, e)
+            self.done += 1
+            # Give serving threads a turn between scenarios
+            time.sleep(0)
+        
+        self.current = None
+        self.finished_at = time.perf_counter()
+        cache_logger.info(
+            "Warm-up finished: %d scenarios in %.0f ms (%d failed)",
+            self.total, (self.finished_at - self.started_at) * 1000, self.failed
+        )
+    
+    def progress(self) -> Dict:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        return {
+            'total': self.total,
+            'done': self.done,
+            'failed': self.failed,
+            'current': self.current,
+            'running': self.running,
+            'elapsed_ms': elapsed * 1000 if elapsed is not None else None,
+        }
+
+
+@st.cache_resource
+def get_cache_warmer() -> Optional[CacheWarmer]:
+    """Start the warm-up thread once per server (None when CRE_PREWARM=0)"""
+    if not PREWARM_ENABLED:
+        return None
+    warmer = CacheWarmer(get_result_cache())
+    warmer.start()
+    return warmer
+
+
+def display_warmup_status(warmer: Optional[CacheWarmer]):
+    """Sidebar progress while the warm-up thread runs, summary once it is done"""
+    if warmer is None:
+        st.caption("Startup warm-up disabled (CRE_PREWARM=0)")
+        return
+    
+    progress = warmer.progress()
+    if progress['running']:
+        fraction = progress['done'] / progress['total'] if progress['total'] else 0.0
+        st.progress(
+            fraction,
+            text=f"Warming scenario library: {progress['done']}/{progress['total']} ({progress['current'] or 'starting'})"
+        )
+    elif progress['elapsed_ms'] is not None:
+        failed = f", {progress['failed']} failed" if progress['failed'] else ""
+        st.caption(
+            f"Warm-up: {progress['total']} scenarios cached in {progress['elapsed_ms']:,.0f} ms{failed}"
+        )
+
+
+# Background jobs for long analyses
+JOB_WORKERS = int(os.environ.get("CRE_JOB_WORKERS", "2"))
+JOB_RETAIN = int(os.environ.get("CRE_JOB_RETAIN", "50"))
+JOB_RETAIN_MB = float(os.environ.get("CRE_JOB_RETAIN_MB", "256"))
+
+# Seconds between refreshes of a running job's progress panel
+JOB_POLL_SECONDS = 1.0
+
+job_logger = logging.getLogger("cre_analyzer.jobs")
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work at its next progress report once it has been cancelled"""
+
+
+class Job:
+    """One background analysis: status, progress, latest partial result and final result
+    
+    The work function receives the job and passes job.report as its progress
+    callback; that is also where cancellation takes effect.
+    """
+    
+    def __init__(self, key: Tuple, label: str):
+        self.key = key
+        self.id = hashlib.sha256(repr(key).encode()).hexdigest()[:12]
+        self.label = label
+        self.status = 'queued'
+        self.done = 0
+        self.total = 0
+        self.partial = None
+        self.result = None
+        self.nbytes = 0
+        self.error: Optional[BaseException] = None
+        self._memory = [0, 0]       # [reserved, peak] budget bytes of the work (see stage_timer)
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+    
+    def report(self, done: int, total: int, partial=None):
+        """Progress callback for the work function; raises JobCancelled once cancel() was called"""
+        if self._cancel.is_set():
+            raise JobCancelled(self.label)
+        self.done, self.total = done, total
+        if partial is not None:
+            self.partial = partial
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    @property
+    def cancelling(self) -> bool:
+        return self._cancel.is_set() and not self.finished
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed', 'cancelled')
+    
+    @property
+    def fraction(self) -> float:
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+    
+    @property
+    def seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+    
+    @property
+    def peak_bytes(self) -> int:
+        """Most memory budget the work has reserved at once so far, across all its chunks"""
+        return self._memory[1]
+    
+    def usage(self) -> str:
+        """Run time and peak reserved memory, for captions"""
+        return f"{self.seconds:,.1f} s, {self.peak_bytes / 1024 ** 2:,.1f} MB peak"
+
+
+class JobManager:
+    """Runs long analyses on a small thread pool, once per key, and keeps finished results
+    
+    Keys identify the work (input fingerprint plus settings), so every rerun
+    and every session asking for the same analysis gets the same job, whether
+    it is queued, running or finished. Failed and cancelled jobs are only
+    restarted when asked to. The most recent finished jobs are kept for
+    retrieval, up to `retain` jobs and `max_bytes` of results; running jobs
+    are never dropped.
+    """
+    
+    def __init__(self, workers: int, retain: int, max_bytes: int):
+        self.retain = retain
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="cre-job")
+        self._jobs: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def submit(self, key: Tuple, label: str, work: Callable[[Job], object], restart: bool = False) -> Job:
+        """The job for key, starting it if there is none (or, with restart, if it failed or was cancelled)"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not (restart and job.status in ('failed', 'cancelled')):
+                self._jobs.move_to_end(key)
+                return job
+            job = Job(key, label)
+            self._jobs[key] = job
+        self._executor.submit(self._run, job, work)
+        return job
+    
+    def _run(self, job: Job, work: Callable[[Job], object]):
+        if job._cancel.is_set():
+            job.status = 'cancelled'
+        else:
+            job.status = 'running'
+            job.started_at = time.time()
+            try:
+                # Its own stage_timer frame, so only this job's reservations count towards its peak
+                with stage_timer(f"job:{job.key[0]}") as memory:
+                    job._memory = memory
+                    job.result = work(job)
+                job.nbytes = estimate_nbytes(job.result)
+                job.status = 'done'
+            except JobCancelled:
+                job.status = 'cancelled'
+            except Exception as e:
+                job.error = e
+                job.status = 'failed'
+                job_logger.warning("Job %s failed: %s", job.label, e)
+        job.finished_at = time.time()
+        job.partial = None
+        self._prune()
+    
+    def _prune(self):
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job.finished]
+            held = sum(job.nbytes for job in finished)
+            while finished and (len(finished) > self.retain or held > self.max_bytes):
+                job = finished.pop(0)
+                held -= job.nbytes
+                del self._jobs[job.key]
+    
+    def get(self, key: Tuple) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(key)
+    
+    def discard(self, key: Tuple):
+        """Forget the job for key if it has finished, so the next submit starts afresh"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.finished:
+                del self._jobs[key]
+    
+    def jobs(self) -> List[Job]:
+        """Every known job, most recently submitted or requested last"""
+        with self._lock:
+            return list(self._jobs.values())
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Server-wide background job manager (survives reruns, shared across sessions)"""
+    return JobManager(workers=JOB_WORKERS, retain=JOB_RETAIN, max_bytes=int(JOB_RETAIN_MB * 1024 * 1024))
+
+
+def background_job(key: Tuple, label: str, work: Callable[[Job], object], restart: bool = False,
+                   show_partial: Optional[Callable[[object], None]] = None,
+                   memory_hint: str = "Try a smaller run.") -> Optional[Job]:
+    """The finished job for key, or None while it is queued, running, cancelled or failed
+    
+    Starts the job if needed (see JobManager.submit) and, until it is done,
+    shows a self-refreshing progress panel with its partial results and a
+    Cancel button in its place; the app reruns once the job finishes. A
+    failed job shows its error (plus memory_hint when it ran out of memory
+    budget) and a Retry button that clears it.
+    """
+    manager = get_job_manager()
+    job = manager.submit(key, label, work, restart=restart)
+    if job.status == 'done':
+        return job
+    if job.status == 'failed':
+        hint = f" {memory_hint}" if isinstance(job.error, MemoryBudgetError) else ""
+        st.error(f"{label} failed: {job.error}.{hint}")
+        if st.button("Retry", key=f"retry_job_{job.id}"):
+            manager.discard(key)
+            st.rerun()
+        return None
+    if job.status == 'cancelled':
+        st.info(f"{label} was cancelled. Run it again to restart it.")
+        return None
+    display_job_progress(key, show_partial)
+    return None
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def display_job_progress(key: Tuple, show_partial: Optional[Callable[[object], None]] = None):
+    """Progress, partial results and Cancel for a running job, refreshed every JOB_POLL_SECONDS"""
+    job = get_job_manager().get(key)
+    if job is None or job.finished:
+        st.rerun()
+    
+    col1, col2 = st.columns([5, 1])
+    with col1:
+        if job.status == 'queued':
+            text = f"{job.label}: waiting for a free worker..."
+        elif job.cancelling:
+            text = f"{job.label}: cancelling..."
+        else:
+            done = f"{job.done:,} of {job.total:,}" if job.total else "starting"
+            text = f"{job.label}: {done} ({job.seconds:,.0f} s, keeps running if you leave this page)"
+        st.progress(job.fraction, text=text)
+    with col2:
+        if st.button("Cancel", key=f"cancel_job_{job.id}", disabled=job.cancelling, use_container_width=True):
+            job.cancel()
+    if show_partial is not None and job.partial is not None:
+        show_partial(job.partial)
+
+
+JOB_STATUS_LABELS = {
+    'queued': 'Queued',
+    'running': 'Running',
+    'done': 'Done',
+    'failed': 'Failed',
+    'cancelled': 'Cancelled',
+}
+
+
+def display_job_list():
+    """Sidebar table of recent background jobs on this server"""
+    jobs = get_job_manager().jobs()
+    if not jobs:
+        st.caption("No background jobs yet. Monte Carlo, Sobol, sweeps and the Pareto frontier run here.")
+        return
+    table = pd.DataFrame({
+        'Job': [job.label for job in reversed(jobs)],
+        'Status': [JOB_STATUS_LABELS[job.status] for job in reversed(jobs)],
+        'Progress': [1.0 if job.status == 'done' else job.fraction for job in reversed(jobs)],
+        'Seconds': [job.seconds for job in reversed(jobs)],
+        'Peak (MB)': [job.peak_bytes / 1024 ** 2 for job in reversed(jobs)],
+    })
+    st.dataframe(
+        table.style.format({'Progress': '{:.0%}', 'Seconds': '{:,.1f}', 'Peak (MB)': '{:,.1f}'}),
+        use_container_width=True,
+        hide_index=True
+    )
+
+
+def carry_sidebar_inputs_over():
+    """Keep the current values when the sidebar switches between live and batch edits
+    
+    Widgets inside a form get new identities, so without this they would
+    reset to their defaults on toggle.
+    """
+    if st.session_state.get('sidebar_inputs') is not None:
+        st.session_state.loaded_inputs = st.session_state.sidebar_inputs
+
+
+def record_batched_apply(previous: Optional[PropertyInputs], applied: PropertyInputs):
+    """Count the field edits that one Apply folded into a single recalculation"""
+    stats = st.session_state.setdefault('batch_stats', {'edits': 0, 'applies': 0})
+    if previous is not None:
+        stats['edits'] += sum(
+            getattr(previous, name) != getattr(applied, name) for name in INPUT_FIELD_NAMES
+        )
+    stats['applies'] += 1
+
+
+def display_batch_savings():
+    """Estimate reruns and compute time saved by batching, from the rolling rerun p50"""
+    stats = st.session_state.get('batch_stats')
+    if not stats or not stats['edits']:
+        st.sidebar.caption("Edits are applied together when you press Apply")
+        return
+    
+    avoided = max(0, stats['edits'] - stats['applies'])
+    rerun_p50 = get_stage_profiler().percentile('rerun_total', 50)
+    saved = f" (≈{avoided * rerun_p50:,.1f} s of compute)" if rerun_p50 is not None else ""
+    st.sidebar.caption(
+        f"{stats['edits']} edits applied in {stats['applies']} recalculation{'s' if stats['applies'] != 1 else ''}: "
+        f"{avoided} full reruns avoided{saved}"
+    )
+
+
+@timed
 def create_inputs_sidebar() -> PropertyInputs:
     """Create sidebar with all input parameters"""
     st.sidebar.markdown("## SCENARIOS")
@@ -981,16 +3067,15 @@ def create_inputs_sidebar() -> PropertyInputs:
                 scenario_options = []
                 for filepath in saved_scenarios:
                     try:
-                        with open(filepath, 'r') as f:
-                            data = json.load(f)
-                            name = data.get('name', 'Unnamed')
-                            created = data.get('created_at', '')
-                            if created:
-                                created_date = datetime.fromisoformat(created).strftime("%Y-%m-%d %H:%M")
-                                display_name = f"{name} ({created_date})"
-                            else:
-                                display_name = name
-                            scenario_options.append((display_name, filepath))
+                        data = read_scenario_file(filepath)
+                        name = data.get('name', 'Unnamed')
+                        created = data.get('created_at', '')
+                        if created:
+                            created_date = datetime.fromisoformat(created).strftime("%Y-%m-%d %H:%M")
+                            display_name = f"{name} ({created_date})"
+                        else:
+                            display_name = name
+                        scenario_options.append((display_name, filepath))
                     except:
                         continue
                 
@@ -1030,22 +3115,31 @@ def create_inputs_sidebar() -> PropertyInputs:
     st.sidebar.markdown("---")
     st.sidebar.markdown("## PROPERTY INPUTS")
     st.sidebar.markdown(f"**Current Scenario:** {st.session_state.scenario_name}")
+    batch_edits = st.sidebar.toggle(
+        "Batch Edits (Apply to Recalculate)",
+        key="batch_edits",
+        on_change=carry_sidebar_inputs_over,
+        help="Collect input changes and recalculate once on Apply instead of after every edit"
+    )
+    
+    # Start from loaded inputs if available, otherwise from DEFAULT_INPUTS
+    default_inputs = st.session_state.loaded_inputs or DEFAULT_INPUTS
     
-    # Use loaded inputs if available
-    default_inputs = st.session_state.loaded_inputs if st.session_state.loaded_inputs else None
+    # In batch mode the inputs live in a form, so edits don't rerun the app until Apply
+    input_panel = st.sidebar.form("property_inputs") if batch_edits else st.sidebar.container()
     
-    with st.sidebar.expander("PROPERTY DETAILS", expanded=True):
+    with input_panel.expander("PROPERTY DETAILS", expanded=True):
         building_size = st.number_input(
             "Building Size (SF)",
             min_value=1000,
-            value=int(default_inputs.building_size) if default_inputs else 50000,
+            value=int(default_inputs.building_size),
             step=1000,
             help="Total rentable square footage"
         )
         purchase_price = st.number_input(
             "Purchase Price ($)",
             min_value=100000,
-            value=int(default_inputs.purchase_price) if default_inputs else 10000000,
+            value=int(default_inputs.purchase_price),
             step=100000,
             help="Total purchase price"
         )
@@ -1054,37 +3148,42 @@ def create_inputs_sidebar() -> PropertyInputs:
             "Closing Costs (%)",
             min_value=0.0,
             max_value=10.0,
-            value=float(default_inputs.closing_costs_pct * 100) if default_inputs else 3.0,
+            value=float(default_inputs.closing_costs_pct * 100),
             step=0.1
         ) / 100
     
-    with st.sidebar.expander("FINANCING STRUCTURE", expanded=True):
+    with input_panel.expander("FINANCING STRUCTURE", expanded=True):
         down_payment_pct = st.slider(
             "Down Payment (%)",
             min_value=0.0,
             max_value=100.0,
-            value=float(default_inputs.down_payment_pct * 100) if default_inputs else 25.0,
+            value=float(default_inputs.down_payment_pct * 100),
             step=5.0
         ) / 100
         interest_rate = st.slider(
             "Interest Rate (%)",
             min_value=0.0,
             max_value=15.0,
-            value=float(default_inputs.interest_rate * 100) if default_inputs else 7.0,
+            value=float(default_inputs.interest_rate * 100),
             step=0.25
         ) / 100
         loan_term_years = st.number_input(
             "Loan Term (Years)",
             min_value=1,
             max_value=30,
-            value=int(default_inputs.loan_term_years) if default_inputs else 25,
+            value=int(default_inputs.loan_term_years),
             step=1
         )
+        use_monthly_periods = st.checkbox(
+            "Monthly Periods & Amortization",
+            value=default_inputs.use_monthly_periods,
+            help="Model lease-up, rent and debt month by month (rolled up to annual for display)"
+        )
     
-    with st.sidebar.expander("REVENUE ASSUMPTIONS", expanded=True):
+    with input_panel.expander("REVENUE ASSUMPTIONS", expanded=True):
         use_detailed_tenants = st.checkbox(
             "Use Detailed Tenant Input",
-            value=default_inputs.use_detailed_tenants if default_inputs else False,
+            value=default_inputs.use_detailed_tenants,
             help="Model individual tenants with specific lease terms"
         )
         
@@ -1151,21 +3250,21 @@ def create_inputs_sidebar() -> PropertyInputs:
             annual_rent_psf = st.number_input(
                 "Annual Base Rent per SF (NNN) ($)",
                 min_value=1.0,
-                value=float(default_inputs.annual_rent_psf) if default_inputs else 18.0,
+                value=float(default_inputs.annual_rent_psf),
                 step=0.5
             )
             year1_occupancy = st.slider(
                 "Year 1 Occupancy (%)",
                 min_value=0.0,
                 max_value=100.0,
-                value=float(default_inputs.year1_occupancy * 100) if default_inputs else 90.0,
+                value=float(default_inputs.year1_occupancy * 100),
                 step=5.0
             ) / 100
             stabilized_occupancy = st.slider(
                 "Stabilized Occupancy (%)",
                 min_value=0.0,
                 max_value=100.0,
-                value=float(default_inputs.stabilized_occupancy * 100) if default_inputs else 95.0,
+                value=float(default_inputs.stabilized_occupancy * 100),
                 step=5.0
             ) / 100
         
@@ -1173,78 +3272,78 @@ def create_inputs_sidebar() -> PropertyInputs:
             "Rent Growth Rate (Annual %)",
             min_value=0.0,
             max_value=10.0,
-            value=float(default_inputs.rent_growth_rate * 100) if default_inputs else 3.0,
+            value=float(default_inputs.rent_growth_rate * 100),
             step=0.25
         ) / 100
         other_income_pct = st.slider(
             "Other Income (% of Rent)",
             min_value=0.0,
             max_value=10.0,
-            value=float(default_inputs.other_income_pct * 100) if default_inputs else 2.0,
+            value=float(default_inputs.other_income_pct * 100),
             step=0.5
         ) / 100
     
-    with st.sidebar.expander("OPERATING EXPENSES (NNN)", expanded=False):
+    with input_panel.expander("OPERATING EXPENSES (NNN)", expanded=False):
         property_tax_psf = st.number_input(
             "Property Taxes ($/SF)",
             min_value=0.0,
-            value=float(default_inputs.property_tax_psf) if default_inputs else 1.5,
+            value=float(default_inputs.property_tax_psf),
             step=0.1
         )
         insurance_psf = st.number_input(
             "Property Insurance ($/SF)",
             min_value=0.0,
-            value=float(default_inputs.insurance_psf) if default_inputs else 0.75,
+            value=float(default_inputs.insurance_psf),
             step=0.05
         )
         cam_psf = st.number_input(
             "CAM ($/SF)",
             min_value=0.0,
-            value=float(default_inputs.cam_psf) if default_inputs else 1.25,
+            value=float(default_inputs.cam_psf),
             step=0.1
         )
         property_mgmt_pct = st.slider(
             "Property Management (% of Revenue)",
             min_value=0.0,
             max_value=10.0,
-            value=float(default_inputs.property_mgmt_pct * 100) if default_inputs else 4.0,
+            value=float(default_inputs.property_mgmt_pct * 100),
             step=0.5
         ) / 100
         leasing_commission_pct = st.slider(
             "Leasing Commissions (% of Revenue)",
             min_value=0.0,
             max_value=10.0,
-            value=float(default_inputs.leasing_commission_pct * 100) if default_inputs else 3.0,
+            value=float(default_inputs.leasing_commission_pct * 100),
             step=0.5
         ) / 100
         repairs_maintenance = st.number_input(
             "Repairs & Maintenance (Annual $)",
             min_value=0,
-            value=int(default_inputs.repairs_maintenance) if default_inputs else 25000,
+            value=int(default_inputs.repairs_maintenance),
             step=1000
         )
     
-    with st.sidebar.expander("CAPITAL EXPENDITURES", expanded=False):
+    with input_panel.expander("CAPITAL EXPENDITURES", expanded=False):
         initial_ti = st.number_input(
             "Initial Tenant Improvements ($)",
             min_value=0,
-            value=int(default_inputs.initial_ti) if default_inputs else 250000,
+            value=int(default_inputs.initial_ti),
             step=10000
         )
         capex_reserve_psf = st.number_input(
             "Annual CapEx Reserve ($/SF)",
             min_value=0.0,
-            value=float(default_inputs.capex_reserve_psf) if default_inputs else 0.75,
+            value=float(default_inputs.capex_reserve_psf),
             step=0.05
         )
     
-    with st.sidebar.expander("TAX ASSUMPTIONS (LLC)", expanded=True):
+    with input_panel.expander("TAX ASSUMPTIONS (LLC)", expanded=True):
         st.markdown("*LLC is typically pass-through to owner's tax rate*")
         tax_rate = st.slider(
             "Tax Rate (%)",
             min_value=0.0,
             max_value=50.0,
-            value=float(default_inputs.tax_rate * 100) if default_inputs else 37.0,
+            value=float(default_inputs.tax_rate * 100),
             step=1.0,
             help="Combined federal + state tax rate (e.g., 37% federal + state)"
         ) / 100
@@ -1252,7 +3351,7 @@ def create_inputs_sidebar() -> PropertyInputs:
             "Land Value (% of Purchase Price)",
             min_value=0.0,
             max_value=50.0,
-            value=float(default_inputs.land_value_pct * 100) if default_inputs else 20.0,
+            value=float(default_inputs.land_value_pct * 100),
             step=5.0,
             help="Land is not depreciable; typical range 15-25%"
         ) / 100
@@ -1260,47 +3359,51 @@ def create_inputs_sidebar() -> PropertyInputs:
             "Depreciation Period (Years)",
             min_value=1,
             max_value=50,
-            value=int(default_inputs.depreciation_period) if default_inputs else 39,
+            value=int(default_inputs.depreciation_period),
             step=1,
             help="Commercial real estate: 39 years (IRS)"
         )
     
-    with st.sidebar.expander("EXIT ASSUMPTIONS", expanded=True):
+    with input_panel.expander("EXIT ASSUMPTIONS", expanded=True):
         hold_period_years = st.number_input(
             "Hold Period (Years)",
             min_value=1,
             max_value=30,
-            value=int(default_inputs.hold_period_years) if default_inputs else 10,
+            value=int(default_inputs.hold_period_years),
             step=1
         )
         exit_cap_rate = st.slider(
             "Exit Cap Rate (%)",
             min_value=1.0,
             max_value=15.0,
-            value=float(default_inputs.exit_cap_rate * 100) if default_inputs else 6.5,
+            value=float(default_inputs.exit_cap_rate * 100),
             step=0.25
         ) / 100
         sale_costs_pct = st.slider(
             "Sale Costs (%)",
             min_value=0.0,
             max_value=10.0,
-            value=float(default_inputs.sale_costs_pct * 100) if default_inputs else 2.0,
+            value=float(default_inputs.sale_costs_pct * 100),
             step=0.25
         ) / 100
         discount_rate = st.slider(
             "Discount Rate for NPV (%)",
             min_value=1.0,
             max_value=20.0,
-            value=float(default_inputs.discount_rate * 100) if default_inputs else 12.0,
+            value=float(default_inputs.discount_rate * 100),
             step=0.5
         ) / 100
     
-    return PropertyInputs(
+    if batch_edits:
+        applied = input_panel.form_submit_button("Apply", type="primary", use_container_width=True)
+    
+    inputs = PropertyInputs(
         building_size=building_size,
         purchase_price=purchase_price,
         closing_costs_pct=closing_costs_pct,
         use_detailed_tenants=use_detailed_tenants,
         tenants=tenants,
+        use_monthly_periods=use_monthly_periods,
         down_payment_pct=down_payment_pct,
         interest_rate=interest_rate,
         loan_term_years=loan_term_years,
@@ -1325,8 +3428,17 @@ def create_inputs_sidebar() -> PropertyInputs:
         sale_costs_pct=sale_costs_pct,
         discount_rate=discount_rate
     )
+    
+    if batch_edits:
+        if applied:
+            record_batched_apply(st.session_state.get('sidebar_inputs'), inputs)
+        display_batch_savings()
+    
+    st.session_state.sidebar_inputs = inputs
+    return inputs
 
 
+@timed
 def display_acquisition_summary(inputs: PropertyInputs):
     """Display acquisition cost summary"""
     col1, col2, col3, col4 = st.columns(4)
@@ -1345,10 +3457,11 @@ def display_acquisition_summary(inputs: PropertyInputs):
     
     with col4:
         st.metric("Loan Amount", f"${inputs.loan_amount:,.0f}")
-        st.metric("Annual Debt Service", f"${inputs.annual_debt_service:,.0f}")
+        st.metric("Annual Debt Service", f"${inputs.year1_debt_service:,.0f}")
 
 
-def display_key_metrics(returns: Dict):
+@timed
+def display_key_metrics(returns: InvestmentReturns):
     """Display key investment return metrics"""
     st.markdown('<div class="sub-header">After-Tax Investment Returns</div>', unsafe_allow_html=True)
     
@@ -1454,12 +3567,13 @@ def display_key_metrics(returns: Dict):
         )
 
 
-def plot_noi_trend(pro_forma: pd.DataFrame):
+@timed
+def plot_noi_trend(pro_forma: ProForma):
     """Plot NOI trend over hold period"""
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=pro_forma['Year'],
+        x=pro_forma.years,
         y=pro_forma['NOI'],
         mode='lines+markers',
         name='NOI',
@@ -1481,7 +3595,8 @@ def plot_noi_trend(pro_forma: pd.DataFrame):
     return fig
 
 
-def plot_cash_flow_waterfall(returns: Dict, inputs: PropertyInputs):
+@timed
+def plot_cash_flow_waterfall(returns: InvestmentReturns, inputs: PropertyInputs):
     """Plot cash flow waterfall chart"""
     values = [
         inputs.equity_required,
@@ -1522,11 +3637,12 @@ def plot_cash_flow_waterfall(returns: Dict, inputs: PropertyInputs):
     return fig
 
 
-def plot_revenue_expense_stack(pro_forma: pd.DataFrame):
+@timed
+def plot_revenue_expense_stack(pro_forma: ProForma):
     """Plot stacked revenue and expenses"""
     fig = go.Figure()
     
-    years = pro_forma['Year'].tolist()
+    years = pro_forma.years
     
     # Revenue
     fig.add_trace(go.Bar(
@@ -1575,9 +3691,10 @@ def plot_revenue_expense_stack(pro_forma: pd.DataFrame):
     return fig
 
 
-def plot_cumulative_cash_flow(pro_forma: pd.DataFrame, inputs: PropertyInputs):
+@timed
+def plot_cumulative_cash_flow(pro_forma: ProForma, inputs: PropertyInputs):
     """Plot cumulative cash flow"""
-    cash_flows = pro_forma['Pre_Tax_Cash_Flow'].tolist()
+    cash_flows = pro_forma['Pre_Tax_Cash_Flow']
     cumulative = np.cumsum(cash_flows)
     
     # Adjust for initial equity investment
@@ -1589,7 +3706,7 @@ def plot_cumulative_cash_flow(pro_forma: pd.DataFrame, inputs: PropertyInputs):
     fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
     
     fig.add_trace(go.Scatter(
-        x=pro_forma['Year'],
+        x=pro_forma.years,
         y=cumulative,
         mode='lines+markers',
         name='Cumulative Cash Flow',
@@ -1612,10 +3729,12 @@ def plot_cumulative_cash_flow(pro_forma: pd.DataFrame, inputs: PropertyInputs):
     return fig
 
 
-def plot_annual_cash_flow(pro_forma: pd.DataFrame):
+@timed
+def plot_annual_cash_flow(pro_forma: ProForma):
     """Plot annual cash flow distribution (pre-tax and after-tax)"""
     # Filter out Year 0
-    annual_df = pro_forma[pro_forma['Year'] > 0].copy()
+    annual_df = pro_forma.to_frame()
+    annual_df = annual_df[annual_df['Year'] > 0]
     
     fig = go.Figure()
     
@@ -1662,61 +3781,1600 @@ def plot_annual_cash_flow(pro_forma: pd.DataFrame):
     return fig
 
 
-def create_sensitivity_table(inputs: PropertyInputs, param1: str, param2: str, 
-                             metric: str, param1_range: List[float], 
-                             param2_range: List[float]) -> pd.DataFrame:
-    """Create sensitivity analysis table"""
-    results = []
-    
-    for p1_val in param1_range:
-        row = {}
-        for p2_val in param2_range:
-            # Create modified inputs
-            modified_inputs = PropertyInputs(**inputs.__dict__)
-            setattr(modified_inputs, param1, p1_val)
-            setattr(modified_inputs, param2, p2_val)
-            
-            # Calculate returns
-            analyzer = CREAnalyzer(modified_inputs)
-            analyzer.calculate_pro_forma()
-            returns = analyzer.calculate_returns()
-            
-            # Get metric value
-            if metric == 'IRR':
-                value = returns['irr'] * 100
-            elif metric == 'Cash-on-Cash':
-                value = returns['year1_coc'] * 100
-            elif metric == 'Equity Multiple':
-                value = returns['equity_multiple']
-            elif metric == 'NPV':
-                value = returns['npv']
-            else:
-                value = 0
-            
-            row[f"{p2_val}"] = value
-        
-        row['index'] = p1_val
-        results.append(row)
-    
-    df = pd.DataFrame(results).set_index('index')
-    return df
+# Sensitivity metric -> (returns key, display scale)
+SENSITIVITY_METRICS = {
+    'IRR': ('irr', 100),
+    'Cash-on-Cash': ('year1_coc', 100),
+    'Equity Multiple': ('equity_multiple', 1),
+    'NPV': ('npv', 1),
+    'DSCR': ('year1_dscr', 1),
+}
 
+# Inputs varied by default in global sensitivity, Monte Carlo and scaling runs
+SOBOL_DEFAULT_INPUTS = ('exit_cap_rate', 'rent_growth_rate', 'annual_rent_psf', 'interest_rate', 'stabilized_occupancy')
 
-def compare_scenarios(current_inputs: PropertyInputs, saved_inputs: PropertyInputs) -> pd.DataFrame:
-    """Compare two scenarios and return a difference dataframe"""
-    
-    # Calculate returns for both
-    analyzer_curr = CREAnalyzer(current_inputs)
-    analyzer_curr.calculate_pro_forma()
-    returns_curr = analyzer_curr.calculate_returns()
-    
-    analyzer_saved = CREAnalyzer(saved_inputs)
-    analyzer_saved.calculate_pro_forma()
-    returns_saved = analyzer_saved.calculate_returns()
-    
-    # Define metrics to compare
-    metrics = [
-        ('Purchase Price', current_inputs.purchase_price, saved_inputs.purchase_price, 'currency'),
+
+def evaluate_batch(variants: Sequence[PropertyInputs], keep_cash_flows: bool = False) -> ReturnsBatch:
+    """Returns for many input variants, in order, from one vectorized engine pass per group
+    
+    Variants that share tenants and period resolution are stacked and projected
+    together; in practice (sensitivities, sweeps) that is a single group.
+    """
+    groups: Dict[Tuple, List[int]] = {}
+    for i, variant in enumerate(variants):
+        structure = (variant.use_monthly_periods, variant.use_detailed_tenants, variant.tenants)
+        groups.setdefault(structure, []).append(i)
+    
+    n_periods = max(int(variant.hold_period_years) for variant in variants) + 1 if variants else 0
+    batch = ReturnsBatch.empty(len(variants), n_periods if keep_cash_flows else None)
+    budget = get_memory_budget()
+    for (monthly, _, _), indices in groups.items():
+        row_bytes = scenario_bytes(n_periods - 1, monthly)
+        chunk = budget.chunk_rows(row_bytes, len(indices))
+        for start in range(0, len(indices), chunk):
+            part = indices[start:start + chunk]
+            with budget.reserve(len(part) * row_bytes):
+                group = CREAnalyzer(stack_inputs([variants[i] for i in part])).calculate_batch_returns()
+            batch._values[:, part] = group._values
+            if keep_cash_flows:
+                batch.cash_flows[part, :group.cash_flows.shape[1]] = group.cash_flows
+    return batch
+
+
+# Peak engine working memory per scenario, measured with tracemalloc (about 40
+# float64 arrays per projection year, plus 18 per month in monthly mode), on
+# top of one stacked column per numeric input
+ENGINE_BYTES_PER_YEAR = 320
+ENGINE_BYTES_PER_MONTH = 144
+
+# One ReturnsBatch record
+RESULT_BYTES_PER_SCENARIO = len(RETURN_METRICS) * 8
+
+
+def scenario_bytes(hold_years: int, monthly: bool) -> int:
+    """Estimated peak engine memory for one scenario held hold_years"""
+    years = int(hold_years) + 1
+    engine = years * ENGINE_BYTES_PER_YEAR + (years * 12 * ENGINE_BYTES_PER_MONTH if monthly else 0)
+    return engine + 8 * len(NUMERIC_INPUT_FIELDS)
+
+
+def evaluate_samples(inputs: PropertyInputs, samples: Mapping[str, np.ndarray],
+                     keep_cash_flows: bool = False) -> ReturnsBatch:
+    """Returns for inputs with some numeric fields replaced by sample columns
+    
+    samples maps field name -> one value per scenario. Columns are fed straight
+    into the stacked engine in chunks sized to the memory budget, so no
+    PropertyInputs is built per scenario and working memory stays flat however
+    many scenarios there are; only the results grow with n, and a run whose
+    results alone exceed the budget raises MemoryBudgetError up front. Runs of
+    PARALLEL_MIN_SCENARIOS or more are spread over the process pool when more
+    than one worker is configured.
+    """
+    n = len(next(iter(samples.values())))
+    get_memory_budget().check(n * RESULT_BYTES_PER_SCENARIO, f"Results for {n:,} scenarios")
+    if n >= PARALLEL_MIN_SCENARIOS and PARALLEL_WORKERS > 1 and not keep_cash_flows:
+        return get_parallel_evaluator().evaluate_samples(inputs, samples)
+    return evaluate_samples_in_process(inputs, samples, keep_cash_flows)
+
+
+def evaluate_sample_metrics(inputs: PropertyInputs, samples: Mapping[str, np.ndarray], metrics: Sequence[str],
+                            progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, np.ndarray]:
+    """Selected metric columns of evaluate_samples
+    
+    Scenarios are evaluated in slices sized to the memory budget and only the
+    requested columns are kept, so full result records never exist for more
+    than one slice. progress, if given, is called with (evaluated, total)
+    after every slice.
+    """
+    n = len(next(iter(samples.values())))
+    budget = get_memory_budget()
+    budget.check(n * 8 * len(metrics), f"{len(metrics)} metric(s) for {n:,} scenarios")
+    step = budget.chunk_rows(RESULT_BYTES_PER_SCENARIO + 8 * len(samples), n)
+    
+    columns = {name: np.empty(n) for name in metrics}
+    for start in range(0, n, step):
+        batch = evaluate_samples(inputs, {name: values[start:start + step] for name, values in samples.items()})
+        for name in metrics:
+            columns[name][start:start + step] = batch[name]
+        if progress is not None:
+            progress(min(start + step, n), n)
+    return columns
+
+
+def evaluate_samples_in_process(inputs: PropertyInputs, samples: Mapping[str, np.ndarray],
+                                keep_cash_flows: bool = False, budget: Optional[MemoryBudget] = None) -> ReturnsBatch:
+    """evaluate_samples in the calling process
+    
+    Chunks are sized from scenario_bytes and reserved against budget (the
+    server-wide one by default). If a chunk still hits MemoryError it is
+    retried in halves rather than failing the run.
+    """
+    budget = budget or get_memory_budget()
+    n = len(next(iter(samples.values())))
+    hold_years = int(np.max(samples.get('hold_period_years', [inputs.hold_period_years])))
+    row_bytes = scenario_bytes(hold_years, inputs.use_monthly_periods)
+    chunk = budget.chunk_rows(row_bytes, n)
+    
+    batch = ReturnsBatch.empty(n, hold_years + 1 if keep_cash_flows else None)
+    start = 0
+    while start < n:
+        stop = min(start + chunk, n)
+        columns = {name: np.full((stop - start, 1), float(getattr(inputs, name))) for name in NUMERIC_INPUT_FIELDS}
+        for name, values in samples.items():
+            columns[name] = np.asarray(values[start:stop], dtype=np.float64)[:, None]
+        try:
+            with budget.reserve((stop - start) * row_bytes):
+                part = CREAnalyzer(inputs.with_overrides(**columns)).calculate_batch_returns()
+        except MemoryError:
+            if chunk == 1:
+                raise
+            chunk = max(1, chunk // 2)
+            memory_logger.warning("Out of memory at %d scenarios per chunk; retrying with %d", stop - start, chunk)
+            continue
+        
+        batch._values[:, start:stop] = part._values
+        if keep_cash_flows:
+            batch.cash_flows[start:stop, :part.cash_flows.shape[1]] = part.cash_flows
+        start = stop
+    return batch
+
+
+# Parallel execution
+PARALLEL_WORKERS = int(os.environ.get("CRE_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_CHUNK_SCENARIOS = int(os.environ.get("CRE_PARALLEL_CHUNK", "25000"))
+PARALLEL_MIN_SCENARIOS = int(os.environ.get("CRE_PARALLEL_MIN", "50000"))
+
+# Worker processes import the engine from this file by module name
+ENGINE_MODULE = Path(__file__).stem
+
+
+class _EngineModuleRef:
+    """Pickles as an import of ENGINE_MODULE in the receiving process"""
+    def __reduce__(self):
+        return (importlib.import_module, (ENGINE_MODULE,))
+
+
+class _EngineFunction:
+    """Pickles as a module-level engine function looked up by name in the worker
+    
+    Under Streamlit this script runs as __main__, which worker processes cannot
+    import, so functions are sent by name rather than by reference.
+    """
+    def __init__(self, name: str):
+        self.name = name
+    
+    def __reduce__(self):
+        return (getattr, (_EngineModuleRef(), self.name))
+
+
+class SharedArray(NamedTuple):
+    """Name and shape of a float64 array in shared memory; pickling it copies no data"""
+    name: str
+    shape: Tuple[int, ...]
+
+
+class ChunkTask(NamedTuple):
+    """One slice [start, stop) of a parallel evaluation"""
+    inputs: Dict                # asdict(PropertyInputs): plain data, no app classes
+    fields: Tuple[str, ...]
+    samples: SharedArray        # (fields x scenarios) sample values
+    output: SharedArray         # (len(RETURN_METRICS) x scenarios) results
+    start: int
+    stop: int
+    memory_limit: int           # this worker's share of the memory budget, in bytes
+    # Set for in-worker sampling: this chunk's seed and triangular (low, mode, high) per field
+    seed: Optional[np.random.SeedSequence] = None
+    distribution: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+
+def chunk_seed(seed: int, chunk_index: int) -> np.random.SeedSequence:
+    """Random stream for one chunk: depends on chunk position only, never on which worker runs it"""
+    return np.random.SeedSequence(seed, spawn_key=(chunk_index,))
+
+
+def _evaluate_chunk(task: ChunkTask) -> Tuple[int, int]:
+    """Worker entry point: evaluate one chunk, reading samples from and writing results to shared memory"""
+    samples_block = shared_memory.SharedMemory(name=task.samples.name)
+    output_block = shared_memory.SharedMemory(name=task.output.name)
+    samples = output = None
+    try:
+        samples = np.ndarray(task.samples.shape, dtype=np.float64, buffer=samples_block.buf)
+        output = np.ndarray(task.output.shape, dtype=np.float64, buffer=output_block.buf)
+        rows = slice(task.start, task.stop)
+        if task.seed is not None:
+            points = np.random.default_rng(task.seed).random((task.stop - task.start, len(task.fields)))
+            samples[:, rows] = triangular_ppf(points, *task.distribution).T
+        
+        inputs = inputs_from_dict(task.inputs)
+        batch = evaluate_samples_in_process(inputs, {name: samples[j, rows] for j, name in enumerate(task.fields)},
+                                            budget=MemoryBudget(task.memory_limit, chunk_share=1.0))
+        output[:, rows] = batch._values
+    finally:
+        # Views must go before the blocks can close
+        samples = output = None
+        samples_block.close()
+        output_block.close()
+    return task.start, task.stop
+
+
+class ParallelEvaluator:
+    """Spread large sample evaluations over a pool of worker processes
+    
+    Sample columns and results live in shared memory, so only a small task
+    description is pickled per chunk. Chunks are PARALLEL_CHUNK_SCENARIOS
+    scenarios and results land in their own slice of the output, so order is
+    preserved however the pool schedules them. Workers split one chunk share
+    of the memory budget between them, and the run reserves it while it
+    executes. The pool starts on first use
+    with the spawn method (safe next to the server's threads) and is shared
+    by every session.
+    """
+    
+    def __init__(self, workers: int = PARALLEL_WORKERS, chunk_scenarios: int = PARALLEL_CHUNK_SCENARIOS):
+        self.workers = max(1, workers)
+        self.chunk_scenarios = max(1, chunk_scenarios)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Workers import ENGINE_MODULE, so its directory must be importable
+                engine_dir = str(Path(__file__).resolve().parent)
+                if engine_dir not in sys.path:
+                    sys.path.insert(0, engine_dir)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+    
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+    
+    def evaluate_samples(self, inputs: PropertyInputs, samples: Mapping[str, np.ndarray]) -> ReturnsBatch:
+        """Parallel evaluate_samples (metrics only, no cash flows)"""
+        fields = tuple(samples)
+        values = np.array([np.asarray(samples[name], dtype=np.float64) for name in fields])
+        return self._run(inputs, fields, values)[1]
+    
+    def evaluate_random(self, inputs: PropertyInputs, fields: Sequence[str], bounds: np.ndarray,
+                        modes: np.ndarray, n_scenarios: int, seed: int = 0) -> Tuple[np.ndarray, ReturnsBatch]:
+        """Triangular random samples drawn inside the workers, and their returns
+        
+        Chunk i draws from chunk_seed(seed, i), so samples and results are
+        identical for any number of workers. Returns (fields x scenarios) samples.
+        """
+        fields = tuple(fields)
+        distribution = (bounds[:, 0], np.asarray(modes, dtype=np.float64), bounds[:, 1])
+        return self._run(inputs, fields, np.empty((len(fields), n_scenarios)), seed=seed, distribution=distribution)
+    
+    def _run(self, inputs: PropertyInputs, fields: Tuple[str, ...], values: np.ndarray,
+             seed: Optional[int] = None, distribution=None) -> Tuple[np.ndarray, ReturnsBatch]:
+        n = values.shape[1]
+        starts = range(0, n, self.chunk_scenarios)
+        budget = get_memory_budget()
+        budget.check((len(fields) + len(RETURN_METRICS)) * n * 8, f"Shared buffers for {n:,} scenarios")
+        worker_limit = int(budget.limit * budget.chunk_share // self.workers)
+        hold_years = inputs.hold_period_years
+        if 'hold_period_years' in fields:
+            row = fields.index('hold_period_years')
+            hold_years = np.ceil(distribution[2][row] if seed is not None else np.max(values[row]))
+        row_bytes = scenario_bytes(hold_years, inputs.use_monthly_periods)
+        reserved = min(self.workers, len(starts)) * min(worker_limit, self.chunk_scenarios * row_bytes)
+        
+        samples_block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        output_block = shared_memory.SharedMemory(create=True, size=max(len(RETURN_METRICS) * n * 8, 1))
+        samples = output = None
+        try:
+            samples = np.ndarray(values.shape, dtype=np.float64, buffer=samples_block.buf)
+            output = np.ndarray((len(RETURN_METRICS), n), dtype=np.float64, buffer=output_block.buf)
+            if seed is None:
+                samples[:] = values
+            
+            tasks = [
+                ChunkTask(
+                    inputs=asdict(inputs),
+                    fields=fields,
+                    samples=SharedArray(samples_block.name, values.shape),
+                    output=SharedArray(output_block.name, output.shape),
+                    start=start,
+                    stop=min(start + self.chunk_scenarios, n),
+                    memory_limit=worker_limit,
+                    seed=None if seed is None else chunk_seed(seed, i),
+                    distribution=distribution
+                )
+                for i, start in enumerate(starts)
+            ]
+            with budget.reserve(reserved):
+                if self.workers == 1:
+                    for task in tasks:
+                        _evaluate_chunk(task)
+                else:
+                    # list() waits for every chunk and re-raises the first worker error
+                    list(self._get_pool().map(_EngineFunction('_evaluate_chunk'), tasks))
+            
+            result = samples.copy(), ReturnsBatch(output.copy())
+        finally:
+            samples = output = None
+            samples_block.close()
+            samples_block.unlink()
+            output_block.close()
+            output_block.unlink()
+        return result
+
+
+def measure_parallel_scaling(inputs: PropertyInputs, n_scenarios: int = 200_000,
+                             worker_counts: Optional[Sequence[int]] = None,
+                             fields: Sequence[str] = SOBOL_DEFAULT_INPUTS,
+                             progress: Optional[Callable[[int, int, pd.DataFrame], None]] = None) -> pd.DataFrame:
+    """Time one random sweep of n_scenarios at each worker count
+    
+    Every run uses the same seed, so results must match exactly across worker
+    counts; Matches_Serial records that. Pools are started and warmed before
+    timing, so the numbers reflect steady-state throughput. progress, if
+    given, is called with (counts measured, total, curve so far) after each
+    worker count.
+    """
+    if worker_counts is None:
+        worker_counts = sorted({1, *(2 ** k for k in range(1, 8) if 2 ** k < PARALLEL_WORKERS), PARALLEL_WORKERS})
+    bounds = sample_ranges(inputs, fields, 0.2)
+    modes = np.array([getattr(inputs, name) for name in fields], dtype=np.float64)
+    
+    rows = []
+    reference = None
+    for workers in worker_counts:
+        evaluator = ParallelEvaluator(workers=workers)
+        try:
+            # Warm-up: start the workers and let them import the engine
+            evaluator.evaluate_random(inputs, fields, bounds, modes, min(n_scenarios, workers * evaluator.chunk_scenarios))
+            start = time.perf_counter()
+            _, batch = evaluator.evaluate_random(inputs, fields, bounds, modes, n_scenarios, seed=0)
+            seconds = time.perf_counter() - start
+        finally:
+            evaluator.shutdown()
+        if reference is None:
+            reference = batch
+        rows.append({
+            'Workers': workers,
+            'Seconds': seconds,
+            'Scenarios_per_Second': n_scenarios / seconds,
+            'Matches_Serial': bool(np.array_equal(batch._values, reference._values, equal_nan=True)),
+        })
+        if progress is not None:
+            progress(len(rows), len(worker_counts), scaling_frame(rows))
+    return scaling_frame(rows)
+
+
+def scaling_frame(rows: List[Dict]) -> pd.DataFrame:
+    """Timing rows of measure_parallel_scaling with speedup and efficiency against the first row"""
+    frame = pd.DataFrame(rows)
+    frame['Speedup'] = frame['Seconds'].iloc[0] / frame['Seconds']
+    frame['Efficiency'] = frame['Speedup'] / frame['Workers']
+    return frame
+
+
+@timed
+def create_sensitivity_table(inputs: PropertyInputs, param1: str, param2: str, 
+                             metric: str, param1_range: List[float], 
+                             param2_range: List[float]) -> pd.DataFrame:
+    """Create sensitivity analysis table"""
+    variants = [
+        inputs.with_overrides(**{param1: p1_val, param2: p2_val})
+        for p1_val in param1_range
+        for p2_val in param2_range
+    ]
+    
+    # Get metric value
+    batch = evaluate_batch(variants)
+    if metric in SENSITIVITY_METRICS:
+        key, scale = SENSITIVITY_METRICS[metric]
+        values = batch[key] * scale
+    else:
+        values = np.zeros(len(batch))
+    
+    df = pd.DataFrame(
+        values.reshape(len(param1_range), len(param2_range)),
+        index=pd.Index(param1_range, name='index'),
+        columns=[f"{p2_val}" for p2_val in param2_range]
+    )
+    return df
+
+
+class ContourResult(NamedTuple):
+    """Iso-metric boundary of metric == target over two inputs, from adaptive refinement"""
+    x_field: str
+    y_field: str
+    metric: str
+    target: float
+    segments: np.ndarray        # (k, 2, 2): [[x0, y0], [x1, y1]] per boundary segment
+    points: np.ndarray          # (m, 2): every (x, y) the engine evaluated
+    values: np.ndarray          # (m,): metric at each evaluated point
+    evaluations: int
+    uniform_evaluations: int    # points a uniform grid of the same resolution would need
+
+
+@timed
+def adaptive_contour(inputs: PropertyInputs, x_field: str, y_field: str,
+                     x_range: Tuple[float, float], y_range: Tuple[float, float],
+                     metric: str, target: float,
+                     initial_cells: int = 4, max_depth: int = 4) -> ContourResult:
+    """Trace where metric crosses target, refining only the cells that straddle it
+    
+    Starts from an initial_cells x initial_cells grid and splits any cell whose
+    corners fall on both sides of the target into four, down to max_depth
+    levels. Corners live on the finest lattice, so shared corners are evaluated
+    once, and each level is evaluated as one batch. Straddling cells at the
+    finest level are traced by marching squares with linear interpolation.
+    A contour that enters and leaves a coarse cell through the same edge is
+    not detected, so initial_cells bounds the smallest feature found.
+    
+    target is in the metric's display units (12 for a 12% IRR).
+    """
+    key, scale = SENSITIVITY_METRICS[metric]
+    resolution = initial_cells * 2 ** max_depth
+    xs = np.linspace(x_range[0], x_range[1], resolution + 1)
+    ys = np.linspace(y_range[0], y_range[1], resolution + 1)
+    values: Dict[Tuple[int, int], float] = {}
+    
+    def evaluate(lattice_points: List[Tuple[int, int]]):
+        new_points = [p for p in dict.fromkeys(lattice_points) if p not in values]
+        if not new_points:
+            return
+        batch = evaluate_batch([
+            inputs.with_overrides(**{x_field: xs[i], y_field: ys[j]}) for i, j in new_points
+        ])
+        values.update(zip(new_points, batch[key] * scale))
+    
+    def corners(i: int, j: int, size: int) -> List[Tuple[int, int]]:
+        # Counter-clockwise from the lower-left corner
+        return [(i, j), (i + size, j), (i + size, j + size), (i, j + size)]
+    
+    step = 2 ** max_depth
+    cells = [(i * step, j * step, step) for i in range(initial_cells) for j in range(initial_cells)]
+    boundary_cells = []
+    
+    while cells:
+        evaluate([corner for cell in cells for corner in corners(*cell)])
+        
+        refined = []
+        for i, j, size in cells:
+            # An undefined metric (no IRR) counts as below target
+            above = [values[c] >= target for c in corners(i, j, size)]
+            if any(above) and not all(above):
+                if size > 1:
+                    half = size // 2
+                    refined += [(i, j, half), (i + half, j, half), (i, j + half, half), (i + half, j + half, half)]
+                else:
+                    boundary_cells.append((i, j))
+        cells = refined
+    
+    # Marching squares: one crossing per edge whose end points straddle the target
+    segments = []
+    for i, j in boundary_cells:
+        ring = corners(i, j, 1)
+        crossings = []
+        for (a_i, a_j), (b_i, b_j) in zip(ring, ring[1:] + ring[:1]):
+            value_a, value_b = values[(a_i, a_j)], values[(b_i, b_j)]
+            if (value_a >= target) == (value_b >= target):
+                continue
+            t = (target - value_a) / (value_b - value_a) if np.isfinite(value_a - value_b) else 0.5
+            crossings.append((
+                xs[a_i] + t * (xs[b_i] - xs[a_i]),
+                ys[a_j] + t * (ys[b_j] - ys[a_j])
+            ))
+        # Two crossings make one segment; a saddle cell has four and two segments
+        segments += [(crossings[k], crossings[k + 1]) for k in range(0, len(crossings) - 1, 2)]
+    
+    lattice = np.array(list(values.keys()))
+    return ContourResult(
+        x_field=x_field,
+        y_field=y_field,
+        metric=metric,
+        target=target,
+        segments=np.array(segments).reshape(-1, 2, 2),
+        points=np.column_stack([xs[lattice[:, 0]], ys[lattice[:, 1]]]),
+        values=np.array(list(values.values())),
+        evaluations=len(values),
+        uniform_evaluations=(resolution + 1) ** 2
+    )
+
+
+# Display label per numeric input, in sidebar order
+INPUT_FIELD_LABELS = {
+    'building_size': 'Building Size',
+    'purchase_price': 'Purchase Price',
+    'closing_costs_pct': 'Closing Costs',
+    'down_payment_pct': 'Down Payment',
+    'interest_rate': 'Interest Rate',
+    'loan_term_years': 'Loan Term',
+    'annual_rent_psf': 'Rent per SF',
+    'rent_growth_rate': 'Rent Growth',
+    'stabilized_occupancy': 'Stabilized Occupancy',
+    'year1_occupancy': 'Year 1 Occupancy',
+    'other_income_pct': 'Other Income',
+    'property_tax_psf': 'Property Tax per SF',
+    'insurance_psf': 'Insurance per SF',
+    'cam_psf': 'CAM per SF',
+    'property_mgmt_pct': 'Property Management',
+    'leasing_commission_pct': 'Leasing Commissions',
+    'repairs_maintenance': 'Repairs & Maintenance',
+    'capex_reserve_psf': 'CapEx Reserve per SF',
+    'initial_ti': 'Initial TI',
+    'tax_rate': 'Tax Rate',
+    'land_value_pct': 'Land Value',
+    'depreciation_period': 'Depreciation Period',
+    'hold_period_years': 'Hold Period',
+    'exit_cap_rate': 'Exit Cap Rate',
+    'sale_costs_pct': 'Sale Costs',
+    'discount_rate': 'Discount Rate',
+}
+
+# Inputs that are shares of a whole and cannot be shocked past 100%
+FRACTION_INPUT_FIELDS = frozenset({
+    'down_payment_pct', 'stabilized_occupancy', 'year1_occupancy', 'tax_rate', 'land_value_pct'
+})
+
+TORNADO_METRICS = ('IRR', 'NPV', 'DSCR')
+
+
+class TornadoResult(NamedTuple):
+    """Low / high shock of every numeric input and the metric each one produces"""
+    shock: float
+    base: Dict[str, float]      # metric -> value at the current inputs (display units)
+    table: pd.DataFrame         # one row per shocked input, sorted by IRR swing
+    evaluations: int
+
+
+def shocked_values(inputs: PropertyInputs, field_name: str, shock: float) -> Tuple[float, float]:
+    """Low and high value of one input shocked by +/- shock (a fraction of its value)"""
+    value = getattr(inputs, field_name)
+    low, high = value * (1 - shock), value * (1 + shock)
+    if field_name in FRACTION_INPUT_FIELDS:
+        high = min(high, 1.0)
+    if PropertyInputs.__dataclass_fields__[field_name].type in (int, 'int'):
+        # Whole years: move at least one year each way, never below one
+        low = max(1, min(round(low), value - 1))
+        high = max(round(high), value + 1)
+    return low, high
+
+
+@timed
+def tornado_analysis(inputs: PropertyInputs, shock: float = 0.10) -> TornadoResult:
+    """Shock every numeric input down and up by shock and rank inputs by metric swing
+    
+    The base case and all 2 x len(NUMERIC_INPUT_FIELDS) variants go through the
+    engine as a single batch. Inputs that are zero in the current scenario have
+    nothing to shock and are left out.
+    """
+    shocked = {
+        name: shocked_values(inputs, name, shock)
+        for name in NUMERIC_INPUT_FIELDS
+        if getattr(inputs, name) != 0
+    }
+    variants = [inputs]
+    variants += [inputs.with_overrides(**{name: low}) for name, (low, _) in shocked.items()]
+    variants += [inputs.with_overrides(**{name: high}) for name, (_, high) in shocked.items()]
+    batch = evaluate_batch(variants)
+    
+    n = len(shocked)
+    table = pd.DataFrame({
+        'Field': list(shocked),
+        'Input': [INPUT_FIELD_LABELS.get(name, name) for name in shocked],
+        'Base_Value': [getattr(inputs, name) for name in shocked],
+        'Low_Value': [low for low, _ in shocked.values()],
+        'High_Value': [high for _, high in shocked.values()],
+    })
+    base = {}
+    for metric in TORNADO_METRICS:
+        key, scale = SENSITIVITY_METRICS[metric]
+        values = batch[key] * scale
+        base[metric] = float(values[0])
+        table[f'{metric}_Low'] = values[1:n + 1]
+        table[f'{metric}_High'] = values[n + 1:]
+        table[f'{metric}_Swing'] = np.abs(values[n + 1:] - values[1:n + 1])
+    
+    table = table.sort_values('IRR_Swing', ascending=False, na_position='last', ignore_index=True)
+    return TornadoResult(shock=shock, base=base, table=table, evaluations=len(variants))
+
+
+# Continuous inputs; whole-year inputs are step functions with no derivative
+GRADIENT_INPUT_FIELDS = tuple(
+    name for name in NUMERIC_INPUT_FIELDS if PropertyInputs.__dataclass_fields__[name].type in (float, 'float')
+)
+
+# Elasticity table metric -> returns key
+GRADIENT_METRICS = {
+    'IRR': 'irr',
+    'NPV': 'npv',
+    'Equity Multiple': 'equity_multiple',
+    'DSCR': 'year1_dscr',
+}
+
+
+class InputGradients(NamedTuple):
+    """Exact partial derivatives of every return metric with respect to each continuous input"""
+    fields: Tuple[str, ...]
+    values: np.ndarray          # (inputs,): input values the derivatives are taken at
+    base: np.ndarray            # (len(RETURN_METRICS),): metrics at those inputs
+    gradient: np.ndarray        # (len(RETURN_METRICS), inputs): d metric / d input
+    
+    def partials(self, metric: str) -> np.ndarray:
+        """d metric / d input for every input"""
+        return self.gradient[RETURN_METRIC_INDEX[metric]]
+    
+    def elasticities(self, metric: str) -> np.ndarray:
+        """Percent change in metric per 1% change in each input"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.partials(metric) * self.values / self.base[RETURN_METRIC_INDEX[metric]]
+    
+    def to_frame(self, elasticity: bool = True) -> pd.DataFrame:
+        """One row per input, one column per GRADIENT_METRICS entry"""
+        frame = pd.DataFrame({
+            'Field': list(self.fields),
+            'Input': [INPUT_FIELD_LABELS.get(name, name) for name in self.fields],
+            'Value': self.values,
+        })
+        for label, key in GRADIENT_METRICS.items():
+            frame[label] = self.elasticities(key) if elasticity else self.partials(key)
+        return frame
+
+
+@timed
+def input_gradients(inputs: PropertyInputs, fields: Sequence[str] = GRADIENT_INPUT_FIELDS) -> InputGradients:
+    """Partial derivatives of all return metrics from one augmented engine pass
+    
+    Forward-mode differentiation by complex step: scenario i of a stacked batch
+    perturbs input i by an imaginary step h, so every engine value carries
+    f + i*h*df/dx_i and imag / h is the derivative to machine precision, with
+    no subtractive cancellation. Kinks such as max(0, taxable_income) take the
+    one-sided derivative of the branch the inputs are on. NPV is differentiated
+    directly; the IRR tangent comes from the implicit function theorem in batch_irr.
+    """
+    fields = tuple(fields)
+    values = np.array([getattr(inputs, name) for name in fields], dtype=np.float64)
+    steps = 1e-20 * np.maximum(np.abs(values), 1.0)
+    
+    n = len(fields)
+    columns = {name: np.full((n, 1), float(getattr(inputs, name))) for name in NUMERIC_INPUT_FIELDS}
+    for i, name in enumerate(fields):
+        column = columns[name].astype(np.complex128)
+        column[i, 0] += 1j * steps[i]
+        columns[name] = column
+    
+    metrics, _ = CREAnalyzer(inputs.with_overrides(**columns)).calculate_batch_metrics()
+    stacked = np.array([np.broadcast_to(metrics[name], (n,)) for name in RETURN_METRICS])
+    return InputGradients(
+        fields=fields,
+        values=values,
+        base=stacked[:, 0].real.copy(),
+        gradient=stacked.imag / steps
+    )
+
+
+# Global sensitivity metric -> returns key
+SOBOL_METRICS = {
+    'IRR': 'irr',
+    'NPV': 'npv',
+}
+
+
+class SobolResult(NamedTuple):
+    """First-order and total Sobol indices, with 95% confidence half-widths"""
+    fields: Tuple[str, ...]
+    metrics: Tuple[str, ...]    # SOBOL_METRICS labels
+    first_order: np.ndarray     # (metrics x fields)
+    first_order_ci: np.ndarray
+    total: np.ndarray           # (metrics x fields)
+    total_ci: np.ndarray
+    variance: np.ndarray        # (metrics,): output variance over the sampled ranges
+    evaluations: int
+    valid_rows: np.ndarray      # (metrics,): base rows used (rows with no IRR are dropped)
+    
+    def to_frame(self, metric: str) -> pd.DataFrame:
+        """One row per input: first-order and total index with intervals, sorted by total"""
+        m = self.metrics.index(metric)
+        frame = pd.DataFrame({
+            'Input': [INPUT_FIELD_LABELS.get(name, name) for name in self.fields],
+            'First_Order': self.first_order[m],
+            'First_Order_CI': self.first_order_ci[m],
+            'Total': self.total[m],
+            'Total_CI': self.total_ci[m],
+        })
+        frame['Interaction'] = frame['Total'] - frame['First_Order']
+        return frame.sort_values('Total', ascending=False, ignore_index=True)
+
+
+def sample_ranges(inputs: PropertyInputs, fields: Sequence[str], spread: float) -> np.ndarray:
+    """(fields x 2) low / high bounds of +/- spread around each input, capped like the tornado shocks"""
+    return np.array([shocked_values(inputs, name, spread) for name in fields], dtype=np.float64)
+
+
+@timed
+def sobol_indices(inputs: PropertyInputs, fields: Sequence[str], spread: float = 0.2,
+                  log2_samples: int = 12, seed: int = 0,
+                  progress: Optional[Callable[[int, int], None]] = None) -> SobolResult:
+    """Variance-based global sensitivity of IRR and NPV to the chosen inputs
+    
+    Each input is uniform over +/- spread of its current value. A scrambled
+    Sobol sequence gives the two base matrices A and B of Saltelli's design;
+    with AB_i (A with column i from B) that is N * (k + 2) model evaluations for
+    N = 2 ** log2_samples base rows and k inputs, all run through
+    evaluate_samples. First-order indices use the Saltelli (2010) estimator,
+    total indices Jansen's; intervals are 95% normal-approximation half-widths
+    of the per-row estimator terms. progress is passed to evaluate_sample_metrics.
+    """
+    fields = tuple(fields)
+    k = len(fields)
+    n = 2 ** log2_samples
+    bounds = sample_ranges(inputs, fields, spread)
+    if k == 0 or np.any(bounds[:, 1] <= bounds[:, 0]):
+        raise ValueError("Sobol indices need at least one input with a non-empty range")
+    
+    design = qmc.Sobol(d=2 * k, scramble=True, seed=seed).random_base2(log2_samples)
+    a = qmc.scale(design[:, :k], bounds[:, 0], bounds[:, 1])
+    b = qmc.scale(design[:, k:], bounds[:, 0], bounds[:, 1])
+    
+    # Blocks in order: A, B, AB_1 .. AB_k
+    samples = {}
+    for j, name in enumerate(fields):
+        blocks = [a[:, j], b[:, j]] + [b[:, j] if i == j else a[:, j] for i in range(k)]
+        samples[name] = np.concatenate(blocks)
+    columns = evaluate_sample_metrics(inputs, samples, tuple(SOBOL_METRICS.values()), progress)
+    
+    shape = (len(SOBOL_METRICS), k)
+    first_order, first_order_ci = np.full(shape, np.nan), np.full(shape, np.nan)
+    total, total_ci = np.full(shape, np.nan), np.full(shape, np.nan)
+    variance = np.full(len(SOBOL_METRICS), np.nan)
+    valid_rows = np.zeros(len(SOBOL_METRICS), dtype=int)
+    for m, key in enumerate(SOBOL_METRICS.values()):
+        values = columns[key].reshape(k + 2, n)
+        valid = np.isfinite(values).all(axis=0)
+        f_a, f_b, f_ab = values[0, valid], values[1, valid], values[2:, valid]
+        valid_rows[m] = valid.sum()
+        if valid_rows[m] < 2:
+            continue
+        
+        variance[m] = np.var(np.concatenate([f_a, f_b]))
+        first_terms = f_b * (f_ab - f_a)
+        total_terms = 0.5 * (f_a - f_ab) ** 2
+        z = 1.96 / np.sqrt(valid_rows[m]) / variance[m]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            first_order[m] = first_terms.mean(axis=1) / variance[m]
+            first_order_ci[m] = z * first_terms.std(axis=1)
+            total[m] = total_terms.mean(axis=1) / variance[m]
+            total_ci[m] = z * total_terms.std(axis=1)
+    
+    return SobolResult(
+        fields=fields,
+        metrics=tuple(SOBOL_METRICS),
+        first_order=first_order,
+        first_order_ci=first_order_ci,
+        total=total,
+        total_ci=total_ci,
+        variance=variance,
+        evaluations=n * (k + 2),
+        valid_rows=valid_rows
+    )
+
+
+MONTE_CARLO_SAMPLERS = ('Sobol', 'Latin Hypercube', 'Random')
+
+# Percentiles the convergence monitor watches
+MONTE_CARLO_STOP_PERCENTILES = (10, 50)
+
+# Independent randomized streams; their spread gives the confidence intervals
+MONTE_CARLO_REPLICATES = 8
+
+
+class MonteCarloResult(NamedTuple):
+    """Pooled IRR / NPV draws of a stochastic run and how its stopping rule played out"""
+    fields: Tuple[str, ...]
+    sampler: str
+    irr: np.ndarray             # (draws,) after-tax IRR, NaN where no IRR exists
+    npv: np.ndarray             # (draws,)
+    percentiles: Dict[int, float]   # IRR percentile over draws with an IRR -> estimate (mean over replicates)
+    half_widths: Dict[int, float]   # IRR percentile -> 95% confidence half-width
+    no_irr_share: float         # share of draws without an IRR, left out of the percentiles
+    draws: int
+    max_draws: int
+    converged: bool
+    history: pd.DataFrame       # one row per round: draws, estimates and half-widths
+
+
+def triangular_ppf(u: np.ndarray, low: np.ndarray, mode: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """Map uniform [0, 1) draws to triangular(low, mode, high) by the inverse CDF"""
+    width = high - low
+    split = (mode - low) / width
+    return np.where(
+        u < split,
+        low + np.sqrt(u * width * (mode - low)),
+        high - np.sqrt((1 - u) * width * (high - mode))
+    )
+
+
+def uniform_draws(sampler: str, dimensions: int, seed: np.random.SeedSequence) -> Callable[[int], np.ndarray]:
+    """Draw function for one replicate stream: n -> (n x dimensions) points in [0, 1)"""
+    if sampler == 'Sobol':
+        # Successive draws continue one scrambled sequence
+        return qmc.Sobol(d=dimensions, scramble=True, seed=np.random.default_rng(seed)).random
+    if sampler == 'Latin Hypercube':
+        # Every draw is a fresh stratified block
+        return qmc.LatinHypercube(d=dimensions, seed=np.random.default_rng(seed)).random
+    if sampler == 'Random':
+        rng = np.random.default_rng(seed)
+        return lambda n: rng.random((n, dimensions))
+    raise ValueError(f"Unknown sampler: {sampler}")
+
+
+@timed
+def monte_carlo(inputs: PropertyInputs, fields: Sequence[str], spread: float = 0.2,
+                sampler: str = 'Sobol', tolerance: float = 0.001, max_draws: int = 2 ** 17,
+                replicates: int = MONTE_CARLO_REPLICATES, initial_draws: int = 2 ** 8, seed: int = 0,
+                progress: Optional[Callable[..., None]] = None) -> MonteCarloResult:
+    """Stochastic IRR / NPV with stratified sampling and a convergence-based stop
+    
+    Each input is triangular between -/+ spread of its current value (the
+    mode). Draws come in rounds from `replicates` independent randomized
+    streams (scrambled Sobol, Latin hypercube or plain random), doubling the
+    draws per stream each round so Sobol points stay balanced. The spread of
+    the per-stream P10 / P50 IRR gives a Student-t confidence interval that
+    reflects the sampler's variance reduction. Sampling stops once every
+    half-width is within tolerance (IRR as a decimal) or max_draws is reached.
+    Draws without an IRR (no sign change, or a rate outside batch_irr's
+    bracket) are counted in no_irr_share rather than ranked, since they can be
+    total losses or very high returns.
+    progress, if given, is called with (draws, max_draws) as slices finish and
+    with (draws, max_draws, convergence history so far) after every round.
+    """
+    fields = tuple(fields)
+    bounds = sample_ranges(inputs, fields, spread)
+    if not fields or np.any(bounds[:, 1] <= bounds[:, 0]):
+        raise ValueError("Monte Carlo needs at least one input with a non-empty range")
+    modes = np.clip([getattr(inputs, name) for name in fields], bounds[:, 0], bounds[:, 1])
+    
+    streams = [uniform_draws(sampler, len(fields), seed) for seed in np.random.SeedSequence(seed).spawn(replicates)]
+    irr_draws = [np.empty(0) for _ in streams]
+    npv_draws = [np.empty(0) for _ in streams]
+    t_critical = student_t.ppf(0.975, replicates - 1)
+    
+    history = []
+    per_stream = initial_draws
+    while True:
+        new_draws = per_stream - len(irr_draws[0])
+        points = np.concatenate([draw(new_draws) for draw in streams])
+        values = triangular_ppf(points, bounds[:, 0], modes, bounds[:, 1])
+        drawn = len(irr_draws[0]) * replicates
+        report = None if progress is None else lambda done, _: progress(drawn + done, max_draws)
+        columns = evaluate_sample_metrics(inputs, {name: values[:, j] for j, name in enumerate(fields)}, ('irr', 'npv'),
+                                          report)
+        for r in range(replicates):
+            rows = slice(r * new_draws, (r + 1) * new_draws)
+            irr_draws[r] = np.concatenate([irr_draws[r], columns['irr'][rows]])
+            npv_draws[r] = np.concatenate([npv_draws[r], columns['npv'][rows]])
+        
+        # Percentiles of the draws that have an IRR; a stream with none gives NaN
+        estimates = np.array([
+            np.percentile(irr[~np.isnan(irr)], MONTE_CARLO_STOP_PERCENTILES) if not np.isnan(irr).all()
+            else np.full(len(MONTE_CARLO_STOP_PERCENTILES), np.nan)
+            for irr in irr_draws
+        ])
+        no_irr_share = float(np.mean([np.isnan(irr).mean() for irr in irr_draws]))
+        with np.errstate(invalid='ignore'):
+            percentiles = estimates.mean(axis=0)
+            half_widths = t_critical * estimates.std(axis=0, ddof=1) / np.sqrt(replicates)
+        half_widths = np.where(np.isfinite(half_widths), half_widths, np.inf)
+        
+        draws = per_stream * replicates
+        history.append({'Draws': draws, **{f'P{q}': v for q, v in zip(MONTE_CARLO_STOP_PERCENTILES, percentiles)},
+                        **{f'P{q}_Half_Width': h for q, h in zip(MONTE_CARLO_STOP_PERCENTILES, half_widths)},
+                        'No_IRR_Share': no_irr_share})
+        converged = bool(np.all(half_widths <= tolerance))
+        if progress is not None:
+            progress(draws, max_draws, pd.DataFrame(history))
+        if converged or draws * 2 > max_draws:
+            break
+        per_stream *= 2
+    
+    return MonteCarloResult(
+        fields=fields,
+        sampler=sampler,
+        irr=np.concatenate(irr_draws),
+        npv=np.concatenate(npv_draws),
+        percentiles=dict(zip(MONTE_CARLO_STOP_PERCENTILES, percentiles.tolist())),
+        half_widths=dict(zip(MONTE_CARLO_STOP_PERCENTILES, half_widths.tolist())),
+        no_irr_share=no_irr_share,
+        draws=draws,
+        max_draws=max_draws,
+        converged=converged,
+        history=pd.DataFrame(history)
+    )
+
+
+# Scenarios generated and evaluated per sweep chunk (large chunks go to the process pool)
+SWEEP_CHUNK_SCENARIOS = 100_000
+
+# Metrics with running summary statistics in a sweep
+SWEEP_SUMMARY_METRICS = ('irr', 'npv', 'equity_multiple', 'year1_dscr', 'year1_coc')
+
+
+class RunningStats:
+    """Count / mean / std / min / max per metric, merged chunk by chunk (Chan et al.)"""
+    
+    def __init__(self, n_metrics: int):
+        self.count = np.zeros(n_metrics)
+        self.missing = np.zeros(n_metrics)
+        self.mean = np.zeros(n_metrics)
+        self.m2 = np.zeros(n_metrics)
+        self.min = np.full(n_metrics, np.inf)
+        self.max = np.full(n_metrics, -np.inf)
+    
+    def update(self, values: np.ndarray):
+        """Fold in a (metrics x scenarios) block; NaN values are counted as missing"""
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=1)
+        self.missing += values.shape[1] - count
+        if not count.any():
+            return
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, np.nansum(values, axis=1) / count, 0.0)
+            m2 = np.nansum((values - mean[:, None]) ** 2, axis=1)
+            total = self.count + count
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * count / total, 0.0)
+            self.m2 = np.where(total > 0, self.m2 + m2 + delta ** 2 * self.count * count / total, 0.0)
+        self.count = total
+        self.min = np.fmin(self.min, np.nanmin(np.where(valid, values, np.inf), axis=1))
+        self.max = np.fmax(self.max, np.nanmax(np.where(valid, values, -np.inf), axis=1))
+    
+    def to_frame(self, names: Sequence[str]) -> pd.DataFrame:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self.m2 / np.maximum(self.count - 1, 1))
+        return pd.DataFrame({
+            'Metric': list(names),
+            'Count': self.count.astype(int),
+            'Missing': self.missing.astype(int),
+            'Mean': np.where(self.count > 0, self.mean, np.nan),
+            'Std': np.where(self.count > 1, std, np.nan),
+            'Min': np.where(self.count > 0, self.min, np.nan),
+            'Max': np.where(self.count > 0, self.max, np.nan),
+        })
+
+
+class SweepResult(NamedTuple):
+    """Streaming summary of a Cartesian-product sweep: top-k combinations and running statistics"""
+    axes: Dict[str, np.ndarray]
+    metric: str
+    largest: bool
+    top: pd.DataFrame           # top-k combinations: axis values, metric, then SWEEP_SUMMARY_METRICS
+    summary: pd.DataFrame       # SWEEP_SUMMARY_METRICS running statistics
+    combinations: int
+
+
+def sweep_axes(inputs: PropertyInputs, fields: Sequence[str], spread: float, points: int) -> Dict[str, np.ndarray]:
+    """Evenly spaced values across +/- spread of each input (whole years for integer inputs)"""
+    axes = {}
+    for name, (low, high) in zip(fields, sample_ranges(inputs, fields, spread)):
+        values = np.linspace(low, high, points)
+        if PropertyInputs.__dataclass_fields__[name].type in (int, 'int'):
+            values = np.unique(np.round(values))
+        axes[name] = values
+    return axes
+
+
+def sweep_combinations(axes: Mapping[str, Sequence[float]]) -> int:
+    """Number of points in the Cartesian product of the axes"""
+    return int(np.prod([len(values) for values in axes.values()], dtype=np.int64))
+
+
+def sweep_values(axes: Mapping[str, Sequence[float]], indices: np.ndarray) -> Dict[str, np.ndarray]:
+    """Axis values of the combinations at flat indices (np.unravel_index order, last axis fastest)"""
+    values = [np.asarray(v, dtype=np.float64) for v in axes.values()]
+    positions = np.unravel_index(indices, tuple(len(v) for v in values))
+    return {name: axis[position] for name, axis, position in zip(axes, values, positions)}
+
+
+def sweep_chunk_scenarios(axes: Mapping[str, Sequence[float]]) -> int:
+    """Combinations per sweep chunk: SWEEP_CHUNK_SCENARIOS, or fewer if a chunk's samples and
+    results would not fit a chunk share of the memory budget"""
+    return get_memory_budget().chunk_rows(8 * (len(axes) + 1) + RESULT_BYTES_PER_SCENARIO, SWEEP_CHUNK_SCENARIOS)
+
+
+def sweep_chunks(axes: Mapping[str, Sequence[float]], chunk_scenarios: int = SWEEP_CHUNK_SCENARIOS,
+                 start: int = 0) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """Lazily yield (flat indices, {field: values}) blocks of the Cartesian product from combination start
+    
+    Only one block exists at a time.
+    """
+    total = sweep_combinations(axes)
+    for first in range(start, total, chunk_scenarios):
+        indices = np.arange(first, min(first + chunk_scenarios, total))
+        yield indices, sweep_values(axes, indices)
+
+
+def select_top(index: np.ndarray, score: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest finite scores, best first; ties go to the lower index"""
+    candidates = np.flatnonzero(np.isfinite(score))
+    if len(candidates) > k:
+        # Keep everything tied with the k-th best so the tie-break below is exact
+        kth = np.partition(score[candidates], len(candidates) - k)[len(candidates) - k]
+        candidates = candidates[score[candidates] >= kth]
+    return candidates[np.lexsort((index[candidates], -score[candidates]))[:k]]
+
+
+@timed
+def parameter_sweep(inputs: PropertyInputs, axes: Mapping[str, Sequence[float]], metric: str = 'irr',
+                    top_k: int = 20, largest: bool = True, chunk_scenarios: Optional[int] = None,
+                    progress: Optional[Callable[[int, int, pd.DataFrame], None]] = None) -> SweepResult:
+    """Sweep the Cartesian product of axes (field -> values) without materializing it
+    
+    Combinations are generated and evaluated chunk by chunk (see sweep_chunks
+    and evaluate_samples); each chunk only updates a top-k buffer ranked by
+    metric and the running statistics, so memory is flat in the sweep size.
+    Scenarios without a value for metric (no IRR) never rank. progress, if
+    given, is called with (evaluated, total, top combinations so far) after
+    every chunk.
+    """
+    axes = {name: np.asarray(values, dtype=np.float64) for name, values in axes.items()}
+    chunk_scenarios = chunk_scenarios or sweep_chunk_scenarios(axes)
+    total = sweep_combinations(axes)
+    metric_row = RETURN_METRIC_INDEX[metric]
+    stats = RunningStats(len(SWEEP_SUMMARY_METRICS))
+    summary_rows = [RETURN_METRIC_INDEX[name] for name in SWEEP_SUMMARY_METRICS]
+    
+    top_index = np.empty(0, dtype=np.int64)
+    top_score = np.empty(0)
+    top_values = np.empty((len(RETURN_METRICS), 0))
+    
+    def top_frame() -> pd.DataFrame:
+        top = pd.DataFrame(sweep_values(axes, top_index))
+        for name in dict.fromkeys((metric,) + SWEEP_SUMMARY_METRICS):
+            top[name] = top_values[RETURN_METRIC_INDEX[name]]
+        return top
+    
+    evaluated = 0
+    for indices, block in sweep_chunks(axes, chunk_scenarios):
+        batch = evaluate_samples(inputs, block)
+        stats.update(batch._values[summary_rows])
+        
+        score = batch._values[metric_row] if largest else -batch._values[metric_row]
+        keep = select_top(indices, score, top_k)
+        
+        # Merge with the running top-k
+        top_index = np.concatenate([top_index, indices[keep]])
+        top_score = np.concatenate([top_score, score[keep]])
+        top_values = np.concatenate([top_values, batch._values[:, keep]], axis=1)
+        order = select_top(top_index, top_score, top_k)
+        top_index, top_score, top_values = top_index[order], top_score[order], top_values[:, order]
+        
+        evaluated += len(indices)
+        if progress is not None:
+            progress(evaluated, total, top_frame())
+    
+    return SweepResult(
+        axes=axes,
+        metric=metric,
+        largest=largest,
+        top=top_frame(),
+        summary=stats.to_frame(SWEEP_SUMMARY_METRICS),
+        combinations=total
+    )
+
+
+# Out-of-core sweep results
+RESULT_STORE_DIR = os.environ.get("CRE_RESULT_STORE_DIR", str(CACHE_DIR / "sweeps"))
+# Least recently used stores are deleted once all stores together exceed this
+RESULT_STORE_MAX_MB = float(os.environ.get("CRE_RESULT_STORE_MAX_MB", "4096"))
+
+# Rows read per block when scanning a result store
+RESULT_STORE_BLOCK_ROWS = 1_000_000
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent runs of the same store are not serialized
+    fcntl = None
+
+
+@contextmanager
+def store_lock(path: Path, blocking: bool = True):
+    """Exclusive lock on a result store directory, held across processes
+    
+    Without blocking, raises BlockingIOError if someone else holds it.
+    """
+    with open(path / 'lock', 'w') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class ResultStore:
+    """Sweep results on disk: one memory-mapped float64 column per metric
+    
+    A store directory holds manifest.json (axes, metrics, rows completed)
+    and one <metric>.npy per metric, in combination order. Axis values are
+    not stored; they are decoded from the row number (see sweep_values).
+    Chunks are appended in order and the manifest is replaced atomically
+    only after a chunk's columns are flushed, so an interrupted sweep loses
+    at most the chunk in flight. Queries scan completed rows in blocks of
+    RESULT_STORE_BLOCK_ROWS and never load a whole column.
+    
+    where arguments map column -> (low, high) inclusive bounds, either end
+    None for open; rows with NaN in a filtered column never match.
+    """
+    
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path / 'manifest.json') as f:
+            self.manifest = json.load(f)
+        self.axes = {name: np.asarray(values, dtype=np.float64) for name, values in self.manifest['axes'].items()}
+        self.metrics = tuple(self.manifest['metrics'])
+        self.combinations = self.manifest['combinations']
+        self.completed = self.manifest['completed']
+    
+    @classmethod
+    def create(cls, path: Union[str, Path], axes: Mapping[str, Sequence[float]], metrics: Sequence[str],
+               meta: Optional[Dict] = None) -> 'ResultStore':
+        """Empty store for the Cartesian product of axes (columns are allocated sparsely)"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        total = sweep_combinations(axes)
+        for name in metrics:
+            column = np.lib.format.open_memmap(path / f'{name}.npy', mode='w+', dtype=np.float64, shape=(total,))
+            del column
+        manifest = {
+            'engine_version': ENGINE_VERSION,
+            'axes': {name: np.asarray(values, dtype=np.float64).tolist() for name, values in axes.items()},
+            'metrics': list(metrics),
+            'combinations': total,
+            'completed': 0,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'meta': meta or {},
+        }
+        cls._write_manifest(path, manifest)
+        return cls(path)
+    
+    @staticmethod
+    def _write_manifest(path: Path, manifest: Dict):
+        temp = path / 'manifest.json.tmp'
+        with open(temp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path / 'manifest.json')
+    
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(self.axes) + self.metrics
+    
+    @property
+    def complete(self) -> bool:
+        return self.completed >= self.combinations
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes of metric data written so far"""
+        return self.completed * len(self.metrics) * 8
+    
+    def append(self, indices: np.ndarray, values: Mapping[str, np.ndarray]):
+        """Write the next chunk of rows (indices must continue from completed) and commit it"""
+        if len(indices) == 0:
+            return
+        if indices[0] != self.completed:
+            raise ValueError(f"Chunk starts at row {indices[0]}, store has {self.completed} rows")
+        start, stop = self.completed, self.completed + len(indices)
+        for name in self.metrics:
+            column = np.load(self.path / f'{name}.npy', mmap_mode='r+')
+            column[start:stop] = values[name]
+            column.flush()
+            del column
+        self.completed = stop
+        self.manifest['completed'] = stop
+        self._write_manifest(self.path, self.manifest)
+    
+    def _read(self, name: str, start: int, stop: int) -> np.ndarray:
+        if name in self.axes:
+            return sweep_values(self.axes, np.arange(start, stop))[name]
+        if name not in self.metrics:
+            raise KeyError(f"Unknown column {name!r}; store has {', '.join(self.columns)}")
+        return np.array(np.load(self.path / f'{name}.npy', mmap_mode='r')[start:stop])
+    
+    def blocks(self, columns: Optional[Sequence[str]] = None,
+               where: Optional[Mapping[str, Tuple[Optional[float], Optional[float]]]] = None,
+               block_rows: Optional[int] = None) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        """Yield (row numbers, {column: values}) for completed rows matching where, one block at a time
+        
+        Blocks are RESULT_STORE_BLOCK_ROWS rows, or fewer if that would not fit
+        a chunk share of the memory budget.
+        """
+        columns = list(self.columns if columns is None else columns)
+        where = where or {}
+        if block_rows is None:
+            block_rows = get_memory_budget().chunk_rows(8 * (len(columns) + len(where) + 2), RESULT_STORE_BLOCK_ROWS)
+        for start in range(0, self.completed, block_rows):
+            stop = min(start + block_rows, self.completed)
+            values = {name: self._read(name, start, stop) for name in dict.fromkeys(columns + list(where))}
+            mask = np.ones(stop - start, dtype=bool)
+            for name, (low, high) in where.items():
+                with np.errstate(invalid='ignore'):
+                    mask &= ~np.isnan(values[name])
+                    if low is not None:
+                        mask &= values[name] >= low
+                    if high is not None:
+                        mask &= values[name] <= high
+            rows = np.arange(start, stop)
+            if not mask.all():
+                rows = rows[mask]
+                values = {name: column[mask] for name, column in values.items()}
+            yield rows, {name: values[name] for name in columns}
+    
+    def count(self, where=None) -> int:
+        """Completed rows matching where"""
+        return sum(len(rows) for rows, _ in self.blocks(columns=[], where=where))
+    
+    def query(self, where=None, columns: Optional[Sequence[str]] = None, order_by: Optional[str] = None,
+              largest: bool = True, limit: int = 1000) -> pd.DataFrame:
+        """Matching rows as a DataFrame indexed by combination: the first limit rows, or the
+        top limit by order_by (rows with NaN order_by are skipped)"""
+        columns = list(self.columns if columns is None else columns)
+        if order_by is not None and order_by not in columns:
+            columns.append(order_by)
+        
+        kept_rows, kept = np.empty(0, dtype=np.int64), {name: np.empty(0) for name in columns}
+        for rows, values in self.blocks(columns, where):
+            if order_by is None:
+                take = slice(0, limit - len(kept_rows))
+            else:
+                score = values[order_by] if largest else -values[order_by]
+                take = select_top(rows, score, limit)
+            kept_rows = np.concatenate([kept_rows, rows[take]])
+            kept = {name: np.concatenate([kept[name], values[name][take]]) for name in columns}
+            if order_by is None and len(kept_rows) >= limit:
+                break
+            if order_by is not None:
+                score = kept[order_by] if largest else -kept[order_by]
+                order = select_top(kept_rows, score, limit)
+                kept_rows, kept = kept_rows[order], {name: column[order] for name, column in kept.items()}
+        
+        return pd.DataFrame(kept, index=pd.Index(kept_rows, name='combination'))
+    
+    def summary(self, columns: Optional[Sequence[str]] = None, where=None) -> pd.DataFrame:
+        """Count / missing / mean / std / min / max of columns over matching rows"""
+        columns = list(self.metrics if columns is None else columns)
+        stats = RunningStats(len(columns))
+        for _, values in self.blocks(columns, where):
+            stats.update(np.vstack([values[name] for name in columns]))
+        return stats.to_frame(columns)
+    
+    def histogram(self, column: str, bins: int = 50, where=None,
+                  value_range: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(counts, bin edges) of a column over matching rows; NaN values are left out
+        
+        Without value_range the bins span the matching values, which costs an
+        extra pass over the data.
+        """
+        if value_range is None:
+            summary = self.summary([column], where).iloc[0]
+            low, high = summary['Min'], summary['Max']
+            if np.isnan(low):
+                low, high = 0.0, 1.0
+            value_range = (low, high) if high > low else (low - 0.5, high + 0.5)
+        
+        counts = np.zeros(bins, dtype=np.int64)
+        edges = np.linspace(value_range[0], value_range[1], bins + 1)
+        for _, values in self.blocks([column], where):
+            counts += np.histogram(values[column], bins=edges)[0]
+        return counts, edges
+    
+    def pareto(self, objectives: Optional[Sequence[str]] = None, where=None) -> pd.DataFrame:
+        """Non-dominated rows among matching rows (see pareto_mask), best first by the first objective"""
+        objectives = tuple(PARETO_DEFAULT_OBJECTIVES if objectives is None else objectives)
+        base = self.manifest['meta'].get('inputs')
+        if 'equity_required' in objectives and base is None:
+            raise ValueError("Store has no base inputs to derive equity_required from")
+        
+        front = ParetoFront(objectives)
+        for rows, values in self.blocks(where=where):
+            if 'equity_required' in objectives:
+                values['equity_required'] = equity_required_column(inputs_from_dict(base), values, len(rows))
+            front.update(rows, values)
+        return front.to_frame()
+    
+    def sweep_result(self, metric: str, top_k: int = 20, largest: bool = True) -> SweepResult:
+        """The parameter_sweep summary, recomputed from completed rows"""
+        columns = list(dict.fromkeys((metric,) + SWEEP_SUMMARY_METRICS))
+        top = self.query(columns=list(self.axes) + columns, order_by=metric, largest=largest, limit=top_k)
+        return SweepResult(
+            axes=self.axes,
+            metric=metric,
+            largest=largest,
+            top=top.reset_index(drop=True),
+            summary=self.summary(SWEEP_SUMMARY_METRICS),
+            combinations=self.combinations
+        )
+
+
+def result_store_path(inputs: PropertyInputs, axes: Mapping[str, Sequence[float]], metrics: Sequence[str],
+                      directory: str = RESULT_STORE_DIR) -> Path:
+    """Directory of the store for one sweep (same inputs, axes and metrics map to the same store)"""
+    key = (ENGINE_VERSION, inputs_fingerprint(inputs),
+           tuple((name, tuple(np.asarray(values, dtype=np.float64).tolist())) for name, values in axes.items()),
+           tuple(metrics))
+    return Path(directory) / hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def open_result_store(inputs: PropertyInputs, axes: Mapping[str, Sequence[float]],
+                      metrics: Sequence[str] = SWEEP_SUMMARY_METRICS,
+                      directory: str = RESULT_STORE_DIR) -> Optional[ResultStore]:
+    """Existing (possibly partial) store for a sweep, or None"""
+    path = result_store_path(inputs, axes, metrics, directory)
+    if not (path / 'manifest.json').exists():
+        return None
+    os.utime(path)  # Mark as recently used for prune_result_stores
+    return ResultStore(path)
+
+
+def prune_result_stores(directory: str = RESULT_STORE_DIR, max_bytes: Optional[int] = None,
+                        keep: Optional[Path] = None) -> int:
+    """Delete least recently used stores until the rest hold at most max_bytes; returns stores deleted
+    
+    max_bytes defaults to RESULT_STORE_MAX_MB. Use is tracked by the store
+    directory's modification time. keep, and stores whose lock is held (a
+    sweep is writing them), are never deleted.
+    """
+    if max_bytes is None:
+        max_bytes = int(RESULT_STORE_MAX_MB * 1024 ** 2)
+    stores = []
+    for path in Path(directory).glob('*/manifest.json'):
+        try:
+            stores.append((path.parent.stat().st_mtime, path.parent, ResultStore(path.parent).nbytes))
+        except (OSError, ValueError, KeyError):
+            continue
+    excess = sum(nbytes for _, _, nbytes in stores) - max_bytes
+    deleted = 0
+    for _, path, nbytes in sorted(stores, key=lambda store: store[0]):
+        if excess <= 0:
+            break
+        if keep is not None and path.resolve() == Path(keep).resolve():
+            continue
+        try:
+            with store_lock(path, blocking=False):
+                shutil.rmtree(path)
+        except (BlockingIOError, OSError) as e:
+            cache_logger.warning("Could not delete result store %s: %s", path.name, e)
+            continue
+        excess -= nbytes
+        deleted += 1
+    return deleted
+
+
+@timed
+def stored_sweep(inputs: PropertyInputs, axes: Mapping[str, Sequence[float]],
+                 metrics: Sequence[str] = SWEEP_SUMMARY_METRICS, directory: str = RESULT_STORE_DIR,
+                 chunk_scenarios: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> ResultStore:
+    """Evaluate every combination of axes into a ResultStore, resuming a partial store
+    
+    Runs of the same sweep (from other sessions or processes) wait on the
+    store's lock and then pick up where it stands. progress, if given, is
+    called with (completed, total) after every chunk.
+    """
+    axes = {name: np.asarray(values, dtype=np.float64) for name, values in axes.items()}
+    chunk_scenarios = chunk_scenarios or sweep_chunk_scenarios(axes)
+    path = result_store_path(inputs, axes, metrics, directory)
+    path.mkdir(parents=True, exist_ok=True)
+    
+    with store_lock(path):
+        if (path / 'manifest.json').exists():
+            store = ResultStore(path)
+        else:
+            store = ResultStore.create(path, axes, metrics, meta={'inputs': asdict(inputs)})
+        for indices, block in sweep_chunks(axes, chunk_scenarios, start=store.completed):
+            batch = evaluate_samples(inputs, block)
+            store.append(indices, {name: batch[name] for name in metrics})
+            if progress is not None:
+                progress(store.completed, store.combinations)
+    os.utime(path)
+    prune_result_stores(directory, keep=path)
+    return store
+
+
+# Multi-objective frontier: objective -> (label, maximize, plot tick format)
+PARETO_OBJECTIVES = {
+    'irr': ('After-Tax IRR', True, '.1%'),
+    'year1_dscr': ('Year 1 DSCR', True, '.2f'),
+    'equity_required': ('Equity Required', False, '$,.0f'),
+    'npv': ('NPV', True, '$,.0f'),
+    'equity_multiple': ('Equity Multiple', True, '.2f'),
+    'year1_coc': ('Year 1 Cash-on-Cash', True, '.1%'),
+}
+PARETO_DEFAULT_OBJECTIVES = ('irr', 'year1_dscr', 'equity_required')
+
+# Rows checked together against the frontier found so far
+PARETO_BLOCK_POINTS = 2048
+
+# Dominated combinations kept (evenly strided) to plot behind the frontier
+PARETO_CLOUD_POINTS = 50_000
+
+
+def _staircase(f2: np.ndarray, f3: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """2-D maximal points of (f2, f3) as (-f2 ascending, f3 increasing), for prefix-max lookups"""
+    order = np.lexsort((-f3, -f2))
+    f2, f3 = f2[order], f3[order]
+    keep = np.ones(len(f3), dtype=bool)
+    keep[1:] = f3[1:] > np.maximum.accumulate(f3)[:-1]
+    return -f2[keep], f3[keep]
+
+
+def pareto_mask(objectives: np.ndarray, maximize: Optional[Sequence[bool]] = None) -> np.ndarray:
+    """Mask of the non-dominated rows of an (n, 2 or 3) objective array (all maximized by default)
+    
+    Rows are sorted lexicographically, best first, so any row that dominates
+    another comes before it. Blocks of PARETO_BLOCK_POINTS rows are then tested
+    against a 2-D staircase of the frontier so far (one searchsorted per block)
+    and pairwise among the block's survivors, which is O(n log n) unless the
+    frontier itself holds most of the rows. Rows with NaN are never on the
+    frontier; identical rows do not dominate each other.
+    """
+    values = np.asarray(objectives, dtype=np.float64)
+    n, m = values.shape
+    if m not in (2, 3):
+        raise ValueError(f"pareto_mask needs 2 or 3 objectives, got {m}")
+    if maximize is not None:
+        values = np.where(np.asarray(maximize, dtype=bool), values, -values)
+    if m == 2:
+        values = np.column_stack([values, np.zeros(n)])
+    
+    mask = np.zeros(n, dtype=bool)
+    valid = np.flatnonzero(~np.isnan(values).any(axis=1))
+    if len(valid) == 0:
+        return mask
+    order = valid[np.lexsort((-values[valid, 2], -values[valid, 1], -values[valid, 0]))]
+    points = values[order]
+    
+    # Identical rows share one representative
+    first = np.ones(len(points), dtype=bool)
+    first[1:] = (points[1:] != points[:-1]).any(axis=1)
+    group = np.cumsum(first) - 1
+    unique = points[first]
+    
+    on_front = np.zeros(len(unique), dtype=bool)
+    stair_key, stair_f3 = np.empty(0), np.empty(0)
+    for start in range(0, len(unique), PARETO_BLOCK_POINTS):
+        f2 = unique[start:start + PARETO_BLOCK_POINTS, 1]
+        f3 = unique[start:start + PARETO_BLOCK_POINTS, 2]
+        
+        # Dominated by an earlier frontier row: one with f2 and f3 at least as large
+        alive = np.arange(len(f2))
+        if len(stair_key):
+            position = np.searchsorted(stair_key, -f2, side='right') - 1
+            alive = np.flatnonzero((position < 0) | (stair_f3[np.maximum(position, 0)] < f3))
+        
+        # Dominated by an earlier row of the same block
+        s2, s3 = f2[alive], f3[alive]
+        beaten = np.triu((s2[:, None] >= s2[None, :]) & (s3[:, None] >= s3[None, :]), k=1).any(axis=0)
+        alive = alive[~beaten]
+        
+        if len(alive):
+            on_front[start + alive] = True
+            stair_key, stair_f3 = _staircase(np.concatenate([-stair_key, f2[alive]]),
+                                             np.concatenate([stair_f3, f3[alive]]))
+    
+    mask[order] = on_front[group]
+    return mask
+
+
+def equity_required_column(inputs: PropertyInputs, samples: Mapping[str, np.ndarray], n: int) -> np.ndarray:
+    """PropertyInputs.equity_required for n scenarios with some fields replaced by sample columns"""
+    price, closing, down = (np.asarray(samples.get(field, getattr(inputs, field)), dtype=np.float64)
+                            for field in ('purchase_price', 'closing_costs_pct', 'down_payment_pct'))
+    return np.broadcast_to(price * (1 + closing) * down, (n,)).copy()
+
+
+def scenario_objectives(inputs: PropertyInputs, samples: Mapping[str, np.ndarray], batch: ReturnsBatch,
+                        names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Objective columns for scenarios evaluated from samples"""
+    return {
+        name: equity_required_column(inputs, samples, len(batch)) if name == 'equity_required' else batch[name]
+        for name in names
+    }
+
+
+class ParetoFront:
+    """Running frontier over scenarios seen chunk by chunk
+    
+    The frontier of a union is the frontier of (frontier so far + new rows),
+    so only frontier rows are carried between chunks.
+    """
+    
+    def __init__(self, objectives: Sequence[str]):
+        self.objectives = tuple(objectives)
+        self.maximize = [PARETO_OBJECTIVES[name][1] for name in self.objectives]
+        self.index = np.empty(0, dtype=np.int64)
+        self.columns: Dict[str, np.ndarray] = {}
+    
+    def update(self, index: np.ndarray, columns: Mapping[str, np.ndarray]):
+        """Fold in rows (combination numbers, {column: values}); columns must include every objective"""
+        index = np.concatenate([self.index, index])
+        columns = {name: np.concatenate([self.columns[name], values]) if self.columns else np.asarray(values)
+                   for name, values in columns.items()}
+        keep = pareto_mask(np.column_stack([columns[name] for name in self.objectives]), self.maximize)
+        self.index = index[keep]
+        self.columns = {name: values[keep] for name, values in columns.items()}
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Frontier rows, best first by the first objective"""
+        frame = pd.DataFrame(self.columns, index=pd.Index(self.index, name='combination'))
+        return frame.sort_values(self.objectives[0], ascending=not self.maximize[0], kind='stable')
+
+
+class ParetoResult(NamedTuple):
+    """Non-dominated combinations of a sweep"""
+    axes: Dict[str, np.ndarray]
+    objectives: Tuple[str, ...]
+    frontier: pd.DataFrame      # axis values, objectives, SWEEP_SUMMARY_METRICS; best first
+    cloud: pd.DataFrame         # evenly strided sample of all combinations, same columns
+    combinations: int
+
+
+@timed
+def pareto_sweep(inputs: PropertyInputs, axes: Mapping[str, Sequence[float]],
+                 objectives: Sequence[str] = PARETO_DEFAULT_OBJECTIVES,
+                 chunk_scenarios: Optional[int] = None,
+                 progress: Optional[Callable[[int, int, pd.DataFrame], None]] = None) -> ParetoResult:
+    """Frontier of every combination of axes, evaluated lazily chunk by chunk like parameter_sweep
+    
+    progress, if given, is called with (evaluated, total, frontier so far) after every chunk.
+    """
+    axes = {name: np.asarray(values, dtype=np.float64) for name, values in axes.items()}
+    chunk_scenarios = chunk_scenarios or sweep_chunk_scenarios(axes)
+    total = sweep_combinations(axes)
+    stride = max(1, -(-total // PARETO_CLOUD_POINTS))
+    metrics = tuple(name for name in dict.fromkeys(tuple(objectives) + SWEEP_SUMMARY_METRICS)
+                    if name != 'equity_required')
+    
+    front = ParetoFront(objectives)
+    cloud = []
+    for indices, block in sweep_chunks(axes, chunk_scenarios):
+        batch = evaluate_samples(inputs, block)
+        columns = dict(block)
+        columns.update(scenario_objectives(inputs, block, batch, objectives))
+        columns.update({name: batch[name] for name in metrics})
+        front.update(indices, columns)
+        
+        sampled = indices % stride == 0
+        cloud.append(pd.DataFrame({name: values[sampled] for name, values in columns.items()},
+                                  index=pd.Index(indices[sampled], name='combination')))
+        if progress is not None:
+            progress(int(indices[-1]) + 1, total, front.to_frame())
+    
+    return ParetoResult(
+        axes=axes,
+        objectives=tuple(objectives),
+        frontier=front.to_frame(),
+        cloud=pd.concat(cloud) if cloud else pd.DataFrame(),
+        combinations=total
+    )
+
+
+@timed
+def compare_scenarios(current_inputs: PropertyInputs, saved_inputs: PropertyInputs) -> pd.DataFrame:
+    """Compare two scenarios and return a difference dataframe"""
+    
+    # Calculate returns for both
+    returns_curr = run_analysis(current_inputs).returns
+    returns_saved = run_analysis(saved_inputs).returns
+    
+    # Define metrics to compare
+    metrics = [
+        ('Purchase Price', current_inputs.purchase_price, saved_inputs.purchase_price, 'currency'),
         ('Equity Required', current_inputs.equity_required, saved_inputs.equity_required, 'currency'),
         ('Loan Amount', current_inputs.loan_amount, saved_inputs.loan_amount, 'currency'),
         ('Interest Rate', current_inputs.interest_rate, saved_inputs.interest_rate, 'percent'),
@@ -1757,7 +5415,7 @@ def compare_scenarios(current_inputs: PropertyInputs, saved_inputs: PropertyInpu
     return pd.DataFrame(data)
 
 
-def generate_investment_memo(inputs: PropertyInputs, returns: Dict) -> str:
+def generate_investment_memo(inputs: PropertyInputs, returns: InvestmentReturns) -> str:
     """Generate a rule-based investment memo"""
     
     irr = returns['after_tax_irr']
@@ -1840,6 +5498,8 @@ def generate_investment_memo(inputs: PropertyInputs, returns: Dict) -> str:
     return memo
 
 
+@st.fragment
+@timed
 def display_sensitivity_analysis(inputs: PropertyInputs):
     """Display interactive sensitivity analysis"""
     st.markdown('<div class="sub-header">Sensitivity Analysis</div>', unsafe_allow_html=True)
@@ -1857,7 +5517,7 @@ def display_sensitivity_analysis(inputs: PropertyInputs):
         )
         exit_cap_rates = np.linspace(0.055, 0.075, 5)
         
-        sens_df = create_sensitivity_table(
+        sens_df = cached_sensitivity_table(
             inputs,
             'exit_cap_rate',
             'purchase_price',
@@ -1897,7 +5557,7 @@ def display_sensitivity_analysis(inputs: PropertyInputs):
         )
         occupancies = np.linspace(0.85, 1.0, 5)
         
-        sens_df2 = create_sensitivity_table(
+        sens_df2 = cached_sensitivity_table(
             inputs,
             'year1_occupancy',
             'annual_rent_psf',
@@ -1926,33 +5586,644 @@ def display_sensitivity_analysis(inputs: PropertyInputs):
         st.plotly_chart(fig2, use_container_width=True)
 
 
-def display_pro_forma_table(pro_forma: pd.DataFrame):
-    """Display detailed pro forma table"""
-    st.markdown('<div class="sub-header">Detailed Pro Forma</div>', unsafe_allow_html=True)
-    
-    # Select key columns to display
-    display_columns = [
-        'Year', 'Gross_Rental_Income', 'Total_Revenue', 'Total_Landlord_Expenses', 'NOI',
-        'Debt_Service', 'Interest_Expense', 'Depreciation', 'Taxable_Income', 'Tax_Liability',
-        'Pre_Tax_Cash_Flow', 'After_Tax_Cash_Flow', 'DSCR', 'After_Tax_CoC'
-    ]
+# Hurdle contour axes: label -> (PropertyInputs field, tick format, upper bound)
+SENSITIVITY_AXES = {
+    'Purchase Price': ('purchase_price', '$,.0f', None),
+    'Exit Cap Rate': ('exit_cap_rate', '.2%', None),
+    'Rent per SF': ('annual_rent_psf', '$.2f', None),
+    'Interest Rate': ('interest_rate', '.2%', None),
+    'Down Payment': ('down_payment_pct', '.0%', 1.0),
+    'Stabilized Occupancy': ('stabilized_occupancy', '.0%', 1.0),
+    'Rent Growth': ('rent_growth_rate', '.1%', None),
+}
+
+# Default hurdle per contour metric, in display units
+CONTOUR_TARGETS = {
+    'IRR': 12.0,
+    'DSCR': 1.25,
+}
+
+
+@st.fragment
+@timed
+def display_hurdle_contour(inputs: PropertyInputs):
+    """Trace the IRR / DSCR hurdle line over two inputs with adaptive refinement"""
+    st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
+    st.markdown("**Hurdle Contour (Adaptive Refinement)**")
     
-    display_df = pro_forma[display_columns].copy()
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        x_label = st.selectbox("X Axis", options=list(SENSITIVITY_AXES), index=0, key="contour_x")
+    with col2:
+        y_label = st.selectbox("Y Axis", options=list(SENSITIVITY_AXES), index=1, key="contour_y")
+    with col3:
+        metric = st.radio("Metric", options=list(CONTOUR_TARGETS), horizontal=True, key="contour_metric")
+    with col4:
+        target = st.number_input(
+            "Hurdle (%)" if metric == 'IRR' else "Hurdle (x)",
+            value=CONTOUR_TARGETS[metric],
+            step=0.5 if metric == 'IRR' else 0.05,
+            key=f"contour_target_{metric}"
+        )
+    with col5:
+        spread = st.slider("Range (±%)", min_value=5, max_value=50, value=25, step=5, key="contour_spread") / 100
+    max_depth = st.slider(
+        "Refinement Levels",
+        min_value=2,
+        max_value=6,
+        value=4,
+        key="contour_depth",
+        help="Each level halves the cell size near the hurdle; the finest grid is 4 x 2^levels cells per side"
+    )
     
-    # Format for display
-    display_df['Gross_Rental_Income'] = display_df['Gross_Rental_Income'].apply(lambda x: f"${x:,.0f}")
-    display_df['Total_Revenue'] = display_df['Total_Revenue'].apply(lambda x: f"${x:,.0f}")
-    display_df['Total_Landlord_Expenses'] = display_df['Total_Landlord_Expenses'].apply(lambda x: f"${x:,.0f}")
-    display_df['NOI'] = display_df['NOI'].apply(lambda x: f"${x:,.0f}")
-    display_df['Debt_Service'] = display_df['Debt_Service'].apply(lambda x: f"${x:,.0f}")
-    display_df['Interest_Expense'] = display_df['Interest_Expense'].apply(lambda x: f"${x:,.0f}")
-    display_df['Depreciation'] = display_df['Depreciation'].apply(lambda x: f"${x:,.0f}")
-    display_df['Taxable_Income'] = display_df['Taxable_Income'].apply(lambda x: f"${x:,.0f}")
-    display_df['Tax_Liability'] = display_df['Tax_Liability'].apply(lambda x: f"${x:,.0f}")
-    display_df['Pre_Tax_Cash_Flow'] = display_df['Pre_Tax_Cash_Flow'].apply(lambda x: f"${x:,.0f}")
-    display_df['After_Tax_Cash_Flow'] = display_df['After_Tax_Cash_Flow'].apply(lambda x: f"${x:,.0f}")
-    display_df['DSCR'] = display_df['DSCR'].apply(lambda x: f"{x:.2f}" if x > 0 else "-")
-    display_df['After_Tax_CoC'] = display_df['After_Tax_CoC'].apply(lambda x: f"{x*100:.2f}%" if x != 0 else "-")
+    if x_label == y_label:
+        st.info("Choose two different inputs for the axes.")
+        return
+    
+    ranges = []
+    for label in (x_label, y_label):
+        field_name, _, upper = SENSITIVITY_AXES[label]
+        base = getattr(inputs, field_name)
+        low, high = base * (1 - spread), base * (1 + spread)
+        if upper is not None:
+            high = min(high, upper)
+        if high <= low:
+            st.info(f"{label} is zero in the current inputs, so it has no range to explore.")
+            return
+        ranges.append((low, high))
+    
+    x_field, x_format, _ = SENSITIVITY_AXES[x_label]
+    y_field, y_format, _ = SENSITIVITY_AXES[y_label]
+    contour = cached_adaptive_contour(inputs, x_field, y_field, ranges[0], ranges[1], metric, target, max_depth)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Engine Evaluations", f"{contour.evaluations:,}")
+    with col2:
+        st.metric("Uniform Grid Equivalent", f"{contour.uniform_evaluations:,}")
+    with col3:
+        st.metric("Evaluations Saved", f"{1 - contour.evaluations / contour.uniform_evaluations:.0%}")
+    
+    above = contour.values >= target
+    fig = go.Figure()
+    for mask, name, color in ((above, 'Meets Hurdle', '#2ca02c'), (~above, 'Below Hurdle', '#d62728')):
+        fig.add_trace(go.Scatter(
+            x=contour.points[mask, 0],
+            y=contour.points[mask, 1],
+            mode='markers',
+            name=name,
+            marker=dict(size=4, color=color, opacity=0.5)
+        ))
+    
+    if len(contour.segments):
+        # One polyline with gaps between segments
+        line = np.full((len(contour.segments), 3, 2), np.nan)
+        line[:, :2] = contour.segments
+        fig.add_trace(go.Scatter(
+            x=line[:, :, 0].ravel(),
+            y=line[:, :, 1].ravel(),
+            mode='lines',
+            name=f"{metric} = {target:g}{'%' if metric == 'IRR' else 'x'}",
+            line=dict(color='#1a1a2e', width=3),
+            connectgaps=False
+        ))
+    else:
+        st.info("The hurdle is not crossed anywhere in this range.")
+    
+    fig.add_trace(go.Scatter(
+        x=[getattr(inputs, x_field)],
+        y=[getattr(inputs, y_field)],
+        mode='markers',
+        name='Current Inputs',
+        marker=dict(size=14, color='#667eea', symbol='star')
+    ))
+    fig.update_layout(
+        xaxis_title=x_label,
+        yaxis_title=y_label,
+        xaxis_tickformat=x_format,
+        yaxis_tickformat=y_format,
+        template='plotly_white',
+        height=450,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+# Tornado metric -> (axis title for the change from base, hover format)
+TORNADO_AXES = {
+    'IRR': ('Change in IRR (percentage points)', '+.2f'),
+    'NPV': ('Change in NPV ($)', '+$,.0f'),
+    'DSCR': ('Change in Year 1 DSCR (x)', '+.3f'),
+}
+
+
+@st.fragment
+@timed
+def display_tornado_analysis(inputs: PropertyInputs):
+    """Rank every numeric input by how far a +/- shock moves IRR, NPV or DSCR"""
+    st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
+    st.markdown("**Tornado Chart: Every Input Shocked Down and Up**")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        shock = st.slider("Shock (±%)", min_value=5, max_value=50, value=10, step=5, key="tornado_shock") / 100
+    with col2:
+        metric = st.radio("Rank By", options=list(TORNADO_METRICS), horizontal=True, key="tornado_metric")
+    
+    tornado = cached_tornado_analysis(inputs, shock)
+    table = tornado.table.sort_values(f'{metric}_Swing', ascending=True, na_position='first')
+    base = tornado.base[metric]
+    axis_title, hover_format = TORNADO_AXES[metric]
+    
+    fig = go.Figure()
+    for side, name, color in (('Low', f'Input -{shock:.0%}', '#d62728'), ('High', f'Input +{shock:.0%}', '#2ca02c')):
+        fig.add_trace(go.Bar(
+            y=table['Input'],
+            x=table[f'{metric}_{side}'] - base,
+            customdata=table[f'{side}_Value'],
+            orientation='h',
+            name=name,
+            marker_color=color,
+            hovertemplate=f"%{{y}} = %{{customdata:,.4g}}<br>%{{x:{hover_format}}}<extra></extra>"
+        ))
+    fig.update_layout(
+        barmode='overlay',
+        xaxis_title=axis_title,
+        template='plotly_white',
+        height=120 + 24 * len(table),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"{tornado.evaluations} scenarios evaluated in one batch. "
+        "Whole-year inputs move by at least one year; percentages are capped at 100%."
+    )
+    
+    with st.expander("Tornado Table"):
+        display_df = table.iloc[::-1][['Input', 'Low_Value', 'High_Value',
+                                       f'{metric}_Low', f'{metric}_High', f'{metric}_Swing']]
+        st.dataframe(display_df, hide_index=True, use_container_width=True)
+
+
+@st.fragment
+@timed
+def display_input_elasticities(inputs: PropertyInputs):
+    """Table of exact metric elasticities (or partial derivatives) for every continuous input"""
+    st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
+    st.markdown("**Input Elasticities (Exact Gradients)**")
+    
+    view = st.radio(
+        "Show",
+        options=["Elasticity (% per 1% change)", "Partial Derivative (per unit)"],
+        horizontal=True,
+        key="gradient_view"
+    )
+    gradients = cached_input_gradients(inputs)
+    frame = gradients.to_frame(elasticity=view.startswith("Elasticity")).drop(columns='Field')
+    frame = frame.reindex(frame['IRR'].abs().sort_values(ascending=False).index)
+    
+    st.dataframe(
+        frame.style.format({'Value': '{:,.4g}', **{label: '{:+.4g}' for label in GRADIENT_METRICS}}),
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(
+        f"All {len(gradients.fields)} continuous inputs differentiated in one augmented engine pass "
+        "(IRR through the implicit function theorem). IRR partials are in decimal units per unit of input."
+    )
+
+
+@st.fragment
+@timed
+def display_sobol_analysis(inputs: PropertyInputs):
+    """Variance-based global sensitivity of IRR and NPV, run on demand"""
+    st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
+    st.markdown("**Global Sensitivity (Sobol Indices)**")
+    
+    choices = {
+        INPUT_FIELD_LABELS[name]: name for name in GRADIENT_INPUT_FIELDS if getattr(inputs, name) != 0
+    }
+    with st.form("sobol_settings"):
+        selected = st.multiselect(
+            "Inputs",
+            options=list(choices),
+            default=[INPUT_FIELD_LABELS[name] for name in SOBOL_DEFAULT_INPUTS if INPUT_FIELD_LABELS[name] in choices],
+            key="sobol_inputs"
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            spread = st.slider("Range (±%)", min_value=5, max_value=50, value=20, step=5, key="sobol_spread") / 100
+        with col2:
+            log2_samples = st.select_slider(
+                "Base Samples (N)",
+                options=list(range(10, 18)),
+                value=12,
+                format_func=lambda m: f"{2 ** m:,}",
+                key="sobol_samples",
+                help="Each base sample costs (inputs + 2) model evaluations"
+            )
+        submitted = st.form_submit_button("Run Global Sensitivity")
+    
+    if submitted:
+        if not selected:
+            st.warning("Select at least one input.")
+            return
+        st.session_state.sobol_request = (
+            inputs_fingerprint(inputs), tuple(choices[label] for label in selected), spread, log2_samples
+        )
+    
+    request = st.session_state.get('sobol_request')
+    if request is None:
+        st.caption("Inputs vary uniformly over the chosen range; press Run to compute the indices.")
+        return
+    fingerprint, fields, spread, log2_samples = request
+    if fingerprint != inputs_fingerprint(inputs):
+        st.info("Property inputs changed since the last run. Press Run Global Sensitivity to refresh.")
+        return
+    
+    job = background_job(
+        ('sobol',) + request,
+        f"Sobol indices ({2 ** log2_samples * (len(fields) + 2):,} scenarios)",
+        lambda job: cached_sobol_indices(inputs, fields, spread, log2_samples, progress=job.report),
+        restart=submitted,
+        memory_hint="Use fewer samples or inputs."
+    )
+    if job is None:
+        return
+    sobol = job.result
+    
+    metric = st.radio("Metric", options=list(sobol.metrics), horizontal=True, key="sobol_metric")
+    frame = sobol.to_frame(metric)
+    
+    fig = go.Figure()
+    for column, name, color in (('First_Order', 'First-Order (alone)', '#667eea'),
+                                ('Total', 'Total (incl. interactions)', '#764ba2')):
+        fig.add_trace(go.Bar(
+            x=frame['Input'],
+            y=frame[column],
+            error_y=dict(type='data', array=frame[f'{column}_CI']),
+            name=name,
+            marker_color=color
+        ))
+    fig.update_layout(
+        barmode='group',
+        yaxis_title=f'Share of {metric} Variance',
+        yaxis_tickformat='.0%',
+        template='plotly_white',
+        height=400,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    m = sobol.metrics.index(metric)
+    dropped = 2 ** log2_samples - sobol.valid_rows[m]
+    st.caption(
+        f"{sobol.evaluations:,} model evaluations (Saltelli design, scrambled Sobol sequence; {job.usage()}). "
+        "Error bars are 95% confidence intervals. Total minus first-order is the share explained "
+        "through interactions with other inputs."
+        + (f" {dropped:,} samples without an IRR were excluded." if dropped else "")
+    )
+
+
+@st.fragment
+@timed
+def display_monte_carlo(inputs: PropertyInputs):
+    """Stochastic IRR distribution with stratified sampling, stopped once P10 / P50 converge"""
+    st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
+    st.markdown("**Monte Carlo Simulation**")
+    
+    choices = {
+        INPUT_FIELD_LABELS[name]: name for name in GRADIENT_INPUT_FIELDS if getattr(inputs, name) != 0
+    }
+    with st.form("monte_carlo_settings"):
+        selected = st.multiselect(
+            "Uncertain Inputs",
+            options=list(choices),
+            default=[INPUT_FIELD_LABELS[name] for name in SOBOL_DEFAULT_INPUTS if INPUT_FIELD_LABELS[name] in choices],
+            key="mc_inputs",
+            help="Each input is triangular between -/+ the range, peaking at its current value"
+        )
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            spread = st.slider("Range (±%)", min_value=5, max_value=50, value=20, step=5, key="mc_spread") / 100
+        with col2:
+            sampler = st.selectbox("Sampling", options=list(MONTE_CARLO_SAMPLERS), key="mc_sampler")
+        with col3:
+            tolerance = st.number_input(
+                "P10 / P50 Tolerance (± IRR pts)",
+                min_value=0.01,
+                max_value=1.0,
+                value=0.10,
+                step=0.01,
+                key="mc_tolerance"
+            ) / 100
+        with col4:
+            max_draws = st.select_slider(
+                "Max Draws",
+                options=[2 ** m for m in range(12, 21)],
+                value=2 ** 17,
+                format_func=lambda n: f"{n:,}",
+                key="mc_max_draws"
+            )
+        submitted = st.form_submit_button("Run Simulation")
+    
+    if submitted:
+        if not selected:
+            st.warning("Select at least one input.")
+            return
+        st.session_state.mc_request = (
+            inputs_fingerprint(inputs), tuple(choices[label] for label in selected),
+            spread, sampler, tolerance, max_draws
+        )
+    
+    request = st.session_state.get('mc_request')
+    if request is None:
+        st.caption("Sampling stops as soon as the 95% confidence intervals on P10 and P50 IRR are within tolerance.")
+        return
+    fingerprint, fields, spread, sampler, tolerance, max_draws = request
+    if fingerprint != inputs_fingerprint(inputs):
+        st.info("Property inputs changed since the last run. Press Run Simulation to refresh.")
+        return
+    
+    job = background_job(
+        ('monte_carlo',) + request,
+        f"Monte Carlo ({sampler}, up to {max_draws:,} draws)",
+        lambda job: cached_monte_carlo(inputs, fields, spread, sampler, tolerance, max_draws, progress=job.report),
+        restart=submitted,
+        show_partial=display_monte_carlo_progress,
+        memory_hint="Lower Max Draws."
+    )
+    if job is None:
+        return
+    result = job.result
+    
+    irr = result.irr[~np.isnan(result.irr)]
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("P10 IRR", f"{result.percentiles[10] * 100:.2f}%", f"±{result.half_widths[10] * 100:.2f} pts",
+                  delta_color="off")
+    with col2:
+        st.metric("P50 IRR", f"{result.percentiles[50] * 100:.2f}%", f"±{result.half_widths[50] * 100:.2f} pts",
+                  delta_color="off")
+    with col3:
+        st.metric("P90 IRR", f"{np.percentile(irr, 90) * 100:.2f}%" if len(irr) else "n/a")
+    with col4:
+        st.metric("Probability NPV < 0", f"{np.mean(result.npv < 0):.1%}")
+    with col5:
+        st.metric("Draws Used", f"{result.draws:,}", f"{result.draws / result.max_draws:.0%} of budget",
+                  delta_color="off")
+    
+    if not result.converged:
+        st.warning("The draw budget ran out before P10 / P50 reached the tolerance; widen it or relax the tolerance.")
+    if result.no_irr_share > 0:
+        st.caption(
+            f"{result.no_irr_share:.1%} of draws have no IRR (cash flows never change sign, or the rate is outside "
+            "-99% to 1000%). IRR percentiles and the histogram cover the other draws."
+        )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.histogram(x=irr * 100, nbins=60, labels={'x': 'After-Tax IRR (%)'}, title='IRR Distribution')
+        for q, dash in ((10, 'dash'), (50, 'solid')):
+            if np.isnan(result.percentiles[q]):
+                continue
+            fig.add_vline(x=result.percentiles[q] * 100, line_dash=dash, line_color='#764ba2',
+                          annotation_text=f"P{q}")
+        fig.update_layout(template='plotly_white', height=350, yaxis_title='Draws', showlegend=False)
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        fig = go.Figure()
+        for q in MONTE_CARLO_STOP_PERCENTILES:
+            fig.add_trace(go.Scatter(
+                x=result.history['Draws'],
+                y=result.history[f'P{q}_Half_Width'] * 100,
+                mode='lines+markers',
+                name=f'P{q} ± (pts)'
+            ))
+        fig.add_hline(y=tolerance * 100, line_dash='dash', line_color='#d62728', annotation_text='Tolerance')
+        fig.update_layout(
+            title='Convergence',
+            xaxis_title='Draws',
+            xaxis_type='log',
+            yaxis_title='95% CI Half-Width (IRR pts)',
+            template='plotly_white',
+            height=350,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.caption(
+        f"{sampler} sampling over {len(fields)} inputs in {MONTE_CARLO_REPLICATES} independent streams; intervals come from "
+        "the spread between streams, so they reflect the sampler's variance reduction."
+    )
+
+
+def display_monte_carlo_progress(history: pd.DataFrame):
+    """Latest P10 / P50 estimates of a running simulation"""
+    latest = history.iloc[-1]
+    st.caption(
+        f"After {int(latest['Draws']):,} draws: " + ", ".join(
+            f"P{q} {latest[f'P{q}'] * 100:.2f}% ± {latest[f'P{q}_Half_Width'] * 100:.2f} pts"
+            for q in MONTE_CARLO_STOP_PERCENTILES
+        )
+    )
+
+
+# Largest sweep the UI will start
+SWEEP_MAX_COMBINATIONS = 10_000_000
+
+# Display format per sweep metric column
+SWEEP_COLUMN_FORMATS = {
+    'irr': '{:.2%}',
+    'npv': '${:,.0f}',
+    'equity_multiple': '{:.2f}x',
+    'year1_dscr': '{:.2f}x',
+    'year1_coc': '{:.2%}',
+}
+
+
+@st.fragment
+@timed
+def display_parameter_sweep(inputs: PropertyInputs):
+    """Cartesian sweep over several inputs, keeping only the top combinations and summary statistics"""
+    st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
+    st.markdown("**Parameter Sweep (Top Combinations)**")
+    
+    choices = {INPUT_FIELD_LABELS[name]: name for name in NUMERIC_INPUT_FIELDS if getattr(inputs, name) != 0}
+    with st.form("sweep_settings"):
+        selected = st.multiselect(
+            "Inputs to Sweep",
+            options=list(choices),
+            default=[label for label in ('Purchase Price', 'Rent per SF', 'Exit Cap Rate', 'Down Payment', 'Interest Rate')
+                     if label in choices],
+            key="sweep_inputs"
+        )
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            points = st.slider("Points per Input", min_value=2, max_value=20, value=10, key="sweep_points")
+        with col2:
+            spread = st.slider("Range (±%)", min_value=5, max_value=50, value=20, step=5, key="sweep_spread") / 100
+        with col3:
+            metric_label = st.selectbox("Rank By", options=list(SENSITIVITY_METRICS), key="sweep_metric")
+        with col4:
+            direction = st.radio("Keep", options=["Highest", "Lowest"], horizontal=True, key="sweep_direction")
+        with col5:
+            top_k = st.number_input("Top K", min_value=1, max_value=500, value=20, key="sweep_top_k")
+        keep_all = st.checkbox(
+            "Keep every result on disk",
+            key="sweep_store",
+            help="Writes each combination's metrics to a memory-mapped store you can filter and histogram; "
+                 "an interrupted sweep resumes where it stopped"
+        )
+        submitted = st.form_submit_button("Run Sweep")
+    
+    if submitted:
+        fields = tuple(choices[label] for label in selected)
+        combinations = sweep_combinations(sweep_axes(inputs, fields, spread, points)) if fields else 0
+        if not fields:
+            st.warning("Select at least one input.")
+            return
+        if combinations > SWEEP_MAX_COMBINATIONS:
+            st.warning(f"{combinations:,} combinations exceeds the {SWEEP_MAX_COMBINATIONS:,} limit; "
+                       "use fewer inputs or points.")
+            return
+        st.session_state.sweep_request = (
+            inputs_fingerprint(inputs), fields, spread, points, metric_label, direction == "Highest", int(top_k),
+            keep_all
+        )
+    
+    request = st.session_state.get('sweep_request')
+    if request is None:
+        st.caption("Combinations are generated and evaluated in chunks, so memory stays flat however large the sweep.")
+        return
+    fingerprint, fields, spread, points, metric_label, largest, top_k, keep_all = request
+    if fingerprint != inputs_fingerprint(inputs):
+        st.info("Property inputs changed since the last run. Press Run Sweep to refresh.")
+        return
+    
+    axes = sweep_axes(inputs, fields, spread, points)
+    metric = SENSITIVITY_METRICS[metric_label][0]
+    total = sweep_combinations(axes)
+    
+    def run_sweep(job: Job) -> Tuple[SweepResult, Optional[ResultStore], int]:
+        if not keep_all:
+            return cached_parameter_sweep(inputs, axes, metric, top_k, largest, progress=job.report), None, 0
+        existing = open_result_store(inputs, axes)
+        resumed = existing.completed if existing is not None and not existing.complete else 0
+        store = stored_sweep(inputs, axes, progress=job.report)
+        return cached_store_sweep_result(store, metric, top_k, largest), store, resumed
+    
+    def show_partial(top: pd.DataFrame):
+        st.caption(f"Best so far by {metric_label}:")
+        display_sweep_top(top.head(10), axes)
+    
+    job = background_job(('sweep',) + request, f"Sweep of {total:,} combinations", run_sweep,
+                         restart=submitted, show_partial=show_partial,
+                         memory_hint="Use fewer inputs or points per input.")
+    if job is None:
+        if keep_all:
+            st.caption("Stored sweeps resume from the last completed chunk when restarted.")
+        return
+    sweep, store, resumed = job.result
+    
+    st.caption(
+        f"{sweep.combinations:,} combinations of {len(axes)} inputs; "
+        f"{'highest' if largest else 'lowest'} {len(sweep.top)} by {metric_label} "
+        f"({job.usage()}, served from cache when unchanged)"
+        + (f"; resumed after {resumed:,} stored combinations" if keep_all and resumed else "")
+    )
+    display_sweep_top(sweep.top, axes)
+    
+    with st.expander("Sweep Summary Statistics"):
+        st.dataframe(sweep.summary, use_container_width=True, hide_index=True)
+    
+    if keep_all:
+        display_result_store_explorer(store)
+
+
+def display_sweep_top(top: pd.DataFrame, axes: Mapping[str, np.ndarray]):
+    """Top sweep combinations with input labels and formatted metrics"""
+    top = top.rename(columns={name: INPUT_FIELD_LABELS.get(name, name) for name in axes})
+    st.dataframe(
+        top.style.format({name: fmt for name, fmt in SWEEP_COLUMN_FORMATS.items() if name in top.columns}),
+        use_container_width=True,
+        hide_index=True
+    )
+
+
+def display_result_store_explorer(store: ResultStore):
+    """Filter, histogram and browse a stored sweep block by block (scans are cached per filter)"""
+    st.markdown("**Explore Stored Results**")
+    metric_labels = {key: label for label, (key, _) in SENSITIVITY_METRICS.items()}
+    labels = {INPUT_FIELD_LABELS.get(name, metric_labels.get(name, name)): name for name in store.columns}
+    summary = cached_store_summary(store, store.columns).set_index('Metric')
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        filter_label = st.selectbox("Filter On", options=list(labels), index=len(store.axes), key="store_filter")
+    filter_column = labels[filter_label]
+    low, high = float(summary.loc[filter_column, 'Min']), float(summary.loc[filter_column, 'Max'])
+    with col2:
+        if high > low:
+            bounds = st.slider("Keep Values Between", min_value=low, max_value=high, value=(low, high),
+                               key=f"store_bounds_{filter_column}")
+        else:
+            bounds = (low, high)
+            st.caption(f"{filter_label} is {low:g} in every combination")
+    with col3:
+        histogram_label = st.selectbox("Histogram Of", options=list(labels), index=len(store.axes),
+                                       key="store_histogram")
+    histogram_column = labels[histogram_label]
+    
+    where = {filter_column: bounds}
+    counts, edges = cached_store_histogram(store, histogram_column, bins=50, where=where)
+    matched = int(counts.sum())
+    st.caption(
+        f"{matched:,} of {store.completed:,} combinations match "
+        f"({store.nbytes / 1024 ** 2:,.1f} MB on disk, scanned block by block)"
+    )
+    
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), marker_color='#667eea'))
+    fig.update_layout(template='plotly_white', height=300, xaxis_title=histogram_label, yaxis_title='Combinations',
+                      margin=dict(t=20))
+    st.plotly_chart(fig, use_container_width=True)
+    
+    rows = cached_store_query(store, where=where, limit=1000)
+    st.dataframe(
+        rows.rename(columns={name: label for label, name in labels.items()}),
+        use_container_width=True
+    )
+    st.caption("First 1,000 matching combinations in sweep order.")
+
+
+@timed
+def display_pro_forma_table(pro_forma: ProForma):
+    """Display detailed pro forma table"""
+    st.markdown('<div class="sub-header">Detailed Pro Forma</div>', unsafe_allow_html=True)
+    
+    # Select key columns to display
+    display_columns = [
+        'Year', 'Gross_Rental_Income', 'Total_Revenue', 'Total_Landlord_Expenses', 'NOI',
+        'Debt_Service', 'Interest_Expense', 'Depreciation', 'Taxable_Income', 'Tax_Liability',
+        'Pre_Tax_Cash_Flow', 'After_Tax_Cash_Flow', 'DSCR', 'After_Tax_CoC'
+    ]
+    
+    display_df = pro_forma.to_frame()[display_columns].copy()
+    
+    # Format for display
+    display_df['Gross_Rental_Income'] = display_df['Gross_Rental_Income'].apply(lambda x: f"${x:,.0f}")
+    display_df['Total_Revenue'] = display_df['Total_Revenue'].apply(lambda x: f"${x:,.0f}")
+    display_df['Total_Landlord_Expenses'] = display_df['Total_Landlord_Expenses'].apply(lambda x: f"${x:,.0f}")
+    display_df['NOI'] = display_df['NOI'].apply(lambda x: f"${x:,.0f}")
+    display_df['Debt_Service'] = display_df['Debt_Service'].apply(lambda x: f"${x:,.0f}")
+    display_df['Interest_Expense'] = display_df['Interest_Expense'].apply(lambda x: f"${x:,.0f}")
+    display_df['Depreciation'] = display_df['Depreciation'].apply(lambda x: f"${x:,.0f}")
+    display_df['Taxable_Income'] = display_df['Taxable_Income'].apply(lambda x: f"${x:,.0f}")
+    display_df['Tax_Liability'] = display_df['Tax_Liability'].apply(lambda x: f"${x:,.0f}")
+    display_df['Pre_Tax_Cash_Flow'] = display_df['Pre_Tax_Cash_Flow'].apply(lambda x: f"${x:,.0f}")
+    display_df['After_Tax_Cash_Flow'] = display_df['After_Tax_Cash_Flow'].apply(lambda x: f"${x:,.0f}")
+    display_df['DSCR'] = display_df['DSCR'].apply(lambda x: f"{x:.2f}" if x > 0 else "-")
+    display_df['After_Tax_CoC'] = display_df['After_Tax_CoC'].apply(lambda x: f"{x*100:.2f}%" if x != 0 else "-")
     
     # Rename columns for display
     display_df.columns = [
@@ -1961,11 +6232,678 @@ def display_pro_forma_table(pro_forma: pd.DataFrame):
         'Pre-Tax CF', 'After-Tax CF', 'DSCR', 'AT CoC %'
     ]
     
-    st.dataframe(display_df, use_container_width=True, hide_index=True)
+    st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+@timed
+def display_exit_year_analysis(inputs: PropertyInputs):
+    """IRR by exit year from one pro forma pass, with the optimal exit marked"""
+    st.markdown('<div class="sub-header">Exit Year Optimization</div>', unsafe_allow_html=True)
+    
+    max_exit_year = st.slider(
+        "Evaluate Exit Years Through",
+        min_value=inputs.hold_period_years,
+        max_value=40,
+        value=max(inputs.hold_period_years, 20),
+        step=1,
+        key="exit_year_horizon",
+        help="Every exit year up to this horizon is priced from a single projection"
+    )
+    exit_df = cached_exit_year_analysis(inputs, max_exit_year)
+    valid = exit_df.dropna(subset=['After_Tax_IRR'])
+    if valid.empty:
+        st.warning("No exit year produces a defined IRR for these inputs.")
+        return
+    
+    optimal_row = valid.loc[valid['After_Tax_IRR'].idxmax()]
+    current_row = exit_df[exit_df['Exit_Year'] == inputs.hold_period_years].iloc[0]
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Optimal Exit Year", f"Year {int(optimal_row['Exit_Year'])}")
+    with col2:
+        st.metric(
+            "After-Tax IRR at Optimum",
+            f"{optimal_row['After_Tax_IRR']:.2f}%",
+            delta=f"{optimal_row['After_Tax_IRR'] - current_row['After_Tax_IRR']:+.2f}% vs Year {inputs.hold_period_years}"
+        )
+    with col3:
+        st.metric("Equity Multiple at Optimum", f"{optimal_row['After_Tax_EM']:.2f}x")
+    with col4:
+        st.metric("After-Tax Sale Proceeds", f"${optimal_row['After_Tax_Sale_Proceeds']:,.0f}")
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=exit_df['Exit_Year'],
+        y=exit_df['After_Tax_IRR'],
+        mode='lines+markers',
+        name='After-Tax IRR',
+        line=dict(color='#667eea', width=3),
+        marker=dict(size=7)
+    ))
+    fig.add_trace(go.Scatter(
+        x=exit_df['Exit_Year'],
+        y=exit_df['Pre_Tax_IRR'],
+        mode='lines',
+        name='Pre-Tax IRR',
+        line=dict(color='#9467bd', width=2, dash='dash')
+    ))
+    fig.add_trace(go.Scatter(
+        x=[optimal_row['Exit_Year']],
+        y=[optimal_row['After_Tax_IRR']],
+        mode='markers',
+        name='Optimal Exit',
+        marker=dict(size=15, color='#2ca02c', symbol='star')
+    ))
+    fig.add_vline(
+        x=inputs.hold_period_years,
+        line_dash="dot",
+        line_color="gray",
+        annotation_text="Current Hold"
+    )
+    fig.update_layout(
+        title='After-Tax IRR by Exit Year',
+        xaxis_title='Exit Year',
+        yaxis_title='IRR (%)',
+        hovermode='x unified',
+        template='plotly_white',
+        height=400,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    with st.expander("Exit Year Detail"):
+        st.dataframe(
+            exit_df.style.format({
+                'After_Tax_IRR': '{:.2f}%',
+                'Pre_Tax_IRR': '{:.2f}%',
+                'After_Tax_EM': '{:.2f}x',
+                'Pre_Tax_EM': '{:.2f}x',
+                'After_Tax_NPV': '${:,.0f}',
+                'Gross_Sale_Price': '${:,.0f}',
+                'Loan_Balance': '${:,.0f}',
+                'Total_Depreciation': '${:,.0f}',
+                'After_Tax_Sale_Proceeds': '${:,.0f}'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+
+# Debt Optimization objectives: label -> (sweep column, display format)
+DEBT_OBJECTIVES = {
+    'After-Tax IRR': ('After_Tax_IRR', '{:.2f}%'),
+    'Pre-Tax IRR': ('Pre_Tax_IRR', '{:.2f}%'),
+    'Equity Multiple': ('After_Tax_EM', '{:.2f}x'),
+    'Year 1 Cash-on-Cash': ('After_Tax_CoC', '{:.2f}%'),
+}
+
+
+@st.fragment
+@timed
+def display_debt_optimization(inputs: PropertyInputs):
+    """Display the leverage sweep (view options rerun only this fragment)"""
+    st.markdown('<div class="sub-header">Debt Optimization Analysis</div>', unsafe_allow_html=True)
+    st.info("This analysis shows how different leverage levels impact your returns. Find the optimal debt-to-equity ratio for maximum IRR while maintaining acceptable risk levels.")
+    
+    # Run optimization
+    with st.spinner("Analyzing leverage scenarios..."):
+        opt_df = cached_debt_optimization(inputs)
+    
+    if not opt_df.empty:
+        # View options
+        col1, col2 = st.columns(2)
+        with col1:
+            objective = st.selectbox(
+                "Optimize For",
+                options=list(DEBT_OBJECTIVES),
+                key="debt_objective"
+            )
+        with col2:
+            dscr_floor = st.slider(
+                "Minimum Year 1 DSCR",
+                min_value=0.0,
+                max_value=2.0,
+                value=0.0,
+                step=0.05,
+                key="debt_dscr_floor",
+                help="Only leverage levels meeting this coverage are eligible as the optimum (0 = unconstrained)"
+            )
+        objective_column, objective_format = DEBT_OBJECTIVES[objective]
+        
+        # Find optimal leverage
+        eligible = opt_df[opt_df['Year1_DSCR'] >= dscr_floor]
+        if eligible.empty:
+            st.warning(f"No leverage level reaches a {dscr_floor:.2f}x DSCR; showing the unconstrained optimum.")
+            eligible = opt_df
+        optimal_row = eligible.loc[eligible[objective_column].idxmax()]
+        
+        col1, col2, col3, col4 = st.columns(4)
+    
+        with col1:
+            st.metric(
+                "Optimal LTV",
+                f"{optimal_row['LTV']:.0f}%",
+                help=f"Loan-to-Value ratio that maximizes {objective}"
+            )
+    
+        with col2:
+            st.metric(
+                f"Max {objective}",
+                objective_format.format(optimal_row[objective_column]),
+                help=f"Highest achievable {objective} at optimal leverage"
+            )
+    
+        with col3:
+            st.metric(
+                "Equity at Optimal",
+                f"${optimal_row['Equity_Required']:,.0f}",
+                help="Equity required at optimal leverage"
+            )
+    
+        with col4:
+            st.metric(
+                "DSCR at Optimal",
+                f"{optimal_row['Year1_DSCR']:.2f}",
+                help="Debt service coverage at optimal leverage"
+            )
+    
+        def mark_optimum(figure: go.Figure, columns: Sequence[str]):
+            """Star the optimal leverage on the chart that plots the chosen objective"""
+            if objective_column in columns:
+                figure.add_trace(go.Scatter(
+                    x=[optimal_row['LTV']],
+                    y=[optimal_row[objective_column]],
+                    mode='markers',
+                    name='Optimal Point',
+                    marker=dict(size=15, color='#2ca02c', symbol='star')
+                ))
+    
+        # IRR vs Leverage Chart
+        st.markdown("**IRR vs Leverage Level**")
+    
+        fig = go.Figure()
+    
+        # After-Tax IRR line
+        fig.add_trace(go.Scatter(
+            x=opt_df['LTV'],
+            y=opt_df['After_Tax_IRR'],
+            mode='lines+markers',
+            name='After-Tax IRR',
+            line=dict(color='#667eea', width=3),
+            marker=dict(size=8)
+        ))
+    
+        # Pre-Tax IRR line
+        fig.add_trace(go.Scatter(
+            x=opt_df['LTV'],
+            y=opt_df['Pre_Tax_IRR'],
+            mode='lines+markers',
+            name='Pre-Tax IRR',
+            line=dict(color='#9467bd', width=3, dash='dash'),
+            marker=dict(size=8)
+        ))
+    
+        mark_optimum(fig, ('After_Tax_IRR', 'Pre_Tax_IRR'))
+    
+        fig.update_layout(
+            xaxis_title='Loan-to-Value (%)',
+            yaxis_title='IRR (%)',
+            hovermode='x unified',
+            template='plotly_white',
+            height=400,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+    
+        st.plotly_chart(fig, use_container_width=True)
+    
+        # Equity Multiple vs Leverage
+        st.markdown("**Equity Multiple vs Leverage Level**")
+    
+        fig2 = go.Figure()
+    
+        fig2.add_trace(go.Scatter(
+            x=opt_df['LTV'],
+            y=opt_df['After_Tax_EM'],
+            mode='lines+markers',
+            name='After-Tax EM',
+            line=dict(color='#667eea', width=3),
+            marker=dict(size=8),
+            fill='tozeroy'
+        ))
+        mark_optimum(fig2, ('After_Tax_EM',))
+    
+        fig2.update_layout(
+            xaxis_title='Loan-to-Value (%)',
+            yaxis_title='Equity Multiple (x)',
+            hovermode='x unified',
+            template='plotly_white',
+            height=400
+        )
+    
+        st.plotly_chart(fig2, use_container_width=True)
+    
+        # Risk vs Return Trade-off
+        st.markdown("**Risk vs Return Trade-off**")
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # DSCR vs LTV
+            fig3 = go.Figure()
+    
+            # Color code by DSCR level
+            colors_dscr = ['#2ca02c' if dscr >= 1.25 else '#ff7f0e' if dscr >= 1.1 else '#d62728' 
+                          for dscr in opt_df['Year1_DSCR']]
+    
+            fig3.add_trace(go.Scatter(
+                x=opt_df['LTV'],
+                y=opt_df['Year1_DSCR'],
+                mode='lines+markers',
+                name='DSCR',
+                line=dict(color='#ff7f0e', width=3),
+                marker=dict(size=10, color=colors_dscr)
+            ))
+    
+            # Add DSCR threshold line
+            fig3.add_hline(y=1.25, line_dash="dash", line_color="green", 
+                          annotation_text="Lender Min (1.25x)")
+    
+            fig3.update_layout(
+                title='Debt Service Coverage Ratio',
+                xaxis_title='Loan-to-Value (%)',
+                yaxis_title='DSCR (x)',
+                template='plotly_white',
+                height=350
+            )
+    
+            st.plotly_chart(fig3, use_container_width=True)
+    
+        with col2:
+            # Cash-on-Cash vs LTV
+            fig4 = go.Figure()
+    
+            fig4.add_trace(go.Scatter(
+                x=opt_df['LTV'],
+                y=opt_df['After_Tax_CoC'],
+                mode='lines+markers',
+                name='After-Tax CoC',
+                line=dict(color='#1f77b4', width=3),
+                marker=dict(size=10)
+            ))
+            mark_optimum(fig4, ('After_Tax_CoC',))
+    
+            fig4.update_layout(
+                title='Year 1 Cash-on-Cash Return',
+                xaxis_title='Loan-to-Value (%)',
+                yaxis_title='Cash-on-Cash (%)',
+                template='plotly_white',
+                height=350
+            )
+    
+            st.plotly_chart(fig4, use_container_width=True)
+    
+        # Detailed Table
+        st.markdown("**Leverage Scenario Comparison**")
+    
+        display_opt_df = opt_df.copy()
+        display_opt_df['Current'] = display_opt_df['LTV'].apply(
+            lambda x: '→' if abs(x - (1-inputs.down_payment_pct)*100) < 2 else ''
+        )
+    
+        # Format columns
+        display_opt_df['LTV'] = display_opt_df['LTV'].apply(lambda x: f"{x:.0f}%")
+        display_opt_df['Equity_Required'] = display_opt_df['Equity_Required'].apply(lambda x: f"${x:,.0f}")
+        display_opt_df['After_Tax_IRR'] = display_opt_df['After_Tax_IRR'].apply(lambda x: f"{x:.2f}%")
+        display_opt_df['After_Tax_EM'] = display_opt_df['After_Tax_EM'].apply(lambda x: f"{x:.2f}x")
+        display_opt_df['Year1_DSCR'] = display_opt_df['Year1_DSCR'].apply(lambda x: f"{x:.2f}")
+        display_opt_df['After_Tax_CoC'] = display_opt_df['After_Tax_CoC'].apply(lambda x: f"{x:.2f}%")
+    
+        display_columns = ['Current', 'LTV', 'Equity_Required', 'After_Tax_IRR', 
+                         'After_Tax_EM', 'Year1_DSCR', 'After_Tax_CoC']
+        display_opt_df = display_opt_df[display_columns]
+        display_opt_df.columns = ['', 'LTV', 'Equity Req', 'AT IRR', 'EM', 'DSCR', 'Y1 CoC']
+    
+        st.dataframe(display_opt_df, use_container_width=True, hide_index=True)
+    
+    else:
+        st.error("Unable to generate debt optimization analysis. Please check your inputs.")
+
+
+# Frontier table formats (irr / coc shown as fractions)
+PARETO_COLUMN_FORMATS = dict(SWEEP_COLUMN_FORMATS, purchase_price='${:,.0f}', down_payment_pct='{:.0%}',
+                             equity_required='${:,.0f}')
+
+
+@st.fragment
+@timed
+def display_pareto_frontier(inputs: PropertyInputs):
+    """Deals that are non-dominated on the chosen objectives across a price x leverage grid"""
+    st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
+    st.markdown("**Pareto Frontier: Price × Leverage**")
+    st.caption("Instead of a single best leverage, keep every deal that no other deal beats on all objectives at once.")
+    
+    labels = {label: name for name, (label, _, _) in PARETO_OBJECTIVES.items()}
+    with st.form("pareto_settings"):
+        selected = st.multiselect(
+            "Objectives (2 or 3)",
+            options=list(labels),
+            default=[PARETO_OBJECTIVES[name][0] for name in PARETO_DEFAULT_OBJECTIVES],
+            max_selections=3,
+            key="pareto_objectives",
+            help="Equity required is minimized; every other objective is maximized"
+        )
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            price_spread = st.slider("Price Range (±%)", min_value=0, max_value=50, value=20, step=5,
+                                     key="pareto_price_spread") / 100
+        with col2:
+            price_points = st.slider("Price Points", min_value=2, max_value=500, value=41, key="pareto_price_points")
+        with col3:
+            ltv_range = st.slider("LTV Range (%)", min_value=0, max_value=95, value=(0, 80), step=5,
+                                  key="pareto_ltv_range")
+        with col4:
+            ltv_points = st.slider("LTV Points", min_value=2, max_value=500, value=41, key="pareto_ltv_points")
+        submitted = st.form_submit_button("Find Frontier")
+    
+    if submitted:
+        if len(selected) < 2:
+            st.warning("Select two or three objectives.")
+            return
+        st.session_state.pareto_request = (
+            inputs_fingerprint(inputs), tuple(labels[label] for label in selected),
+            price_spread, price_points, ltv_range, ltv_points
+        )
+    
+    request = st.session_state.get('pareto_request')
+    if request is None:
+        return
+    fingerprint, objectives, price_spread, price_points, ltv_range, ltv_points = request
+    if fingerprint != inputs_fingerprint(inputs):
+        st.info("Property inputs changed since the last run. Press Find Frontier to refresh.")
+        return
+    
+    price = inputs.purchase_price
+    axes = {
+        'purchase_price': np.linspace(price * (1 - price_spread), price * (1 + price_spread),
+                                      price_points if price_spread > 0 else 1),
+        'down_payment_pct': 1 - np.linspace(ltv_range[0] / 100, ltv_range[1] / 100, ltv_points),
+    }
+    job = background_job(
+        ('pareto',) + request,
+        f"Pareto frontier of {sweep_combinations(axes):,} deals",
+        lambda job: cached_pareto_sweep(inputs, axes, objectives, progress=job.report),
+        restart=submitted,
+        show_partial=lambda frontier: st.caption(f"{len(frontier):,} non-dominated deals so far"),
+        memory_hint="Use fewer price or LTV points."
+    )
+    if job is None:
+        return
+    result = job.result
+    frontier = result.frontier
+    st.caption(
+        f"{len(frontier):,} non-dominated deals out of {result.combinations:,} "
+        f"({job.usage()}, served from cache when unchanged)"
+    )
+    
+    # Last objective across, first objective up, the third (if any) as color
+    x_name, y_name = objectives[-1], objectives[0]
+    color_name = objectives[1] if len(objectives) == 3 else None
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=result.cloud[x_name],
+        y=result.cloud[y_name],
+        mode='markers',
+        name='Dominated',
+        marker=dict(size=4, color='#c7c7c7', opacity=0.5),
+        hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scattergl(
+        x=frontier[x_name],
+        y=frontier[y_name],
+        mode='markers',
+        name='Frontier',
+        marker=dict(
+            size=8,
+            color=frontier[color_name] if color_name else '#667eea',
+            colorscale='Viridis',
+            showscale=color_name is not None,
+            colorbar=dict(title=PARETO_OBJECTIVES[color_name][0], tickformat=PARETO_OBJECTIVES[color_name][2])
+            if color_name else None,
+            line=dict(width=0.5, color='white')
+        ),
+        customdata=np.column_stack([frontier['purchase_price'], 1 - frontier['down_payment_pct']]),
+        hovertemplate="Price $%{customdata[0]:,.0f}<br>LTV %{customdata[1]:.0%}<extra></extra>"
+    ))
+    fig.update_layout(
+        xaxis_title=PARETO_OBJECTIVES[x_name][0],
+        yaxis_title=PARETO_OBJECTIVES[y_name][0],
+        xaxis_tickformat=PARETO_OBJECTIVES[x_name][2],
+        yaxis_tickformat=PARETO_OBJECTIVES[y_name][2],
+        template='plotly_white',
+        height=450,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    with st.expander("Frontier Deals"):
+        renamed = {name: INPUT_FIELD_LABELS[name] for name in result.axes}
+        formats = {renamed.get(name, name): fmt for name, fmt in PARETO_COLUMN_FORMATS.items() if name in frontier}
+        st.dataframe(
+            frontier.reset_index(drop=True).rename(columns=renamed).style.format(formats),
+            use_container_width=True,
+            hide_index=True
+        )
+
+
+@st.fragment
+@timed
+def display_scenario_comparison(inputs: PropertyInputs, returns: InvestmentReturns):
+    """Compare current inputs against a saved scenario (the selector reruns only this fragment)"""
+    st.markdown('<div class="sub-header">Scenario Comparison</div>', unsafe_allow_html=True)
+    
+    saved_scenarios = get_saved_scenarios()
+    if not saved_scenarios:
+        st.warning("No saved scenarios found. Please save a scenario first to compare.")
+    else:
+        # Scenario selector
+        scenario_options = []
+        for filepath in saved_scenarios:
+            try:
+                data = read_scenario_file(filepath)
+                name = data.get('name', 'Unnamed')
+                scenario_options.append((name, filepath))
+            except:
+                continue
+    
+        selected_name = st.selectbox(
+            "Select Scenario to Compare Against Current Inputs",
+            options=[opt[0] for opt in scenario_options]
+        )
+    
+        if selected_name:
+            # Find file path
+            selected_file = next(opt[1] for opt in scenario_options if opt[0] == selected_name)
+            _, saved_inputs = load_scenario(selected_file)
+    
+            # Generate comparison
+            comp_df = compare_scenarios(inputs, saved_inputs)
+    
+            # Display table with styling
+            st.dataframe(
+                comp_df.drop(columns=['raw_diff']),
+                use_container_width=True,
+                hide_index=True
+            )
+    
+            # Visual comparison of IRR
+            st.markdown("**IRR Comparison**")
+            fig = go.Figure()
+            fig.add_trace(go.Bar(
+                x=['Current', 'Saved'],
+                y=[returns['after_tax_irr'], 
+                   run_analysis(saved_inputs).returns['after_tax_irr']],
+                marker_color=['#667eea', '#a0aec0']
+            ))
+            fig.update_layout(
+                yaxis_tickformat='.1%',
+                template='plotly_white',
+                height=300,
+                title="Internal Rate of Return (IRR)"
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+
+def display_profiler_panel(rerun_timings: Dict[str, List[float]]):
+    """Display stage timings and peak memory for this rerun and rolling server-wide percentiles"""
+    st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
+    st.markdown('<div class="sub-header">Performance Profile</div>', unsafe_allow_html=True)
+    
+    profiler = get_stage_profiler()
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**This Rerun**")
+        rerun_df = pd.DataFrame(
+            [(stage, calls, seconds * 1000, peak / 1024 ** 2) for stage, (calls, seconds, peak) in rerun_timings.items()],
+            columns=['Stage', 'Calls', 'Total (ms)', 'Peak (MB)']
+        ).sort_values('Total (ms)', ascending=False)
+        st.dataframe(
+            rerun_df.style.format({'Total (ms)': '{:,.1f}', 'Peak (MB)': '{:,.1f}'}),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    with col2:
+        st.markdown(f"**Server Rolling Window (last {profiler.window} samples per stage)**")
+        summary_df = profiler.summary()
+        st.dataframe(
+            summary_df.style.format({
+                'Last (ms)': '{:,.1f}',
+                'p50 (ms)': '{:,.1f}',
+                'p95 (ms)': '{:,.1f}',
+                'Max (ms)': '{:,.1f}',
+                'Peak (MB)': '{:,.1f}'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        if st.button("Reset Statistics", key="reset_profiler"):
+            profiler.reset()
+            st.rerun()
+    
+    st.markdown("**Shared Result Cache**")
+    cache = get_result_cache()
+    stats = cache.stats()
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.metric("Entries", f"{stats['entries']:,}")
+    
+    with col2:
+        st.metric(
+            "Memory",
+            f"{stats['bytes'] / 1024**2:,.1f} MB",
+            help=f"Ceiling {stats['max_bytes'] / 1024**2:,.0f} MB (CRE_CACHE_MAX_MB); least recently used entries are evicted first"
+        )
+    
+    with col3:
+        st.metric(
+            "Global Hit Rate",
+            f"{stats['hit_rate']*100:.1f}%",
+            help=f"{stats['hits']:,} hits / {stats['misses']:,} misses across {stats['sessions']} sessions"
+        )
+    
+    with col4:
+        st.metric(
+            "Session Hit Rate",
+            f"{stats['session_hit_rate']*100:.1f}%",
+            help=f"{stats['session_hits']:,} hits / {stats['session_misses']:,} misses in this session"
+        )
+    
+    with col5:
+        st.metric("Evictions", f"{stats['evictions']:,}")
+        if st.button("Clear Cache", key="clear_result_cache"):
+            cache.clear()
+            st.rerun()
+    
+    if cache.disk is not None:
+        disk_stats = cache.disk.stats()
+        st.caption(
+            f"Persistent tier: {disk_stats['entries']:,} entries, "
+            f"{disk_stats['bytes'] / 1024**2:,.1f} of {disk_stats['max_bytes'] / 1024**2:,.0f} MB "
+            f"in {cache.disk.path} (engine v{cache.disk.engine_version}); "
+            f"{stats['disk_hits']:,} results restored from disk this server run"
+        )
+    else:
+        st.caption("Persistent tier disabled (set CRE_DISK_CACHE_PATH and CRE_DISK_CACHE_MAX_MB to enable)")
+    
+    st.markdown("**Memory Budget**")
+    budget = get_memory_budget().stats()
+    rss = process_peak_rss()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Budget", f"{budget['limit'] / 1024**2:,.0f} MB",
+                  help="CRE_MEMORY_BUDGET_MB; batch jobs size their chunks to fit it")
+    with col2:
+        st.metric("Reserved Now", f"{budget['in_use'] / 1024**2:,.1f} MB",
+                  help="Estimated working memory of chunks in flight across all sessions")
+    with col3:
+        st.metric("Peak Reserved", f"{budget['peak'] / 1024**2:,.1f} MB",
+                  help=f"{budget['waits']:,} chunk(s) waited for memory to free up")
+    with col4:
+        st.metric("Process Peak RSS", f"{rss / 1024**2:,.0f} MB" if rss is not None else "n/a",
+                  help="Measured high-water mark of the whole server process")
+    st.caption("Peak (MB) in the tables above is the estimated memory each stage reserved at its peak.")
+    
+    st.markdown("**Parallel Execution**")
+    st.caption(
+        f"{PARALLEL_WORKERS} worker process(es) (CRE_WORKERS); runs of {PARALLEL_MIN_SCENARIOS:,}+ scenarios "
+        f"(CRE_PARALLEL_MIN) are split into chunks of {PARALLEL_CHUNK_SCENARIOS:,} (CRE_PARALLEL_CHUNK)"
+    )
+    key = ('scaling', PARALLEL_WORKERS)
+    if st.button(f"Measure Scaling (1 to {PARALLEL_WORKERS} workers)", key="measure_scaling"):
+        # A finished measurement is dropped so the button always times afresh
+        get_job_manager().discard(key)
+        st.session_state.scaling_requested = True
+    
+    if not st.session_state.get('scaling_requested'):
+        return
+    job = background_job(
+        key,
+        "Parallel scaling (200,000 scenarios per worker count)",
+        lambda job: measure_parallel_scaling(DEFAULT_INPUTS, progress=job.report),
+        show_partial=lambda curve: st.dataframe(curve, use_container_width=True, hide_index=True),
+        memory_hint="Lower CRE_WORKERS or CRE_PARALLEL_CHUNK."
+    )
+    if job is None:
+        return
+    scaling = job.result
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=scaling['Workers'], y=scaling['Speedup'], mode='lines+markers', name='Measured'))
+        fig.add_trace(go.Scatter(x=scaling['Workers'], y=scaling['Workers'], mode='lines', name='Linear',
+                                 line=dict(dash='dash', color='#999999')))
+        fig.update_layout(xaxis_title='Workers', yaxis_title='Speedup', template='plotly_white', height=300)
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.dataframe(
+            scaling.style.format({
+                'Seconds': '{:,.2f}',
+                'Scenarios_per_Second': '{:,.0f}',
+                'Speedup': '{:.2f}x',
+                'Efficiency': '{:.0%}'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
 
 
-def main():
-    """Main application"""
+def render_app():
+    """Render the sidebar and all analysis tabs"""
     st.markdown('<h1 class="main-header">Commercial Real Estate Investment Analyzer</h1>', 
                 unsafe_allow_html=True)
     
@@ -1984,9 +6922,10 @@ def main():
             st.sidebar.error(f"Error saving scenario: {str(e)}")
     
     # Calculate analysis
-    analyzer = CREAnalyzer(inputs)
-    pro_forma = analyzer.calculate_pro_forma()
-    returns = analyzer.calculate_returns()
+    with stage_timer("analyzer"):
+        analysis = run_analysis(inputs)
+        pro_forma = analysis.pro_forma
+        returns = analysis.returns
     
     # Create tabs
     tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
@@ -1999,11 +6938,11 @@ def main():
         "🤖 AI Memo"
     ])
     
-    with tab1:
+    with tab1, stage_timer("tab_executive_summary"):
         # PDF Export button at top
         col1, col2, col3 = st.columns([3, 1, 1])
         with col3:
-            pdf_bytes = generate_pdf_report(inputs, returns, pro_forma)
+            pdf_bytes = cached_pdf_report(inputs, returns, pro_forma)
             st.download_button(
                 label="Export PDF Report",
                 data=pdf_bytes,
@@ -2062,7 +7001,7 @@ def main():
         with col4:
             st.metric("Total Tax on Sale", f"${returns['total_tax_on_sale']:,.0f}")
     
-    with tab2:
+    with tab2, stage_timer("tab_cash_flow"):
         st.plotly_chart(plot_revenue_expense_stack(pro_forma), use_container_width=True)
         
         col1, col2 = st.columns(2)
@@ -2075,7 +7014,8 @@ def main():
         
         # Cash-on-Cash by year
         st.markdown('<div class="sub-header">Annual Cash-on-Cash Returns (After-Tax)</div>', unsafe_allow_html=True)
-        coc_df = pro_forma[pro_forma['Year'] > 0][['Year', 'After_Tax_CoC']].copy()
+        coc_df = pro_forma.to_frame()
+        coc_df = coc_df[coc_df['Year'] > 0][['Year', 'After_Tax_CoC']]
         
         fig = px.bar(
             coc_df,
@@ -2089,206 +7029,21 @@ def main():
         fig.update_yaxes(tickformat='.1%')
         fig.update_layout(template='plotly_white', height=400)
         st.plotly_chart(fig, use_container_width=True)
-    
-    with tab3:
-        st.markdown('<div class="sub-header">Debt Optimization Analysis</div>', unsafe_allow_html=True)
-        st.info("This analysis shows how different leverage levels impact your returns. Find the optimal debt-to-equity ratio for maximum IRR while maintaining acceptable risk levels.")
         
-        # Run optimization
-        with st.spinner("Analyzing leverage scenarios..."):
-            opt_df = analyze_debt_optimization(inputs)
-        
-        if not opt_df.empty:
-            # Find optimal leverage
-            optimal_row = opt_df.loc[opt_df['After_Tax_IRR'].idxmax()]
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric(
-                    "Optimal LTV",
-                    f"{optimal_row['LTV']:.0f}%",
-                    help="Loan-to-Value ratio that maximizes IRR"
-                )
-            
-            with col2:
-                st.metric(
-                    "Max After-Tax IRR",
-                    f"{optimal_row['After_Tax_IRR']:.2f}%",
-                    help="Highest achievable IRR at optimal leverage"
-                )
-            
-            with col3:
-                st.metric(
-                    "Equity at Optimal",
-                    f"${optimal_row['Equity_Required']:,.0f}",
-                    help="Equity required at optimal leverage"
-                )
-            
-            with col4:
-                st.metric(
-                    "DSCR at Optimal",
-                    f"{optimal_row['Year1_DSCR']:.2f}",
-                    help="Debt service coverage at optimal leverage"
-                )
-            
-            # IRR vs Leverage Chart
-            st.markdown("**IRR vs Leverage Level**")
-            
-            fig = go.Figure()
-            
-            # After-Tax IRR line
-            fig.add_trace(go.Scatter(
-                x=opt_df['LTV'],
-                y=opt_df['After_Tax_IRR'],
-                mode='lines+markers',
-                name='After-Tax IRR',
-                line=dict(color='#667eea', width=3),
-                marker=dict(size=8)
-            ))
-            
-            # Pre-Tax IRR line
-            fig.add_trace(go.Scatter(
-                x=opt_df['LTV'],
-                y=opt_df['Pre_Tax_IRR'],
-                mode='lines+markers',
-                name='Pre-Tax IRR',
-                line=dict(color='#9467bd', width=3, dash='dash'),
-                marker=dict(size=8)
-            ))
-            
-            # Mark optimal point
-            fig.add_trace(go.Scatter(
-                x=[optimal_row['LTV']],
-                y=[optimal_row['After_Tax_IRR']],
-                mode='markers',
-                name='Optimal Point',
-                marker=dict(size=15, color='#2ca02c', symbol='star')
-            ))
-            
-            fig.update_layout(
-                xaxis_title='Loan-to-Value (%)',
-                yaxis_title='IRR (%)',
-                hovermode='x unified',
-                template='plotly_white',
-                height=400,
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Equity Multiple vs Leverage
-            st.markdown("**Equity Multiple vs Leverage Level**")
-            
-            fig2 = go.Figure()
-            
-            fig2.add_trace(go.Scatter(
-                x=opt_df['LTV'],
-                y=opt_df['After_Tax_EM'],
-                mode='lines+markers',
-                name='After-Tax EM',
-                line=dict(color='#667eea', width=3),
-                marker=dict(size=8),
-                fill='tozeroy'
-            ))
-            
-            fig2.update_layout(
-                xaxis_title='Loan-to-Value (%)',
-                yaxis_title='Equity Multiple (x)',
-                hovermode='x unified',
-                template='plotly_white',
-                height=400
-            )
-            
-            st.plotly_chart(fig2, use_container_width=True)
-            
-            # Risk vs Return Trade-off
-            st.markdown("**Risk vs Return Trade-off**")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # DSCR vs LTV
-                fig3 = go.Figure()
-                
-                # Color code by DSCR level
-                colors_dscr = ['#2ca02c' if dscr >= 1.25 else '#ff7f0e' if dscr >= 1.1 else '#d62728' 
-                              for dscr in opt_df['Year1_DSCR']]
-                
-                fig3.add_trace(go.Scatter(
-                    x=opt_df['LTV'],
-                    y=opt_df['Year1_DSCR'],
-                    mode='lines+markers',
-                    name='DSCR',
-                    line=dict(color='#ff7f0e', width=3),
-                    marker=dict(size=10, color=colors_dscr)
-                ))
-                
-                # Add DSCR threshold line
-                fig3.add_hline(y=1.25, line_dash="dash", line_color="green", 
-                              annotation_text="Lender Min (1.25x)")
-                
-                fig3.update_layout(
-                    title='Debt Service Coverage Ratio',
-                    xaxis_title='Loan-to-Value (%)',
-                    yaxis_title='DSCR (x)',
-                    template='plotly_white',
-                    height=350
-                )
-                
-                st.plotly_chart(fig3, use_container_width=True)
-            
-            with col2:
-                # Cash-on-Cash vs LTV
-                fig4 = go.Figure()
-                
-                fig4.add_trace(go.Scatter(
-                    x=opt_df['LTV'],
-                    y=opt_df['After_Tax_CoC'],
-                    mode='lines+markers',
-                    name='After-Tax CoC',
-                    line=dict(color='#1f77b4', width=3),
-                    marker=dict(size=10)
-                ))
-                
-                fig4.update_layout(
-                    title='Year 1 Cash-on-Cash Return',
-                    xaxis_title='Loan-to-Value (%)',
-                    yaxis_title='Cash-on-Cash (%)',
-                    template='plotly_white',
-                    height=350
-                )
-                
-                st.plotly_chart(fig4, use_container_width=True)
-            
-            # Detailed Table
-            st.markdown("**Leverage Scenario Comparison**")
-            
-            display_opt_df = opt_df.copy()
-            display_opt_df['Current'] = display_opt_df['LTV'].apply(
-                lambda x: '→' if abs(x - (1-inputs.down_payment_pct)*100) < 2 else ''
-            )
-            
-            # Format columns
-            display_opt_df['LTV'] = display_opt_df['LTV'].apply(lambda x: f"{x:.0f}%")
-            display_opt_df['Equity_Required'] = display_opt_df['Equity_Required'].apply(lambda x: f"${x:,.0f}")
-            display_opt_df['After_Tax_IRR'] = display_opt_df['After_Tax_IRR'].apply(lambda x: f"{x:.2f}%")
-            display_opt_df['After_Tax_EM'] = display_opt_df['After_Tax_EM'].apply(lambda x: f"{x:.2f}x")
-            display_opt_df['Year1_DSCR'] = display_opt_df['Year1_DSCR'].apply(lambda x: f"{x:.2f}")
-            display_opt_df['After_Tax_CoC'] = display_opt_df['After_Tax_CoC'].apply(lambda x: f"{x:.2f}%")
-            
-            display_columns = ['Current', 'LTV', 'Equity_Required', 'After_Tax_IRR', 
-                             'After_Tax_EM', 'Year1_DSCR', 'After_Tax_CoC']
-            display_opt_df = display_opt_df[display_columns]
-            display_opt_df.columns = ['', 'LTV', 'Equity Req', 'AT IRR', 'EM', 'DSCR', 'Y1 CoC']
-            
-            st.dataframe(display_opt_df, use_container_width=True, hide_index=True)
-            
-        else:
-            st.error("Unable to generate debt optimization analysis. Please check your inputs.")
+        display_exit_year_analysis(inputs)
+    
+    with tab3, stage_timer("tab_debt_optimization"):
+        display_debt_optimization(inputs)
+        display_pareto_frontier(inputs)
     
-    with tab4:
+    with tab4, stage_timer("tab_sensitivity"):
         display_sensitivity_analysis(inputs)
+        display_hurdle_contour(inputs)
+        display_tornado_analysis(inputs)
+        display_input_elasticities(inputs)
+        display_sobol_analysis(inputs)
+        display_monte_carlo(inputs)
+        display_parameter_sweep(inputs)
         
         st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
         st.markdown("**Sensitivity Analysis Notes**")
@@ -2296,10 +7051,16 @@ def main():
         - **IRR Sensitivity**: Shows how your internal rate of return varies with different exit cap rates and purchase prices
         - **Cash-on-Cash Sensitivity**: Shows Year 1 cash returns based on rent per SF and occupancy levels
         - **Green** indicates higher returns, **Red** indicates lower returns
+        - **Hurdle Contour**: Traces where IRR or DSCR crosses your hurdle, sampling densely only near the line
+        - **Tornado Chart**: Shocks every numeric input down and up and ranks inputs by how far they move IRR, NPV or DSCR
+        - **Input Elasticities**: Exact derivatives of IRR, NPV, equity multiple and DSCR for small changes in each input, free of finite-difference noise
+        - **Sobol Indices**: Share of IRR / NPV variance explained by each input on its own and through interactions when inputs vary together
+        - **Monte Carlo Simulation**: Distribution of IRR when inputs are uncertain; stratified sampling stops as soon as P10 / P50 are pinned down
+        - **Parameter Sweep**: Every combination of several inputs, keeping only the best (or worst) combinations and summary statistics
         - Use these tables to understand which variables have the greatest impact on your returns
         """)
     
-    with tab5:
+    with tab5, stage_timer("tab_pro_forma"):
         display_pro_forma_table(pro_forma)
         
         # Export functionality
@@ -2315,6 +7076,15 @@ def main():
                 file_name="pro_forma.csv",
                 mime="text/csv"
             )
+            
+            if analysis.monthly_schedule is not None:
+                monthly_csv = pd.DataFrame(analysis.monthly_schedule).to_csv(index=False)
+                st.download_button(
+                    label="Download Monthly Schedule (CSV)",
+                    data=monthly_csv,
+                    file_name="monthly_schedule.csv",
+                    mime="text/csv"
+                )
         
         with col2:
             # Export summary
@@ -2345,62 +7115,10 @@ def main():
                 mime="text/csv"
             )
 
-    with tab6:
-        st.markdown('<div class="sub-header">Scenario Comparison</div>', unsafe_allow_html=True)
-        
-        saved_scenarios = get_saved_scenarios()
-        if not saved_scenarios:
-            st.warning("No saved scenarios found. Please save a scenario first to compare.")
-        else:
-            # Scenario selector
-            scenario_options = []
-            for filepath in saved_scenarios:
-                try:
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                        name = data.get('name', 'Unnamed')
-                        scenario_options.append((name, filepath))
-                except:
-                    continue
-            
-            selected_name = st.selectbox(
-                "Select Scenario to Compare Against Current Inputs",
-                options=[opt[0] for opt in scenario_options]
-            )
-            
-            if selected_name:
-                # Find file path
-                selected_file = next(opt[1] for opt in scenario_options if opt[0] == selected_name)
-                _, saved_inputs = load_scenario(selected_file)
-                
-                # Generate comparison
-                comp_df = compare_scenarios(inputs, saved_inputs)
-                
-                # Display table with styling
-                st.dataframe(
-                    comp_df.drop(columns=['raw_diff']),
-                    use_container_width=True,
-                    hide_index=True
-                )
-                
-                # Visual comparison of IRR
-                st.markdown("**IRR Comparison**")
-                fig = go.Figure()
-                fig.add_trace(go.Bar(
-                    x=['Current', 'Saved'],
-                    y=[returns['after_tax_irr'], 
-                       CREAnalyzer(saved_inputs).calculate_returns()['after_tax_irr']],
-                    marker_color=['#667eea', '#a0aec0']
-                ))
-                fig.update_layout(
-                    yaxis_tickformat='.1%',
-                    template='plotly_white',
-                    height=300,
-                    title="Internal Rate of Return (IRR)"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+    with tab6, stage_timer("tab_compare"):
+        display_scenario_comparison(inputs, returns)
 
-    with tab7:
+    with tab7, stage_timer("tab_memo"):
         st.markdown('<div class="sub-header">AI Investment Memo</div>', unsafe_allow_html=True)
         st.info("This memo is automatically generated based on your deal metrics and standard underwriting criteria.")
         
@@ -2412,6 +7130,831 @@ def main():
         st.code(memo_text, language="markdown")
 
 
+# Local HTTP evaluation service (python app.py serve)
+SERVICE_HOST = os.environ.get("CRE_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("CRE_SERVICE_PORT", "8765"))
+SERVICE_BATCH_WINDOW_MS = float(os.environ.get("CRE_SERVICE_BATCH_WINDOW_MS", "5"))
+SERVICE_MAX_BATCH = int(os.environ.get("CRE_SERVICE_MAX_BATCH", "256"))
+
+# Requests larger than this are refused; a scenario document is a few KB
+SERVICE_MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Seconds a request waits for its batch before the service gives up on it
+SERVICE_REQUEST_TIMEOUT = 120
+
+service_logger = logging.getLogger("cre_analyzer.service")
+
+
+def json_numbers(values: Sequence[float]) -> List[Optional[float]]:
+    """Floats for a JSON response, with NaN and infinities (e.g. an undefined IRR) as null"""
+    return [value if math.isfinite(value) else None for value in values]
+
+
+def analysis_document(name: str, inputs: PropertyInputs, analysis: AnalysisResult,
+                      include_pro_forma: bool = True) -> Dict:
+    """JSON-ready returns (and optionally the pro forma, one list per column) for one scenario"""
+    returns = analysis.returns.to_dict()
+    document = {
+        'name': name,
+        'fingerprint': inputs_fingerprint(inputs),
+        'engine_version': ENGINE_VERSION,
+        'returns': dict(zip(returns, json_numbers(returns.values()))),
+        'cash_flows': json_numbers(analysis.returns['cash_flows'].tolist()),
+    }
+    if include_pro_forma:
+        columns = analysis.pro_forma.values.T.tolist()
+        document['pro_forma'] = {
+            column_name: json_numbers(column) for column_name, column in zip(PRO_FORMA_COLUMNS, columns)
+        }
+        document['pro_forma']['Year'] = [int(year) for year in document['pro_forma']['Year']]
+    return document
+
+
+class EvaluationBatcher:
+    """Coalesce concurrent evaluation requests into vectorized batches
+    
+    Callers submit inputs and get a Future. One worker thread takes every
+    request that arrives within window_seconds of the oldest waiting one (up
+    to max_batch) and resolves them with a single run_analyses call: cache
+    hits are served and all misses of the window are projected in one engine
+    pass. A scenario that makes the batch fail is retried on its own, so it
+    cannot fail the other requests of its window.
+    """
+    
+    def __init__(self, window_seconds: float, max_batch: int, cache: Optional[ResultCache] = None):
+        self.window_seconds = window_seconds
+        self.max_batch = max(1, max_batch)
+        self.cache = cache
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self._thread = threading.Thread(target=self._run, name="cre-evaluation-batcher", daemon=True)
+        self._thread.start()
+    
+    def submit(self, inputs: PropertyInputs) -> Future:
+        """Future of the analysis for inputs; raises ValueError at once for inputs validate_inputs refuses"""
+        validate_inputs(inputs)
+        future = Future()
+        self._queue.put((inputs, future))
+        return future
+    
+    def evaluate(self, inputs: PropertyInputs, timeout: Optional[float] = None) -> AnalysisResult:
+        return self.submit(inputs).result(timeout)
+    
+    def _collect(self) -> List[Tuple[PropertyInputs, Future]]:
+        pending = [self._queue.get()]
+        deadline = time.perf_counter() + self.window_seconds
+        while len(pending) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                pending.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return pending
+    
+    def _run(self):
+        while True:
+            pending = [(inputs, future) for inputs, future in self._collect()
+                       if future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            with self._lock:
+                self.requests += len(pending)
+                self.batches += 1
+                self.largest_batch = max(self.largest_batch, len(pending))
+            self._evaluate(pending)
+    
+    def _evaluate(self, pending: List[Tuple[PropertyInputs, Future]]):
+        try:
+            results = run_analyses([inputs for inputs, _ in pending], self.cache)
+        except Exception as e:
+            if len(pending) == 1:
+                pending[0][1].set_exception(e)
+                return
+            for item in pending:
+                self._evaluate([item])
+            return
+        for (_, future), result in zip(pending, results):
+            future.set_result(result)
+    
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'mean_batch': self.requests / self.batches if self.batches else 0.0,
+                'largest_batch': self.largest_batch,
+                'queued': self._queue.qsize()
+            }
+
+
+class EvaluationRequestHandler(BaseHTTPRequestHandler):
+    """GET /health and POST /evaluate for an EvaluationService
+    
+    POST /evaluate takes one scenario (a save_scenario document or a bare
+    inputs dict) or a JSON array of them, and answers in kind. Add
+    ?pro_forma=0 to return only returns and cash flows.
+    """
+    protocol_version = "HTTP/1.1"
+    server_version = f"CREAnalyzer/{ENGINE_VERSION}"
+    
+    def do_GET(self):
+        if urlsplit(self.path).path == '/health':
+            self._send_json(200, self.server.health())
+        else:
+            self._send_json(404, {'error': f"No such endpoint: {self.path}"})
+    
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/evaluate':
+            self._send_json(404, {'error': f"No such endpoint: {url.path}"})
+            return
+        try:
+            length = int(self.headers['Content-Length'])
+        except (TypeError, ValueError):
+            length = -1
+        if length < 0:
+            # The body cannot be delimited, so it is never read and the connection is dropped
+            self.close_connection = True
+            self._send_json(400, {'error': "Content-Length must be a non-negative integer"})
+            return
+        if length > SERVICE_MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {'error': f"Request body over {SERVICE_MAX_BODY_BYTES // (1024 * 1024)} MB"})
+            return
+        
+        try:
+            body = json.loads(self.rfile.read(length))
+            documents = body if isinstance(body, list) else [body]
+            scenarios = [inputs_from_document(document) for document in documents]
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        
+        include_pro_forma = parse_qs(url.query).get('pro_forma', ['1'])[0].lower() not in ('0', 'false', 'no')
+        futures = [self.server.batcher.submit(inputs) for _, inputs in scenarios]
+        try:
+            results = [
+                analysis_document(name, inputs, future.result(SERVICE_REQUEST_TIMEOUT), include_pro_forma)
+                for (name, inputs), future in zip(scenarios, futures)
+            ]
+        except MemoryBudgetError as e:
+            self._send_json(503, {'error': str(e)})
+            return
+        except TimeoutError:
+            self._send_json(504, {'error': f"Evaluation took over {SERVICE_REQUEST_TIMEOUT} s"})
+            return
+        except Exception as e:
+            service_logger.exception("Evaluation failed")
+            self._send_json(500, {'error': f"Evaluation failed: {e}"})
+            return
+        self._send_json(200, results if isinstance(body, list) else results[0])
+    
+    def _send_json(self, status: int, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format: str, *args):
+        service_logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class EvaluationService(ThreadingHTTPServer):
+    """Threaded local HTTP server whose requests share one EvaluationBatcher and the result cache"""
+    daemon_threads = True
+    # Many clients connect at once; the socketserver default backlog of 5 resets them
+    request_queue_size = 128
+    
+    def __init__(self, address: Tuple[str, int], batcher: EvaluationBatcher, cache: Optional[ResultCache] = None):
+        super().__init__(address, EvaluationRequestHandler)
+        self.batcher = batcher
+        self.cache = cache or get_result_cache()
+        self.started = time.time()
+    
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def health(self) -> Dict:
+        return {
+            'status': 'ok',
+            'engine_version': ENGINE_VERSION,
+            'uptime_seconds': time.time() - self.started,
+            'batcher': self.batcher.stats(),
+            'cache': self.cache.stats()
+        }
+
+
+@st.cache_resource
+def get_evaluation_batcher() -> EvaluationBatcher:
+    """Server-wide request batcher shared by the HTTP service and the async API"""
+    return EvaluationBatcher(SERVICE_BATCH_WINDOW_MS / 1000, SERVICE_MAX_BATCH, get_result_cache())
+
+
+def create_evaluation_service(host: str = SERVICE_HOST, port: int = SERVICE_PORT) -> EvaluationService:
+    """Service bound to host:port (port 0 picks a free one) and backed by the server-wide result cache"""
+    return EvaluationService((host, port), get_evaluation_batcher(), get_result_cache())
+
+
+# Async API: most evaluations evaluate_many keeps queued or running at once
+ASYNC_MAX_IN_FLIGHT = 1024
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    values = values.copy()
+    values.setflags(write=False)
+    return values
+
+
+def frozen_analysis(analysis: AnalysisResult) -> AnalysisResult:
+    """Copy of a (shared, cached) analysis whose arrays and monthly schedule cannot be modified"""
+    schedule = analysis.monthly_schedule
+    if schedule is not None:
+        schedule = MappingProxyType({name: _read_only(column) for name, column in schedule.items()})
+    return AnalysisResult(
+        ProForma(_read_only(analysis.pro_forma.values)),
+        InvestmentReturns(_read_only(analysis.returns._values), _read_only(analysis.returns['cash_flows'])),
+        schedule
+    )
+
+
+async def evaluate(inputs: PropertyInputs, batcher: Optional[EvaluationBatcher] = None) -> AnalysisResult:
+    """Analysis for inputs without blocking the event loop
+    
+    The projection runs on the batcher's worker thread, coalesced with every
+    other evaluation in flight, and is served from the shared result cache
+    when possible. Cancelling the awaiting task drops the request if it has
+    not started yet. The result is read-only (see frozen_analysis).
+    """
+    batcher = batcher or get_evaluation_batcher()
+    return frozen_analysis(await asyncio.wrap_future(batcher.submit(inputs)))
+
+
+async def evaluate_many(stream: Union[Iterable[PropertyInputs], AsyncIterable[PropertyInputs]],
+                        max_in_flight: int = ASYNC_MAX_IN_FLIGHT,
+                        batcher: Optional[EvaluationBatcher] = None) -> AsyncIterator[AnalysisResult]:
+    """Read-only analyses for a (sync or async) stream of inputs, yielded in input order
+    
+    At most max_in_flight evaluations are queued or running at once: the
+    stream is only read further as results are consumed, so a slow consumer
+    or a huge stream never piles up work or memory. Closing the generator
+    (break, or cancelling the consuming task) cancels everything not yet
+    started.
+    """
+    batcher = batcher or get_evaluation_batcher()
+    in_flight: deque = deque()
+    
+    async def inputs_stream():
+        if isinstance(stream, AsyncIterable):
+            async for inputs in stream:
+                yield inputs
+        else:
+            for inputs in stream:
+                yield inputs
+    
+    try:
+        async for inputs in inputs_stream():
+            in_flight.append(asyncio.wrap_future(batcher.submit(inputs)))
+            if len(in_flight) >= max_in_flight:
+                await asyncio.wait([in_flight[0]])
+            while in_flight and in_flight[0].done():
+                yield frozen_analysis(in_flight.popleft().result())
+        while in_flight:
+            yield frozen_analysis(await in_flight.popleft())
+    finally:
+        for pending in in_flight:
+            pending.cancel()
+
+
+def load_test_scenarios(count: int, seed: Optional[int] = None) -> List[Dict]:
+    """count distinct save_scenario documents around DEFAULT_INPUTS (price, rent, rate and exit cap jittered)"""
+    rng = np.random.default_rng(seed)
+    base = asdict(DEFAULT_INPUTS)
+    jitter = rng.uniform(0.8, 1.2, size=(count, 4))
+    return [{
+        'name': f"Load test {i}",
+        'inputs': dict(base, purchase_price=base['purchase_price'] * a, annual_rent_psf=base['annual_rent_psf'] * b,
+                       interest_rate=base['interest_rate'] * c, exit_cap_rate=base['exit_cap_rate'] * d)
+    } for i, (a, b, c, d) in enumerate(jitter.tolist())]
+
+
+def service_load_test(url: str, requests: int = 2000, concurrency: int = 32, distinct: Optional[int] = None,
+                      include_pro_forma: bool = True, seed: Optional[int] = None) -> Dict[str, float]:
+    """Throughput and latency of a running service under concurrency simultaneous clients
+    
+    Each client thread keeps one connection open and posts scenarios one at
+    a time. requests are spread over distinct scenarios (all distinct by
+    default, so every request is computed unless an earlier run cached it;
+    fewer distinct scenarios measure the cache path). Latencies are in ms.
+    """
+    parts = urlsplit(url)
+    scenarios = load_test_scenarios(distinct or requests, seed)
+    order = np.random.default_rng(seed).permutation(requests) % len(scenarios)
+    bodies = [json.dumps(scenario).encode() for scenario in scenarios]
+    path = '/evaluate' if include_pro_forma else '/evaluate?pro_forma=0'
+    latencies = np.full(requests, np.nan)
+    failures = []
+    
+    def health() -> Dict:
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=SERVICE_REQUEST_TIMEOUT)
+        try:
+            conn.request('GET', '/health')
+            return json.loads(conn.getresponse().read())
+        finally:
+            conn.close()
+    
+    def client(worker: int):
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=SERVICE_REQUEST_TIMEOUT)
+        try:
+            for i in range(worker, requests, concurrency):
+                started = time.perf_counter()
+                try:
+                    conn.request('POST', path, body=bodies[order[i]], headers={'Content-Type': 'application/json'})
+                    response = conn.getresponse()
+                    response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException) as e:
+                    conn.close()
+                    status = type(e).__name__
+                latencies[i] = (time.perf_counter() - started) * 1000
+                if status != 200:
+                    failures.append(status)
+        finally:
+            conn.close()
+    
+    before = health()['batcher']
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for done in [pool.submit(client, worker) for worker in range(concurrency)]:
+            done.result()
+    elapsed = time.perf_counter() - started
+    after = health()['batcher']
+    
+    batches = after['batches'] - before['batches']
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'distinct': len(scenarios),
+        'errors': len(failures),
+        'seconds': elapsed,
+        'throughput': requests / elapsed,
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'max_ms': float(np.max(latencies)),
+        'batches': batches,
+        'mean_batch': (after['requests'] - before['requests']) / batches if batches else 0.0
+    }
+
+
+# Concurrent-session load test (python app.py sessiontest)
+# Seconds one simulated interaction may take before the session counts it as failed
+SESSION_TEST_TIMEOUT = 300
+
+SESSION_TEST_STEPS = ('open', 'edit', 'load', 'compare', 'export')
+
+# Streamlit releases (major, minor; both ends included) the test has been verified on. It shares
+# one runtime between AppTest sessions through Streamlit internals that may change in any release
+SESSION_TEST_STREAMLIT_VERSIONS = ((1, 64), (1, 66))
+
+# Warns about a missing script context whenever an AppTest is created off a script thread
+SESSION_TEST_CONTEXT_LOGGER = "streamlit.runtime.scriptrunner_utils.script_run_context"
+
+# Session-state key where the page script accumulates its own CPU seconds
+SESSION_TEST_CPU_KEY = '_session_test_cpu_seconds'
+
+# Page script of the simulated sessions. AppTest recompiles its script on every
+# rerun, which a real server does not, so sessions run a stub that calls main()
+# and adds the CPU time of the script thread to the session's state
+SESSION_TEST_SCRIPT = f"""
+import time
+import streamlit as st
+import {ENGINE_MODULE}
+started = time.thread_time()
+try:
+    {ENGINE_MODULE}.main()
+finally:
+    st.session_state[{SESSION_TEST_CPU_KEY!r}] = (
+        st.session_state.get({SESSION_TEST_CPU_KEY!r}, 0.0) + time.thread_time() - started
+    )
+"""
+
+
+def state_bytes(values: Mapping) -> int:
+    """Approximate memory held by a session's state: pickled size of every picklable value"""
+    total = 0
+    for value in values.values():
+        try:
+            total += len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            continue
+    return total
+
+
+def check_session_test_support():
+    """Raise RuntimeError if the installed Streamlit lacks the internals shared_test_runtime relies on
+    
+    Releases outside SESSION_TEST_STREAMLIT_VERSIONS that still have them
+    only get a warning, since their numbers may not compare with a baseline.
+    """
+    low, high = SESSION_TEST_STREAMLIT_VERSIONS
+    verified = f"{low[0]}.{low[1]} to {high[0]}.{high[1]}"
+    missing = []
+    try:
+        from streamlit.runtime import Runtime
+        from streamlit.testing.v1 import app_test
+        from streamlit.testing.v1.util import patch_config_options  # noqa: F401
+    except ImportError as e:
+        missing.append(str(e))
+    else:
+        if not isinstance(getattr(app_test, 'Runtime', None), type):
+            missing.append("streamlit.testing.v1.app_test.Runtime")
+        if '_instance' not in vars(Runtime):
+            missing.append("Runtime._instance")
+        context_logger = logging.getLogger(SESSION_TEST_CONTEXT_LOGGER)
+        context_level = context_logger.level
+        context_logger.setLevel(logging.ERROR)
+        try:
+            if not hasattr(app_test.AppTest.from_string("").session_state, 'to_dict'):
+                missing.append("AppTest.session_state.to_dict()")
+        finally:
+            context_logger.setLevel(context_level)
+    if missing:
+        raise RuntimeError(
+            f"sessiontest does not support Streamlit {st.__version__} (missing {', '.join(missing)}); "
+            f"it is verified on Streamlit {verified}"
+        )
+    
+    version = tuple(int(part) for part in st.__version__.split('.')[:2] if part.isdigit())
+    if not low <= version <= high:
+        logging.getLogger("cre_analyzer.sessiontest").warning(
+            "sessiontest is verified on Streamlit %s, not %s; compare its numbers with care", verified, st.__version__
+        )
+
+
+@contextmanager
+def shared_test_runtime():
+    """Let AppTest sessions on several threads share one Streamlit runtime, as a server's sessions do
+    
+    AppTest installs a mock runtime at the start of every run and removes it
+    at the end, which would pull the runtime from under sessions running on
+    other threads. Within this block the first runtime installed stays until
+    the block exits, and every AppTest run sees the same config (app-test
+    mode, no magic commands: Python 3.11's ast module is not thread-safe,
+    and AppTest parses the script for magic on every rerun). Fails fast,
+    before patching anything, on a Streamlit without the internals it uses.
+    """
+    check_session_test_support()
+    from unittest import mock
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+    from streamlit.testing.v1.util import patch_config_options
+    
+    lock = threading.Lock()
+    
+    class PinnedInstance(type):
+        def __setattr__(cls, name, value):
+            if name != '_instance':
+                super().__setattr__(name, value)
+                return
+            with lock:
+                if value is not None and Runtime._instance is None:
+                    Runtime._instance = value
+    
+    class PinnedRuntime(Runtime, metaclass=PinnedInstance):
+        pass
+    
+    # Streamlit's deprecation warnings would otherwise repeat on every rerun, and
+    # AppTest's session state warns that it has no script context when created
+    options = {"global.appTest": True, "runner.magicEnabled": False, "logger.level": "error"}
+    context_logger = logging.getLogger(SESSION_TEST_CONTEXT_LOGGER)
+    context_level = context_logger.level
+    context_logger.setLevel(logging.ERROR)
+    try:
+        with patch_config_options(options), mock.patch.object(app_test, 'Runtime', PinnedRuntime):
+            yield
+    finally:
+        Runtime._instance = None
+        context_logger.setLevel(context_level)
+
+
+def simulate_session(session: int, iterations: int, scenario_names: Sequence[str], barrier: threading.Barrier,
+                     think_seconds: float = 0.0, seed: Optional[int] = None) -> Dict:
+    """Thread entry point: drive one AppTest session through iterations of edit, load, compare and export
+    
+    Each interaction is one widget change followed by the rerun a browser
+    would trigger, including any reruns the app requests with st.rerun.
+    Waits on barrier so every session starts together. Returns per-step wall
+    latencies and page-script CPU in ms, failures, and the size of the
+    session's state. Must run inside shared_test_runtime.
+    """
+    from streamlit.testing.v1 import AppTest
+    
+    rng = np.random.default_rng(None if seed is None else [seed, session])
+    at = AppTest.from_string(SESSION_TEST_SCRIPT, default_timeout=SESSION_TEST_TIMEOUT)
+    latencies: Dict[str, List[float]] = {step: [] for step in SESSION_TEST_STEPS}
+    cpu_ms: Dict[str, List[float]] = {step: [] for step in SESSION_TEST_STEPS}
+    failures: List[str] = []
+    script_cpu = 0.0
+    
+    def rerun(step: str, interact: Optional[Callable[[], None]] = None):
+        nonlocal script_cpu
+        if think_seconds:
+            time.sleep(rng.uniform(0, think_seconds))
+        started = time.perf_counter()
+        try:
+            if interact is not None:
+                interact()
+            at.run()
+        except Exception as e:
+            failures.append(f"session {session} {step}: {type(e).__name__}: {e}")
+            return
+        latencies[step].append((time.perf_counter() - started) * 1000)
+        # Every rerun of the step, including those inside interact, adds to the total
+        cpu_ms[step].append((at.session_state[SESSION_TEST_CPU_KEY] - script_cpu) * 1000)
+        script_cpu = at.session_state[SESSION_TEST_CPU_KEY]
+        failures.extend(f"session {session} {step}: {exception.value}" for exception in at.exception)
+    
+    def edit():
+        label, step = [("Purchase Price ($)", 100000), ("Interest Rate (%)", 0.25),
+                       ("Down Payment (%)", 5.0), ("Exit Cap Rate (%)", 0.25)][rng.integers(4)]
+        widget = next(w for w in list(at.number_input) + list(at.slider) if w.label == label)
+        value = widget.value + step * int(rng.choice([-2, -1, 1, 2]))
+        if widget.min is not None:
+            value = max(value, widget.min)
+        if widget.max is not None:
+            value = min(value, widget.max)
+        widget.set_value(type(widget.value)(value))
+    
+    def load():
+        next(b for b in at.button if b.label == "Load" and not b.key).click()
+        at.run()
+        picker = next(s for s in at.selectbox if s.label == "Select Scenario")
+        picker.set_value(picker.options[rng.integers(len(picker.options))])
+        at.run()
+        at.button(key="load_confirm").click()
+    
+    def compare():
+        picker = next(s for s in at.selectbox if s.label.startswith("Select Scenario to Compare"))
+        picker.set_value(scenario_names[rng.integers(len(scenario_names))])
+    
+    def export():
+        downloads = at.get('download_button')
+        downloads[rng.integers(len(downloads))].click()
+    
+    barrier.wait(SESSION_TEST_TIMEOUT)
+    started = time.time()
+    rerun('open')
+    for _ in range(iterations):
+        for step, interact in (('edit', edit), ('load', load), ('compare', compare), ('export', export)):
+            rerun(step, interact)
+    finished = time.time()
+    
+    return {
+        'session': session,
+        'started': started,
+        'finished': finished,
+        'latencies': latencies,
+        'cpu_ms': cpu_ms,
+        'failures': failures,
+        'state_bytes': state_bytes(at.session_state.to_dict())
+    }
+
+
+def latency_percentiles(values: Sequence[float]) -> Dict[str, float]:
+    """count, p50 / p95 / p99 and max of latencies in ms (NaN when there are none)"""
+    if not len(values):
+        return {'count': 0, 'p50_ms': math.nan, 'p95_ms': math.nan, 'p99_ms': math.nan, 'max_ms': math.nan}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'count': len(values), 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': float(np.max(values))}
+
+
+def session_load_test(sessions: int = 8, iterations: int = 5, scenarios: int = 5, think_seconds: float = 0.0,
+                      seed: Optional[int] = None) -> Dict:
+    """Rerun latency, CPU and memory of the app under sessions simultaneous simulated users
+    
+    Every session is an AppTest on its own thread of this process, so, as on
+    a Streamlit server, sessions share the st.cache_resource singletons
+    (result cache, job manager, worker pool) and take turns on the GIL.
+    CPU is the page script's own thread time per session; work the app hands
+    to shared threads (jobs, batching, warm-up) is counted only in the
+    process total. Memory is the process's peak RSS growth. The test runs in
+    a fresh temporary directory seeded with scenarios saved scenarios, with
+    a cold disk cache and its own sweep store: nothing in the working tree
+    is read or written and no network is needed, so repeated runs are
+    comparable over time. Run it from the command line (python app.py
+    sessiontest), where the sessions import the app fresh with these settings.
+    """
+    from unittest import mock
+    
+    engine_dir = str(Path(__file__).resolve().parent)
+    if engine_dir not in sys.path:
+        sys.path.insert(0, engine_dir)
+    if ENGINE_MODULE in sys.modules:
+        logging.getLogger("cre_analyzer.sessiontest").warning(
+            "%s is already imported; sessions reuse its caches and settings", ENGINE_MODULE
+        )
+    
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="cre-sessiontest-") as workdir:
+        scenarios_dir = Path(workdir) / "scenarios"
+        scenarios_dir.mkdir()
+        names = []
+        for i, document in enumerate(load_test_scenarios(scenarios, seed)):
+            name, inputs = inputs_from_document(document)
+            save_scenario(inputs, name, str(scenarios_dir / f"load_test_{i}.json"))
+            names.append(name)
+        
+        settings = {
+            "CRE_DISK_CACHE_PATH": str(Path(workdir) / ".cache" / "results.sqlite"),
+            "CRE_RESULT_STORE_DIR": str(Path(workdir) / ".cache" / "sweeps"),
+        }
+        barrier = threading.Barrier(sessions)
+        os.chdir(workdir)
+        # Per-rerun records still reach CRE_PERF_LOG if set, but not the console
+        perf_logger.propagate = False
+        try:
+            with mock.patch.dict(os.environ, settings), shared_test_runtime():
+                baseline_rss, cpu_started = process_peak_rss(), time.process_time()
+                with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="cre-session") as pool:
+                    futures = [pool.submit(simulate_session, session, iterations, names, barrier, think_seconds, seed)
+                               for session in range(sessions)]
+                    results = [future.result() for future in futures]
+                process_cpu_ms = (time.process_time() - cpu_started) * 1000
+                peak_rss = process_peak_rss()
+        finally:
+            perf_logger.propagate = True
+            os.chdir(previous_dir)
+    
+    elapsed = max(result['finished'] for result in results) - min(result['started'] for result in results)
+    steps = {step: [value for result in results for value in result['latencies'][step]] for step in SESSION_TEST_STEPS}
+    all_latencies = [value for values in steps.values() for value in values]
+    failures = [failure for result in results for failure in result['failures']]
+    
+    session_rows = []
+    for result in results:
+        latencies = [value for values in result['latencies'].values() for value in values]
+        cpu = sum(value for values in result['cpu_ms'].values() for value in values)
+        session_rows.append({
+            'session': result['session'],
+            'interactions': len(latencies),
+            'p50_ms': float(np.median(latencies)) if latencies else math.nan,
+            'max_ms': max(latencies, default=math.nan),
+            'cpu_ms': cpu,
+            'state_kb': result['state_bytes'] / 1024
+        })
+    
+    rss_growth_mb = (peak_rss - baseline_rss) / 1024 ** 2 if peak_rss is not None else math.nan
+    summary = {
+        'sessions': sessions,
+        'iterations': iterations,
+        'interactions': len(all_latencies),
+        'errors': len(failures),
+        'seconds': elapsed,
+        'throughput': len(all_latencies) / elapsed,
+        **{key: value for key, value in latency_percentiles(all_latencies).items() if key != 'count'},
+        'cpu_ms_per_interaction': sum(row['cpu_ms'] for row in session_rows) / max(len(all_latencies), 1),
+        'process_cpu_ms_per_interaction': process_cpu_ms / max(len(all_latencies), 1),
+        'rss_growth_mb': rss_growth_mb,
+        'rss_mb_per_session': rss_growth_mb / sessions,
+        'peak_rss_mb': peak_rss / 1024 ** 2 if peak_rss is not None else math.nan,
+        'state_kb_per_session': float(np.mean([row['state_kb'] for row in session_rows]))
+    }
+    return {
+        'summary': summary,
+        'steps': {step: latency_percentiles(values) for step, values in steps.items()},
+        'sessions': session_rows,
+        'failures': failures
+    }
+
+
+def configure_page():
+    """Page settings and custom CSS (first Streamlit call of every rerun)"""
+    st.set_page_config(
+        page_title="Commercial Real Estate Investment Analyzer",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
+
+
+def main():
+    """Main application"""
+    configure_page()
+    warmer = get_cache_warmer()
+    
+    with rerun_profile() as rerun_timings:
+        render_app()
+    
+    with st.sidebar:
+        display_warmup_status(warmer)
+    
+    with st.sidebar.expander("BACKGROUND JOBS", expanded=False):
+        display_job_list()
+    
+    with st.sidebar.expander("DIAGNOSTICS", expanded=False):
+        show_profiler = st.checkbox(
+            "Show Performance Profiler",
+            key="show_profiler",
+            help="Per-stage timings for this rerun plus rolling p50/p95 across all sessions"
+        )
+    
+    if show_profiler:
+        display_profiler_panel(rerun_timings)
+
+
+def cli(argv: Optional[Sequence[str]] = None):
+    """Command line outside Streamlit: python app.py serve | loadtest | sessiontest"""
+    parser = argparse.ArgumentParser(prog="app.py", description="Commercial Real Estate Investment Analyzer services")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    serve = commands.add_parser('serve', help="Run the local HTTP evaluation service")
+    serve.add_argument('--host', default=SERVICE_HOST)
+    serve.add_argument('--port', type=int, default=SERVICE_PORT)
+    
+    load_test = commands.add_parser('loadtest', help="Measure service throughput and latency")
+    load_test.add_argument('--url', help="Service to test (default: start one in this process)")
+    load_test.add_argument('--requests', type=int, default=2000)
+    load_test.add_argument('--concurrency', type=int, default=32)
+    load_test.add_argument('--distinct', type=int, help="Distinct scenarios (default: one per request)")
+    load_test.add_argument('--no-pro-forma', action='store_true', help="Request returns only")
+    load_test.add_argument('--seed', type=int)
+    
+    session_test = commands.add_parser('sessiontest', help="Measure app rerun latency, CPU and memory under concurrent sessions")
+    session_test.add_argument('--sessions', type=int, default=8)
+    session_test.add_argument('--iterations', type=int, default=5, help="Edit, load, compare and export rounds per session")
+    session_test.add_argument('--scenarios', type=int, default=5, help="Saved scenarios to load and compare against")
+    session_test.add_argument('--think', type=float, default=0.0, help="Most seconds a session pauses before each step")
+    session_test.add_argument('--seed', type=int)
+    session_test.add_argument('--record', help="Append the summary and step percentiles as one JSON line to this file")
+    
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    
+    if args.command == 'serve':
+        service = create_evaluation_service(args.host, args.port)
+        service_logger.info("Evaluation service listening on %s", service.url)
+        try:
+            service.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.server_close()
+        return
+    
+    if args.command == 'sessiontest':
+        try:
+            check_session_test_support()
+        except RuntimeError as e:
+            parser.exit(1, f"app.py: {e}\n")
+        report = session_load_test(args.sessions, args.iterations, args.scenarios, args.think, args.seed)
+        for failure in report['failures'][:20]:
+            print(failure)
+        print(pd.DataFrame(report['steps']).T.to_string(float_format='{:,.1f}'.format))
+        print(pd.DataFrame(report['sessions']).set_index('session').to_string(float_format='{:,.1f}'.format))
+        for key, value in report['summary'].items():
+            print(f"{key:>22}: {value:,.1f}" if isinstance(value, float) else f"{key:>22}: {value:,}")
+        if args.record:
+            with open(args.record, 'a') as f:
+                f.write(json.dumps({
+                    'timestamp': datetime.now().isoformat(),
+                    'engine_version': ENGINE_VERSION,
+                    'cpus': os.cpu_count(),
+                    'think_seconds': args.think,
+                    **report['summary'],
+                    'steps': report['steps']
+                }) + '\n')
+        return
+    
+    service = None
+    url = args.url
+    if url is None:
+        service = create_evaluation_service(SERVICE_HOST, 0)
+        threading.Thread(target=service.serve_forever, name="cre-evaluation-service", daemon=True).start()
+        url = service.url
+    try:
+        report = service_load_test(url, args.requests, args.concurrency, args.distinct,
+                                   include_pro_forma=not args.no_pro_forma, seed=args.seed)
+    finally:
+        if service is not None:
+            service.shutdown()
+            service.server_close()
+    for key, value in report.items():
+        print(f"{key:>12}: {value:,.1f}" if isinstance(value, float) else f"{key:>12}: {value:,}")
+
+
 if __name__ == "__main__":
-    main()
+    # Under `streamlit run` the script has a run context; plain `python app.py` is the CLI
+    if get_script_run_ctx(suppress_warning=True) is None:
+        cli()
+    else:
+        main()
 
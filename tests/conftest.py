@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Keep the suite off the persistent cache and the startup warm-up before app reads its settings
+os.environ.setdefault("CRE_DISK_CACHE_PATH", "")
+os.environ.setdefault("CRE_PREWARM", "0")
+# Stored sweeps default to .cache/sweeps next to app.py; keep the suite's out of the tree
+os.environ.setdefault("CRE_RESULT_STORE_DIR", tempfile.mkdtemp(prefix="cre-sweeps-"))
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+
+
+@pytest.fixture
+def app_test(tmp_path, monkeypatch):
+    # Saved scenarios are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return AppTest.from_file(APP_PATH, default_timeout=120)
+
+
+def slider(at: AppTest, label: str):
+    return next(widget for widget in at.slider if widget.label == label)
+
+
+def test_default_render(app_test):
+    app_test.run()
+    assert not app_test.exception
+
+
+def test_zero_interest_rate_renders(app_test):
+    app_test.run()
+    slider(app_test, "Interest Rate (%)").set_value(0.0).run()
+    assert not app_test.exception
+    sweep_inputs = app_test.multiselect(key="sweep_inputs")
+    assert "Interest Rate" not in sweep_inputs.options
+    assert "Interest Rate" not in sweep_inputs.value
+
+
+def optimal_points(at: AppTest):
+    """(y title, star y) for every chart with an Optimal Point trace"""
+    points = []
+    for chart in at.get("plotly_chart"):
+        spec = json.loads(chart.proto.spec)
+        for trace in spec["data"]:
+            if trace.get("name") == "Optimal Point":
+                points.append((spec["layout"]["yaxis"]["title"]["text"], trace["y"][0]))
+    return points
+
+
+def test_optimal_point_follows_objective(app_test):
+    app_test.run()
+    app_test.selectbox(key="debt_objective").set_value("Equity Multiple").run()
+    assert not app_test.exception
+    [(title, y)] = optimal_points(app_test)
+    assert title == "Equity Multiple (x)"
+    assert y > 1
@@ -0,0 +1,66 @@
+import pickle
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import app
+
+
+@pytest.fixture
+def disk(tmp_path):
+    return app.DiskResultCache(str(tmp_path / "results.sqlite"), max_bytes=64 * 1024 ** 2)
+
+
+def test_analysis_round_trip(disk):
+    analysis = app.analyze_batch([app.DEFAULT_INPUTS])[0]
+    disk.put(("analysis", 1), analysis)
+    restored = app.DiskResultCache(str(disk.path), disk.max_bytes).get(("analysis", 1))
+    pd.testing.assert_frame_equal(restored.pro_forma.to_frame(), analysis.pro_forma.to_frame())
+    assert restored.returns["after_tax_irr"] == analysis.returns["after_tax_irr"]
+
+
+def test_memory_miss_falls_through_to_disk(disk):
+    analysis = app.analyze_batch([app.DEFAULT_INPUTS])[0]
+    app.ResultCache(64 * 1024 ** 2, disk=disk).get_or_compute(("analysis", 2), lambda: analysis)
+    calls = []
+    fresh = app.ResultCache(64 * 1024 ** 2, disk=disk)
+    restored = fresh.get_or_compute(("analysis", 2), lambda: calls.append(1))
+    assert not calls
+    assert restored.returns["npv"] == analysis.returns["npv"]
+
+
+def test_undecodable_row_is_a_miss_and_deleted(disk):
+    disk.put(("good",), {"value": 1})
+    disk.put(("bad",), {"value": 2})
+    conn = sqlite3.connect(str(disk.path))
+    with conn:
+        bad_blob = pickle.dumps(("__named__", "NoSuchResult", (1, 2)))
+        conn.execute("UPDATE results SET value = ? WHERE key = ?", (bad_blob, disk._storage_key(("bad",))))
+    conn.close()
+    
+    assert disk.get_many([("good",), ("bad",)]) == {("good",): {"value": 1}}
+    assert disk.stats()["entries"] == 1
+    # The read left no transaction open, so another writer is not blocked
+    other = app.DiskResultCache(str(disk.path), disk.max_bytes)
+    other.put(("later",), 3)
+    assert disk.get(("later",)) == 3
+
+
+def test_other_engine_versions_are_kept_but_not_served(disk):
+    disk.put(("shared",), "v1")
+    newer = app.DiskResultCache(str(disk.path), disk.max_bytes, engine_version="next")
+    assert newer.get(("shared",)) is None
+    newer.put(("shared",), "v2")
+    # Opening the newer version did not wipe the rows the older one still reads
+    assert disk.get(("shared",)) == "v1"
+    assert newer.get(("shared",)) == "v2"
+
+
+def test_other_engine_versions_expire_after_ttl(disk):
+    disk.put(("old",), 1)
+    newer = app.DiskResultCache(str(disk.path), disk.max_bytes, engine_version="next", other_version_ttl=0)
+    newer.put(("new",), 2)
+    assert disk.get(("old",)) is None
+    assert newer.stats()["entries"] == 1
+
@@ -0,0 +1,57 @@
+import numpy as np
+import numpy_financial as npf
+import pytest
+
+import app
+
+VARIANTS = [
+    {},
+    {"interest_rate": 0.0},
+    {"hold_period_years": 3},
+    {"down_payment_pct": 1.0},
+    {"loan_term_years": 5, "hold_period_years": 8},
+    {"exit_cap_rate": 0.08, "rent_growth_rate": 0.0},
+]
+
+
+def scalar_returns(inputs):
+    analyzer = app.CREAnalyzer(inputs)
+    analyzer.calculate_pro_forma()
+    return analyzer.calculate_returns()
+
+
+@pytest.mark.parametrize("monthly", [False, True], ids=["annual", "monthly"])
+def test_batch_matches_scalar(monthly):
+    variants = [app.DEFAULT_INPUTS.with_overrides(use_monthly_periods=monthly, **overrides) for overrides in VARIANTS]
+    batch = app.CREAnalyzer(app.stack_inputs(variants)).calculate_batch_returns()
+    for i, variant in enumerate(variants):
+        expected = scalar_returns(variant)
+        for metric in app.RETURN_METRICS:
+            assert batch[metric][i] == pytest.approx(expected[metric], rel=1e-9, abs=1e-6, nan_ok=True), metric
+
+
+@pytest.mark.parametrize("monthly", [False, True], ids=["annual", "monthly"])
+def test_debt_service_stops_at_maturity(monthly):
+    inputs = app.DEFAULT_INPUTS.with_overrides(use_monthly_periods=monthly, loan_term_years=5, hold_period_years=8)
+    pro_forma = app.CREAnalyzer(inputs).calculate_pro_forma()
+    after = pro_forma['Year'] > 5
+    assert np.all(pro_forma['Debt_Service'][after] == 0)
+    assert np.all(pro_forma['Loan_Balance'][pro_forma['Year'] >= 5] == 0)
+    assert np.all(pro_forma['Debt_Service'][1:6] > 0)
+    assert scalar_returns(inputs)['loan_balance'] == 0
+
+
+def test_batch_irr_matches_numpy_financial():
+    rng = np.random.default_rng(7)
+    flows = rng.uniform(0.05, 0.3, size=(200, 11)) * 1e6
+    flows[:, 0] = -rng.uniform(1.0, 2.5, size=200) * 1e6
+    flows[:, -1] += rng.uniform(0.5, 2.0, size=200) * 1e6
+    irrs = app.batch_irr(flows)
+    expected = np.array([npf.irr(row) for row in flows])
+    np.testing.assert_allclose(irrs, expected, rtol=1e-8, atol=1e-10)
+
+
+def test_batch_irr_without_sign_change_is_nan():
+    irrs = app.batch_irr(np.array([[-100.0, -10.0, -10.0], [100.0, 10.0, 10.0], [-100.0, 60.0, 60.0]]))
+    assert np.isnan(irrs[:2]).all()
+    assert irrs[2] == pytest.approx(npf.irr([-100.0, 60.0, 60.0]), rel=1e-9)
@@ -0,0 +1,62 @@
+from fractions import Fraction
+
+import numpy as np
+import numpy_financial as npf
+import pytest
+
+import app
+
+METRICS = ('irr', 'npv', 'equity_multiple', 'year1_dscr')
+
+
+def metric_values(inputs: app.PropertyInputs) -> np.ndarray:
+    returns = app.CREAnalyzer(inputs).calculate_returns()
+    return np.array([returns[name] for name in METRICS])
+
+
+def central_differences(inputs: app.PropertyInputs, name: str) -> np.ndarray:
+    value = getattr(inputs, name)
+    step = 1e-6 * max(abs(value), 1.0)
+    up = metric_values(inputs.with_overrides(**{name: value + step}))
+    down = metric_values(inputs.with_overrides(**{name: value - step}))
+    return (up - down) / (2 * step)
+
+
+@pytest.mark.parametrize('monthly', [False, True])
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'interest_rate': 0.0},
+    {'down_payment_pct': 1.0},
+    {'loan_term_years': 5},
+], ids=['default', 'zero_rate', 'all_equity', 'short_term'])
+def test_gradients_match_central_differences(monthly, overrides):
+    inputs = app.DEFAULT_INPUTS.with_overrides(use_monthly_periods=monthly, **overrides)
+    gradients = app.input_gradients(inputs)
+    for j, name in enumerate(gradients.fields):
+        expected = central_differences(inputs, name)
+        for i, metric in enumerate(METRICS):
+            if metric == 'year1_dscr' and name == 'down_payment_pct' and inputs.down_payment_pct == 1.0:
+                continue    # DSCR is undefined without debt
+            actual = gradients.partials(metric)[j]
+            assert actual == pytest.approx(expected[i], rel=1e-4, abs=1e-6 * max(1.0, abs(metric_values(inputs)[i]))), \
+                f"d {metric} / d {name}"
+
+
+def test_zero_rate_payment_tangent():
+    rate = np.array([1e-20j])
+    payment = app.level_payment(1_000_000.0, rate, 300)
+    assert payment.real[0] == pytest.approx(1_000_000.0 / 300)
+    # d payment / d rate at r = 0 is P (n + 1) / (2 n)
+    assert payment.imag[0] / 1e-20 == pytest.approx(1_000_000.0 * 301 / 600)
+
+
+def test_level_payment_matches_numpy_financial():
+    for rate in (0.07, 0.07 / 12, 0.0):
+        for periods in (1, 25, 300):
+            assert app.level_payment(1e6, rate, periods) == pytest.approx(-npf.pmt(rate, periods, 1e6), rel=1e-12)
+    # Either side of the switch to the series matches exact rational arithmetic
+    for rate in (0.99 * app.SMALL_RATE, 1.01 * app.SMALL_RATE, 1e-9):
+        exact_rate = Fraction(rate)
+        growth = (1 + exact_rate) ** 300
+        expected = float(Fraction(10 ** 6) * growth * exact_rate / (growth - 1))
+        assert app.level_payment(1e6, rate, 300) == pytest.approx(expected, rel=1e-12)
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from streamlit.testing.v1 import AppTest
+
+import app
+
+
+def wait_finished(job, timeout=10):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.finished
+
+
+def fail(job):
+    raise ValueError("boom")
+
+
+def test_failed_job_is_kept_until_discarded():
+    manager = app.JobManager(workers=1, retain=10, max_bytes=1024 ** 2)
+    job = manager.submit(("k",), "Failing", fail)
+    wait_finished(job)
+    assert job.status == 'failed'
+    assert manager.submit(("k",), "Failing", fail) is job
+    
+    manager.discard(("k",))
+    assert manager.get(("k",)) is None
+    retried = manager.submit(("k",), "Working", lambda job: 42)
+    wait_finished(retried)
+    assert retried.status == 'done' and retried.result == 42
+
+
+def test_job_peak_counts_only_its_own_reservations():
+    budget = app.MemoryBudget(1024 ** 3)
+    both_reserved = threading.Barrier(2)
+    
+    def reserve(*sizes):
+        def work(job):
+            with budget.reserve(sizes[0]):
+                both_reserved.wait(5)
+                for size in sizes[1:]:
+                    with budget.reserve(size):
+                        pass
+        return work
+    
+    manager = app.JobManager(workers=2, retain=10, max_bytes=1024 ** 2)
+    small = manager.submit(("small",), "Small", reserve(3 << 20, 2 << 20))
+    large = manager.submit(("large",), "Large", reserve(8 << 20))
+    wait_finished(small)
+    wait_finished(large)
+    assert budget.stats()['peak'] >= 11 << 20
+    assert small.peak_bytes == 5 << 20
+    assert large.peak_bytes == 8 << 20
+    assert small.usage().endswith("5.0 MB peak")
+
+
+def failing_page():
+    import time
+    import app
+    
+    def work(job):
+        raise app.MemoryBudgetError("needs 9 GB")
+    
+    job = app.get_job_manager().submit(("failing_page",), "Test run", work)
+    while not job.finished:
+        time.sleep(0.01)
+    app.background_job(("failing_page",), "Test run", work, memory_hint="Use less.")
+
+
+def test_background_job_shows_error_and_retry():
+    at = AppTest.from_function(failing_page, default_timeout=30).run()
+    assert not at.exception
+    assert at.error[0].value == "Test run failed: needs 9 GB. Use less."
+    assert [button.label for button in at.button] == ["Retry"]
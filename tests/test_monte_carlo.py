@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+import app
+
+
+def test_draws_without_irr_are_reported_not_ranked():
+    # About half the draws lose money every year and have no IRR
+    inputs = app.DEFAULT_INPUTS.with_overrides(annual_rent_psf=8.0, exit_cap_rate=0.12)
+    result = app.monte_carlo(inputs, ['annual_rent_psf'], spread=0.5, tolerance=0.05, max_draws=2 ** 13)
+    
+    assert result.no_irr_share == pytest.approx(np.isnan(result.irr).mean())
+    assert 0.3 < result.no_irr_share < 0.7
+    assert all(np.isfinite(value) for value in result.percentiles.values())
+    assert result.converged
+    finite = result.irr[~np.isnan(result.irr)]
+    assert result.percentiles[50] == pytest.approx(np.percentile(finite, 50), abs=0.05)
+
+
+def test_run_without_any_irr_does_not_converge():
+    inputs = app.DEFAULT_INPUTS.with_overrides(annual_rent_psf=4.0, exit_cap_rate=0.12)
+    result = app.monte_carlo(inputs, ['annual_rent_psf'], spread=0.2, max_draws=2 ** 11)
+    assert result.no_irr_share == 1.0
+    assert not result.converged
+    assert np.isnan(result.percentiles[10])
@@ -0,0 +1,52 @@
+import sys
+
+import numpy as np
+import pytest
+
+import app
+
+FIELDS = ('purchase_price', 'interest_rate', 'exit_cap_rate', 'hold_period_years')
+
+
+@pytest.fixture(scope="module")
+def pool():
+    # Spawned workers re-import __main__, which an earlier AppTest leaves pointing at its
+    # temporary page script; under Streamlit it is app.py, so make it that here too
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setitem(sys.modules, '__main__', app)
+        evaluator = app.ParallelEvaluator(workers=2, chunk_scenarios=300)
+        yield evaluator
+        evaluator.shutdown()
+
+
+def random_samples(n, seed=0):
+    rng = np.random.default_rng(seed)
+    bounds = app.sample_ranges(app.DEFAULT_INPUTS, FIELDS, 0.2)
+    samples = {name: rng.uniform(low, high, n) for name, (low, high) in zip(FIELDS, bounds)}
+    samples['hold_period_years'] = np.round(samples['hold_period_years'])
+    return samples
+
+
+def test_parallel_matches_serial(monkeypatch, pool):
+    monkeypatch.setattr(app, 'PARALLEL_WORKERS', 2)
+    monkeypatch.setattr(app, 'PARALLEL_MIN_SCENARIOS', 500)
+    monkeypatch.setattr(app, 'get_parallel_evaluator', lambda: pool)
+    samples = random_samples(1000)
+
+    parallel = app.evaluate_samples(app.DEFAULT_INPUTS, samples)
+    serial = app.evaluate_samples_in_process(app.DEFAULT_INPUTS, samples)
+    np.testing.assert_array_equal(parallel._values, serial._values)
+
+
+def test_random_sweep_does_not_depend_on_worker_count(pool):
+    bounds = app.sample_ranges(app.DEFAULT_INPUTS, FIELDS, 0.2)
+    modes = np.array([getattr(app.DEFAULT_INPUTS, name) for name in FIELDS], dtype=np.float64)
+    single = app.ParallelEvaluator(workers=1, chunk_scenarios=pool.chunk_scenarios)
+
+    samples_1, batch_1 = single.evaluate_random(app.DEFAULT_INPUTS, FIELDS, bounds, modes, 1000, seed=5)
+    samples_2, batch_2 = pool.evaluate_random(app.DEFAULT_INPUTS, FIELDS, bounds, modes, 1000, seed=5)
+    np.testing.assert_array_equal(samples_1, samples_2)
+    np.testing.assert_array_equal(batch_1._values, batch_2._values)
+    # A different seed gives a different sweep
+    samples_3, _ = pool.evaluate_random(app.DEFAULT_INPUTS, FIELDS, bounds, modes, 1000, seed=6)
+    assert not np.array_equal(samples_1, samples_3)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import app
+
+
+def brute_force_mask(values):
+    """O(n²) reference: a row is dominated by any row at least as good everywhere and better somewhere"""
+    valid = ~np.isnan(values).any(axis=1)
+    mask = np.zeros(len(values), dtype=bool)
+    points = values[valid]
+    dominated = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(points), 512):
+        block = points[start:start + 512]
+        at_least = (points[:, None, :] >= block[None, :, :]).all(axis=2)
+        better = (points[:, None, :] > block[None, :, :]).any(axis=2)
+        dominated[start:start + 512] = (at_least & better).any(axis=0)
+    mask[np.flatnonzero(valid)] = ~dominated
+    return mask
+
+
+def trade_off_points(rng, n, m, levels=60):
+    """Coarse integer objectives on or just behind a trade-off plane: many ties, duplicates and frontier rows"""
+    values = rng.integers(0, levels, size=(n, m - 1)).astype(float)
+    shortfall = rng.integers(0, 4, size=n) * (rng.random(n) < 0.5)
+    return np.column_stack([values, levels * (m - 1) - values.sum(axis=1) - shortfall])
+
+
+@pytest.mark.parametrize("m", [2, 3])
+@pytest.mark.parametrize("n", [1, 50, 3000])
+def test_matches_brute_force(m, n):
+    rng = np.random.default_rng(n + m)
+    values = trade_off_points(rng, n, m)
+    values = np.concatenate([values, values[:n // 5]])  # exact duplicates
+    np.testing.assert_array_equal(app.pareto_mask(values), brute_force_mask(values))
+
+
+def test_frontier_spans_several_blocks():
+    rng = np.random.default_rng(7)
+    values = trade_off_points(rng, 6000, 3, levels=200)
+    values = np.concatenate([values, values[:1000]])
+    mask = app.pareto_mask(values)
+    assert mask.sum() > app.PARETO_BLOCK_POINTS
+    np.testing.assert_array_equal(mask, brute_force_mask(values))
+
+
+def test_minimized_objectives_and_nan_rows():
+    rng = np.random.default_rng(3)
+    values = trade_off_points(rng, 4000, 3)
+    values[::97, 1] = np.nan
+    maximize = [True, False, True]
+    expected = brute_force_mask(values * np.where(maximize, 1.0, -1.0))
+    mask = app.pareto_mask(values, maximize)
+    np.testing.assert_array_equal(mask, expected)
+    assert not mask[::97].any()
+
+
+def test_duplicate_rows_share_the_frontier():
+    values = np.array([[1.0, 2.0], [1.0, 2.0], [2.0, 1.0], [0.5, 0.5]])
+    np.testing.assert_array_equal(app.pareto_mask(values), [True, True, True, False])
+
+
+def test_rejects_other_objective_counts():
+    with pytest.raises(ValueError, match="2 or 3"):
+        app.pareto_mask(np.zeros((4, 4)))
@@ -0,0 +1,53 @@
+import os
+import threading
+
+import numpy as np
+
+import app
+
+
+def make_store(directory, name, rows, mtime):
+    path = directory / name
+    store = app.ResultStore.create(path, {'x': np.arange(rows, dtype=np.float64)}, ['irr'])
+    store.append(np.arange(rows), {'irr': np.linspace(0, 1, rows)})
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_prune_deletes_least_recently_used(tmp_path):
+    paths = [make_store(tmp_path, f"s{i}", 1000, 1_000_000 + i) for i in range(4)]
+    # Each store holds 8,000 bytes; room for two
+    deleted = app.prune_result_stores(str(tmp_path), max_bytes=16_000, keep=paths[0])
+    assert deleted == 2
+    assert [path.exists() for path in paths] == [True, False, False, True]
+
+
+def test_prune_skips_stores_being_written(tmp_path):
+    old = make_store(tmp_path, "old", 1000, 1_000_000)
+    new = make_store(tmp_path, "new", 1000, 2_000_000)
+    locked, release = threading.Event(), threading.Event()
+    
+    def writer():
+        with app.store_lock(old):
+            locked.set()
+            release.wait(10)
+    
+    thread = threading.Thread(target=writer)
+    thread.start()
+    locked.wait(10)
+    try:
+        assert app.prune_result_stores(str(tmp_path), max_bytes=0) == 1
+    finally:
+        release.set()
+        thread.join()
+    assert old.exists() and not new.exists()
+
+
+def test_stored_sweep_prunes_other_stores(tmp_path, monkeypatch):
+    stale = make_store(tmp_path, "stale", 1000, 1_000_000)
+    monkeypatch.setattr(app, 'RESULT_STORE_MAX_MB', 0)
+    axes = {'exit_cap_rate': np.array([0.06, 0.065, 0.07])}
+    store = app.stored_sweep(app.DEFAULT_INPUTS, axes, directory=str(tmp_path))
+    assert store.complete
+    # keep protects the store just written even though it exceeds the cap
+    assert store.path.exists() and not stale.exists()
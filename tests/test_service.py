@@ -0,0 +1,198 @@
+import asyncio
+import http.client
+import json
+import threading
+from dataclasses import asdict
+
+import pytest
+
+import app
+
+
+@pytest.fixture(scope="module")
+def batcher():
+    return app.EvaluationBatcher(0.005, 64, app.ResultCache(64 * 1024 ** 2))
+
+
+@pytest.fixture(scope="module")
+def service(batcher):
+    server = app.EvaluationService(("127.0.0.1", 0), batcher, batcher.cache)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(service, payload, path="/evaluate"):
+    host, port = service.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    try:
+        conn.request("POST", path, body=json.dumps(payload), headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def document(**overrides):
+    return {"name": "Test", "inputs": dict(asdict(app.DEFAULT_INPUTS), **overrides)}
+
+
+def test_evaluate_matches_engine(service):
+    status, body = post(service, document(), "/evaluate?pro_forma=0")
+    assert status == 200
+    expected = app.CREAnalyzer(app.DEFAULT_INPUTS).calculate_returns()
+    assert body["returns"]["after_tax_irr"] == pytest.approx(expected["after_tax_irr"], rel=1e-9)
+
+
+def test_evaluate_array_keeps_order(service):
+    rates = [0.05, 0.06, 0.07]
+    status, body = post(service, [document(interest_rate=rate) for rate in rates], "/evaluate?pro_forma=0")
+    assert status == 200
+    irrs = [item["returns"]["after_tax_irr"] for item in body]
+    assert irrs == sorted(irrs, reverse=True)
+
+
+@pytest.mark.parametrize("overrides, field_name", [
+    ({"hold_period_years": 0}, "hold_period_years"),
+    ({"hold_period_years": -3}, "hold_period_years"),
+    ({"hold_period_years": 2.5}, "hold_period_years"),
+    ({"hold_period_years": 100000}, "hold_period_years"),
+    ({"loan_term_years": 0}, "loan_term_years"),
+    ({"building_size": 0}, "building_size"),
+    ({"purchase_price": -1}, "purchase_price"),
+    ({"down_payment_pct": 0}, "down_payment_pct"),
+    ({"down_payment_pct": 1.5}, "down_payment_pct"),
+    ({"exit_cap_rate": 0}, "exit_cap_rate"),
+    ({"interest_rate": "7%"}, "interest_rate"),
+    ({"interest_rate": None}, "interest_rate"),
+    ({"unknown_field": 1}, "unknown_field"),
+])
+def test_invalid_input_is_rejected(service, overrides, field_name):
+    status, body = post(service, document(**overrides))
+    assert status == 400
+    assert field_name in body["error"]
+
+
+@pytest.mark.parametrize("content_length", [None, "abc", "-1"])
+def test_invalid_content_length_is_rejected(service, content_length):
+    host, port = service.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        conn.putrequest("POST", "/evaluate")
+        if content_length is not None:
+            conn.putheader("Content-Length", content_length)
+        conn.endheaders()
+        response = conn.getresponse()
+        assert response.status == 400
+        assert "Content-Length" in json.loads(response.read())["error"]
+    finally:
+        conn.close()
+
+
+def test_missing_field_is_rejected(service):
+    inputs = asdict(app.DEFAULT_INPUTS)
+    del inputs["exit_cap_rate"]
+    status, body = post(service, {"inputs": inputs})
+    assert status == 400
+    assert "exit_cap_rate" in body["error"]
+
+
+def test_unknown_endpoint(service):
+    status, _ = post(service, document(), "/nope")
+    assert status == 404
+
+
+def test_async_evaluate_validates(batcher):
+    bad = app.DEFAULT_INPUTS.with_overrides(hold_period_years=0)
+    with pytest.raises(ValueError, match="hold_period_years"):
+        asyncio.run(app.evaluate(bad, batcher))
+    
+    async def consume():
+        return [analysis async for analysis in app.evaluate_many([app.DEFAULT_INPUTS, bad], batcher=batcher)]
+    
+    with pytest.raises(ValueError, match="hold_period_years"):
+        asyncio.run(consume())
+
+
+def test_async_results_match_engine(batcher):
+    variants = [app.DEFAULT_INPUTS.with_overrides(exit_cap_rate=rate) for rate in (0.06, 0.065, 0.07)]
+    
+    async def consume():
+        return [analysis async for analysis in app.evaluate_many(variants, batcher=batcher)]
+    
+    for variant, analysis in zip(variants, asyncio.run(consume())):
+        expected = app.CREAnalyzer(variant).calculate_returns()
+        assert analysis.returns["npv"] == pytest.approx(expected["npv"], rel=1e-9)
+
+
+class GatedBatcher(app.EvaluationBatcher):
+    """One request at a time, each waiting for a permit from gate; records every future it hands out"""
+    
+    def __init__(self):
+        super().__init__(0.0, 1, app.ResultCache(16 * 1024 ** 2))
+        self.gate = threading.Semaphore(0)
+        self.futures = []
+        self.most_outstanding = 0
+    
+    def submit(self, inputs):
+        future = super().submit(inputs)
+        self.futures.append(future)
+        self.most_outstanding = max(self.most_outstanding, sum(not f.done() for f in self.futures))
+        return future
+    
+    def _evaluate(self, pending):
+        self.gate.acquire()
+        super()._evaluate(pending)
+
+
+def variants(count):
+    return [app.DEFAULT_INPUTS.with_overrides(purchase_price=app.DEFAULT_INPUTS.purchase_price + i)
+            for i in range(count)]
+
+
+def test_async_stream_is_read_only_as_results_are_consumed():
+    batcher = GatedBatcher()
+    read = []
+    
+    def stream():
+        for inputs in variants(20):
+            read.append(inputs)
+            yield inputs
+    
+    async def consume():
+        results = app.evaluate_many(stream(), max_in_flight=4, batcher=batcher)
+        task = asyncio.ensure_future(anext(results))
+        await asyncio.sleep(0.2)
+        # Nothing has finished, so the stream stops at max_in_flight
+        assert len(read) == 4 and len(batcher.futures) == 4
+        batcher.gate.release(20)
+        first = await task
+        return [first] + [analysis async for analysis in results]
+    
+    assert len(asyncio.run(consume())) == 20
+    assert len(read) == 20
+    assert batcher.most_outstanding == 4
+
+
+def test_async_break_cancels_queued_requests():
+    batcher = GatedBatcher()
+    batcher.gate.release()
+    
+    async def consume():
+        results = app.evaluate_many(variants(10), max_in_flight=4, batcher=batcher)
+        async for _ in results:
+            # Break once the batcher has taken the second request
+            while not batcher.futures[1].running():
+                await asyncio.sleep(0.01)
+            break
+        await results.aclose()
+    
+    asyncio.run(consume())
+    assert len(batcher.futures) == 4
+    # The second request was already running and finishes; the two queued behind it never start
+    assert [future.cancelled() for future in batcher.futures] == [False, False, True, True]
+    batcher.gate.release(10)
+    batcher.evaluate(app.DEFAULT_INPUTS, timeout=60)
+    assert batcher.futures[1].done() and not batcher.futures[1].cancelled()
+    assert batcher.stats()['requests'] == 3
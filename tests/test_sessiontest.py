@@ -0,0 +1,23 @@
+import pytest
+from streamlit.runtime import Runtime
+
+import app
+
+
+def test_sessions_share_one_process():
+    report = app.session_load_test(sessions=2, iterations=1, scenarios=2, seed=1)
+    assert report['failures'] == []
+    summary = report['summary']
+    assert summary['interactions'] == 2 * (1 + 4)
+    assert summary['cpu_ms_per_interaction'] > 0
+    assert all(row['interactions'] == 5 for row in report['sessions'])
+    # The pinned runtime is released afterwards
+    assert not Runtime.exists()
+
+
+def test_missing_streamlit_internals_fail_fast(monkeypatch):
+    from streamlit.testing.v1 import app_test
+    monkeypatch.delattr(app_test, 'Runtime')
+    with pytest.raises(RuntimeError, match=r"app_test\.Runtime.*verified on Streamlit"):
+        with app.shared_test_runtime():
+            pass
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+import app
+
+FIELDS = ('building_size', 'purchase_price', 'annual_rent_psf')
+
+
+def analytic_metrics(bounds):
+    """evaluate_sample_metrics stand-in: Ishigami as 'irr' and an additive model as 'npv'"""
+    def evaluate(inputs, samples, metrics, progress=None):
+        x = [(samples[name] - low) / (high - low) for name, (low, high) in zip(FIELDS, bounds)]
+        u = [np.pi * (2 * value - 1) for value in x]
+        ishigami = np.sin(u[0]) + 7 * np.sin(u[1]) ** 2 + 0.1 * u[2] ** 4 * np.sin(u[0])
+        return {'irr': ishigami, 'npv': x[0] + 2 * x[1]}
+    return evaluate
+
+
+def test_estimators_recover_analytic_indices(monkeypatch):
+    bounds = app.sample_ranges(app.DEFAULT_INPUTS, FIELDS, 0.2)
+    monkeypatch.setattr(app, 'evaluate_sample_metrics', analytic_metrics(bounds))
+    result = app.sobol_indices(app.DEFAULT_INPUTS, FIELDS, 0.2, log2_samples=14)
+    
+    a, b = 7, 0.1
+    variance = a ** 2 / 8 + b * np.pi ** 4 / 5 + b ** 2 * np.pi ** 8 / 18 + 0.5
+    first = [(b * np.pi ** 4 / 5 + b ** 2 * np.pi ** 8 / 50 + 0.5) / variance, a ** 2 / 8 / variance, 0.0]
+    total = [first[0] + 8 * b ** 2 * np.pi ** 8 / 225 / variance, first[1], 8 * b ** 2 * np.pi ** 8 / 225 / variance]
+    irr, npv = result.metrics.index('IRR'), result.metrics.index('NPV')
+    np.testing.assert_allclose(result.first_order[irr], first, atol=0.03)
+    np.testing.assert_allclose(result.total[irr], total, atol=0.03)
+    np.testing.assert_allclose(result.first_order[npv], [0.2, 0.8, 0.0], atol=0.02)
+    np.testing.assert_allclose(result.total[npv], [0.2, 0.8, 0.0], atol=0.02)
+    assert result.variance[irr] == pytest.approx(variance, rel=0.02)
+    # The reported intervals cover the truth
+    assert np.all(np.abs(result.first_order[irr] - first) <= 2 * result.first_order_ci[irr] + 1e-12)
+
+
+def test_input_without_effect_has_zero_indices():
+    result = app.sobol_indices(app.DEFAULT_INPUTS, ('exit_cap_rate', 'discount_rate'), 0.2, log2_samples=8)
+    irr = result.metrics.index('IRR')
+    assert result.first_order[irr, 1] == 0
+    assert result.total[irr, 1] == 0
+    assert result.total[irr, 0] == pytest.approx(1, abs=0.05)
+    assert result.valid_rows[irr] == 2 ** 8
@@ -0,0 +1,53 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import app
+
+# discount_rate leaves IRR unchanged, so every IRR is tied; a $500M price leaves no IRR at all
+AXES = {
+    'purchase_price': np.append(np.linspace(4_000_000, 6_000_000, 5), 500_000_000),
+    'interest_rate': np.array([0.0, 0.05, 0.07, 0.09]),
+    'exit_cap_rate': np.array([0.05, 0.065, 0.08]),
+    'hold_period_years': np.array([3.0, 7.0, 10.0]),
+    'discount_rate': np.array([0.08, 0.1]),
+}
+
+
+@pytest.fixture(scope="module")
+def brute_force():
+    """Every combination evaluated at once, in sweep order (last axis fastest)"""
+    grid = np.array(list(itertools.product(*AXES.values())))
+    samples = {name: grid[:, j] for j, name in enumerate(AXES)}
+    return samples, app.evaluate_samples(app.DEFAULT_INPUTS, samples)
+
+
+@pytest.mark.parametrize("largest", [True, False])
+def test_chunked_top_k_matches_brute_force(brute_force, largest):
+    samples, batch = brute_force
+    sweep = app.parameter_sweep(app.DEFAULT_INPUTS, AXES, 'irr', top_k=10, largest=largest, chunk_scenarios=17)
+
+    score = batch['irr'] if largest else -batch['irr']
+    finite = np.flatnonzero(np.isfinite(score))
+    expected = finite[np.lexsort((finite, -score[finite]))][:10]
+    assert sweep.combinations == len(score)
+    for name in AXES:
+        np.testing.assert_array_equal(sweep.top[name], samples[name][expected])
+    for name in ('irr',) + app.SWEEP_SUMMARY_METRICS:
+        np.testing.assert_array_equal(sweep.top[name], batch[name][expected])
+
+
+def test_running_stats_match_brute_force(brute_force):
+    _, batch = brute_force
+    sweep = app.parameter_sweep(app.DEFAULT_INPUTS, AXES, 'irr', chunk_scenarios=17)
+    summary = sweep.summary.set_index('Metric')
+    for name in app.SWEEP_SUMMARY_METRICS:
+        values = batch[name]
+        row = summary.loc[name]
+        assert row['Count'] == np.isfinite(values).sum()
+        assert row['Missing'] == np.isnan(values).sum()
+        assert row['Mean'] == pytest.approx(np.nanmean(values), rel=1e-9)
+        assert row['Std'] == pytest.approx(np.nanstd(values, ddof=1), rel=1e-9)
+        assert row['Min'] == np.nanmin(values)
+        assert row['Max'] == np.nanmax(values)